@@ -1,36 +1,60 @@
+import json
+
 import requests
 import pandas as pd
-from bs4 import BeautifulSoup
+
+from response_cache import default_cache, print_cache_stats
+from scraper import DEFAULT_PARSER, iter_search_results
+
+API_URL = "https://www.searchapi.io/api/v1/search"
 
 
-def load_search_results_api(api_key, query="chatgpt"):
+def api_headers(api_key):
     """
-    Загрузка результатов поиска через API searchapi.io
+    Заголовки запроса к searchapi.io
     """
-    print(f"\n🔍 Поиск через API: '{query}'")
-    url = "https://www.searchapi.io/api/v1/search"
-    headers = {
+    return {
         "Authorization": f"Bearer {api_key}",
         "Accept": "application/json"
     }
+
+
+def parse_organic_results(data):
+    """
+    Органические результаты поиска из ответа API в виде DataFrame
+    """
+    df = pd.json_normalize(data.get("organic_results", []))
+
+    # Добавляем источник данных
+    df['source'] = 'API'
+    return df
+
+
+def load_search_results_api(api_key, query="chatgpt", use_cache=True, refresh=False):
+    """
+    Загрузка результатов поиска через API searchapi.io
+
+    Ответ API сохраняется в кэше (response_cache.py): повторный запрос в
+    пределах TTL не расходует квоту API.
+    """
+    print(f"\n🔍 Поиск через API: '{query}'")
     params = {
         "engine": "google",
         "q": query
     }
 
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
+    def fetch():
+        response = requests.get(API_URL, headers=api_headers(api_key), params=params)
+        response.raise_for_status()
+        return response.text
 
-    data = response.json()
+    if use_cache:
+        body = default_cache().get_or_fetch("api", params["engine"], query, 1, fetch, refresh)
+    else:
+        body = fetch()
 
     # Извлекаем органические результаты поиска
-    organic_results = data.get("organic_results", [])
-
-    # Преобразуем в DataFrame
-    df = pd.json_normalize(organic_results)
-
-    # Добавляем источник данных
-    df['source'] = 'API'
+    df = parse_organic_results(json.loads(body))
 
     print(f"\n📊 Найдено результатов: {len(df)}")
     print("\nПервые 10 результатов:")
@@ -43,49 +67,45 @@ def load_search_results_api(api_key, query="chatgpt"):
     return df
 
 
-def load_search_results_scraping(query="chatgpt", num_results=10):
-    """
-    Загрузка результатов поиска через веб-скрапинг с Beautiful Soup
+def load_search_results_batch(api_key, queries_path, output_path="search_results_batch.parquet",
+                              **options):
     """
-    print(f"\n🔍 Поиск через веб-скрапинг: '{query}'")
+    Пакетный поиск через API: запросы из файла выполняются параллельно,
+    результаты всех запросов пишутся в один CSV или Parquet файл
 
-    # Используем DuckDuckGo HTML (не требует API)
-    url = f"https://html.duckduckgo.com/html/?q={query}"
+    Args:
+        api_key: Ключ searchapi.io
+        queries_path: Файл с запросами (по одному в строке)
+        output_path: Итоговый файл (.csv или .parquet)
+        **options: Параметры BatchSearchRunner (concurrency, rate, max_pages, ...)
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
-
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.text, 'html.parser')
+    Returns:
+        Статистика пакетного поиска
+    """
+    from batch_search import read_queries, run_batch
 
-        # Парсим результаты поиска
-        results = []
-        result_divs = soup.find_all('div', class_='result')[:num_results]
+    options.setdefault("cache", default_cache())
+    queries = read_queries(queries_path)
+    print(f"\n🔍 Пакетный поиск через API: {len(queries)} запросов из {queries_path}")
+    return run_batch(queries, api_key, output_path, **options)
 
-        for idx, div in enumerate(result_divs, 1):
-            # Извлекаем заголовок и ссылку
-            title_tag = div.find('a', class_='result__a')
-            title = title_tag.get_text(strip=True) if title_tag else "N/A"
-            link = title_tag.get('href') if title_tag else "N/A"
 
-            # Извлекаем описание
-            snippet_tag = div.find('a', class_='result__snippet')
-            snippet = snippet_tag.get_text(strip=True) if snippet_tag else "N/A"
+def load_search_results_scraping(query="chatgpt", num_results=10, use_cache=True, refresh=False,
+                                 concurrency=3, parser=DEFAULT_PARSER):
+    """
+    Загрузка результатов поиска через веб-скрапинг DuckDuckGo
 
-            results.append({
-                'position': idx,
-                'title': title,
-                'link': link,
-                'snippet': snippet,
-                'source': 'Web Scraping'
-            })
+    Разбираются только блоки результатов (scraper.py: lxml или BeautifulSoup
+    с SoupStrainer). Если результатов нужно больше, чем на одной странице,
+    следующие страницы загружаются одновременно (до concurrency). HTML
+    страниц сохраняется в кэше (response_cache.py) со своим TTL.
+    """
+    print(f"\n🔍 Поиск через веб-скрапинг: '{query}'")
 
-        # Преобразуем в DataFrame
-        df = pd.DataFrame(results)
+    try:
+        results = iter_search_results(query, num_results, concurrency=concurrency, parser=parser,
+                                      use_cache=use_cache, refresh=refresh)
+        df = pd.DataFrame(list(results), columns=["position", "title", "link", "snippet", "source"])
 
         print(f"\n📊 Найдено результатов: {len(df)}")
         print("\nПервые 10 результатов:")
@@ -103,7 +123,7 @@ def load_search_results_scraping(query="chatgpt", num_results=10):
         return pd.DataFrame()
 
 
-def compare_methods(api_key, query="chatgpt"):
+def compare_methods(api_key, query="chatgpt", use_cache=True):
     """
     Сравнение двух методов получения данных: API vs Web Scraping
     """
@@ -115,13 +135,13 @@ def compare_methods(api_key, query="chatgpt"):
     print("\n" + "-" * 70)
     print("МЕТОД 1: API (searchapi.io)")
     print("-" * 70)
-    df_api = load_search_results_api(api_key, query)
+    df_api = load_search_results_api(api_key, query, use_cache=use_cache)
 
     # Метод 2: Web Scraping
     print("\n" + "-" * 70)
     print("МЕТОД 2: WEB SCRAPING (Beautiful Soup)")
     print("-" * 70)
-    df_scraping = load_search_results_scraping(query)
+    df_scraping = load_search_results_scraping(query, use_cache=use_cache)
 
     # Итоговое сравнение
     print("\n" + "=" * 70)
@@ -129,6 +149,8 @@ def compare_methods(api_key, query="chatgpt"):
     print("=" * 70)
     print(f"API результатов: {len(df_api)}")
     print(f"Web Scraping результатов: {len(df_scraping)}")
+    if use_cache:
+        print_cache_stats(default_cache())
     print("\n✅ Оба метода успешно выполнены и сохранены в отдельные CSV файлы")
 
 
@@ -140,13 +162,19 @@ if __name__ == "__main__":
     print("1 - Только API")
     print("2 - Только веб-скрапинг")
     print("3 - Сравнение обоих методов")
+    print("4 - Пакетный поиск через API (запросы из файла)")
 
     choice = input("\nВведите номер (по умолчанию 3): ").strip() or "3"
-    query = input("Введите поисковый запрос (по умолчанию 'chatgpt'): ").strip() or "chatgpt"
 
-    if choice == "1":
-        load_search_results_api(api_key, query)
-    elif choice == "2":
-        load_search_results_scraping(query)
+    if choice == "4":
+        queries_path = input("Файл с запросами (по умолчанию 'queries.txt'): ").strip() or "queries.txt"
+        load_search_results_batch(api_key, queries_path)
     else:
-        compare_methods(api_key, query)
+        query = input("Введите поисковый запрос (по умолчанию 'chatgpt'): ").strip() or "chatgpt"
+
+        if choice == "1":
+            load_search_results_api(api_key, query)
+        elif choice == "2":
+            load_search_results_scraping(query)
+        else:
+            compare_methods(api_key, query)
@@ -0,0 +1,368 @@
+"""
+Пакетный поиск через API searchapi.io.
+
+Запросы из файла выполняются конкурентно в asyncio: число одновременных
+запросов ограничено (общий пул соединений requests.Session), частота - корзиной
+токенов (token bucket). Ответы 429 и 5xx и сетевые ошибки повторяются с
+экспоненциальной задержкой (с учетом заголовка Retry-After). Каждый запрос
+читается постранично, и страницы сразу дописываются в один общий CSV или
+Parquet файл - результаты не накапливаются в памяти. Страницы, уже
+полученные ранее, берутся из кэша ответов (response_cache.py); ответы
+другого адреса (--base-url) кэшируются отдельно от ответов API.
+
+Запуск:
+    python batch_search.py queries.txt --output results.parquet --concurrency 8 --rate 5
+    python batch_search.py queries.txt --base-url http://127.0.0.1:8765/api/v1/search
+
+Проверка без сети - против локального сервера-заглушки (mock_api.py):
+    python mock_api.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Iterable, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
+from requests.adapters import HTTPAdapter
+
+from api_reader import API_URL, api_headers, parse_organic_results
+from response_cache import ResponseCache, default_cache, print_cache_stats
+
+# Столбцы итогового файла (одинаковые для всех страниц всех запросов)
+RESULT_COLUMNS = ["query", "page", "position", "title", "link", "displayed_link",
+                  "snippet", "source"]
+
+RESULT_SCHEMA = pa.schema([
+    ("query", pa.string()),
+    ("page", pa.int64()),
+    ("position", pa.int64()),
+    ("title", pa.string()),
+    ("link", pa.string()),
+    ("displayed_link", pa.string()),
+    ("snippet", pa.string()),
+    ("source", pa.string()),
+])
+
+
+class TokenBucket:
+    """
+    Ограничение частоты запросов: rate токенов в секунду, не больше capacity подряд
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """
+        Ждет свободный токен
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Повтор запросов с экспоненциальной задержкой
+
+    Attributes:
+        attempts: Всего попыток на запрос
+        backoff: Задержка перед первым повтором, с (дальше удваивается)
+        max_backoff: Максимальная задержка, с
+        statuses: Коды ответа, после которых запрос повторяется
+    """
+    attempts: int = 5
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+    statuses: Sequence[int] = (429, 500, 502, 503, 504)
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Задержка перед повтором номер attempt (с 1); Retry-After в секундах имеет приоритет
+        """
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        # Случайный разброс, чтобы повторы не приходили одновременно
+        return delay * (0.5 + random.random() / 2)
+
+
+class ResultWriter:
+    """
+    Дописывает страницы результатов в один CSV или Parquet файл
+
+    Файл пишется во временный и заменяет итоговый в close().
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        self._tmp_path = path + ".part"
+        self._parquet = path.endswith(".parquet")
+        self._writer = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if not self._parquet:
+            open(self._tmp_path, "w").close()
+
+    def write(self, df: pd.DataFrame) -> None:
+        df = df.reindex(columns=RESULT_COLUMNS)
+        if self._parquet:
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self._tmp_path, RESULT_SCHEMA, compression="snappy")
+            self._writer.write_table(pa.Table.from_pandas(df, schema=RESULT_SCHEMA,
+                                                          preserve_index=False))
+        else:
+            df.to_csv(self._tmp_path, mode="a", header=self.rows == 0, index=False,
+                      encoding="utf-8")
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._parquet:
+            if self._writer is None:
+                pq.write_table(RESULT_SCHEMA.empty_table(), self._tmp_path)
+            else:
+                self._writer.close()
+        os.replace(self._tmp_path, self.path)
+
+
+@dataclass
+class BatchStats:
+    """
+    Итоги пакетного поиска
+    """
+    queries: int = 0
+    pages: int = 0
+    rows: int = 0
+    requests: int = 0
+    retries: int = 0
+    cached: int = 0
+    seconds: float = 0.0
+    failed: List[str] = field(default_factory=list)
+
+
+class BatchSearchRunner:
+    """
+    Конкурентное выполнение поисковых запросов с ограничением частоты и повторами.
+
+    Пример:
+        runner = BatchSearchRunner(api_key, concurrency=8, rate=5, max_pages=3)
+        stats = asyncio.run(runner.run(queries, ResultWriter("results.parquet")))
+    """
+
+    def __init__(self, api_key: str, base_url: str = API_URL, concurrency: int = 8,
+                 rate: float = 5.0, burst: Optional[float] = None, max_pages: int = 1,
+                 retry: RetryPolicy = RetryPolicy(), timeout: float = 30.0,
+                 engine: str = "google", cache: Optional[ResponseCache] = None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.max_pages = max_pages
+        self.retry = retry
+        self.timeout = timeout
+        self.engine = engine
+        self.cache = cache
+        # Ключ кэша: ответы заглушки или стенда не выдаются за ответы API
+        self.cache_engine = engine if base_url == API_URL else f"{engine}@{base_url}"
+        self.stats = BatchStats()
+
+    def _make_session(self) -> requests.Session:
+        # Пул соединений на все одновременные запросы (keep-alive между ними)
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(api_headers(self.api_key))
+        return session
+
+    async def _get(self, query: str, page: int) -> dict:
+        """
+        Одна страница результатов: из кэша или из API с повторами
+        """
+        if self.cache is not None:
+            body = self.cache.get("api", self.cache_engine, query, page)
+            if body is not None:
+                self.stats.cached += 1
+                return json.loads(body)
+        body = await self._fetch(query, page)
+        if self.cache is not None:
+            self.cache.put("api", self.cache_engine, query, page, body)
+        return json.loads(body)
+
+    async def _fetch(self, query: str, page: int) -> str:
+        """
+        Одна страница результатов из API с повторами
+        """
+        params = {"engine": self.engine, "q": query, "page": page}
+        loop = asyncio.get_running_loop()
+        for attempt in range(1, self.retry.attempts + 1):
+            await self._bucket.acquire()
+            self.stats.requests += 1
+            retry_after = None
+            try:
+                response = await loop.run_in_executor(
+                    self._executor,
+                    partial(self._session.get, self.base_url, params=params, timeout=self.timeout),
+                )
+                if response.status_code not in self.retry.statuses:
+                    response.raise_for_status()
+                    return response.text
+                retry_after = response.headers.get("Retry-After")
+                error = requests.HTTPError(f"{response.status_code} для '{query}' (стр. {page})")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+
+            if attempt == self.retry.attempts:
+                raise error
+            self.stats.retries += 1
+            await asyncio.sleep(self.retry.delay(attempt, retry_after))
+
+    async def _search(self, query: str, writer: ResultWriter) -> None:
+        """
+        Все страницы одного запроса; каждая страница сразу пишется в файл
+        """
+        async with self._semaphore:
+            for page in range(1, self.max_pages + 1):
+                data = await self._get(query, page)
+                df = parse_organic_results(data)
+                if df.empty:
+                    break
+                df.insert(0, "page", page)
+                df.insert(0, "query", query)
+                writer.write(df)
+                self.stats.pages += 1
+                self.stats.rows += len(df)
+                if not data.get("pagination", {}).get("next"):
+                    break
+
+    async def _search_safe(self, query: str, writer: ResultWriter) -> None:
+        try:
+            await self._search(query, writer)
+        except Exception as e:
+            self.stats.failed.append(query)
+            print(f"   ❌ '{query}': {e}")
+
+    async def run(self, queries: Iterable[str], writer: ResultWriter) -> BatchStats:
+        """
+        Выполняет все запросы; ошибка одного запроса не прерывает остальные
+
+        Args:
+            queries: Поисковые запросы
+            writer: Файл для результатов
+
+        Returns:
+            Статистика выполнения
+        """
+        queries = list(queries)
+        self.stats = BatchStats(queries=len(queries))
+        self._bucket = TokenBucket(self.rate, self.burst)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._session = self._make_session()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                            thread_name_prefix="search")
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(self._search_safe(query, writer) for query in queries))
+        finally:
+            self._executor.shutdown()
+            self._session.close()
+        self.stats.seconds = time.perf_counter() - start
+        return self.stats
+
+
+def read_queries(path: str) -> List[str]:
+    """
+    Запросы из текстового файла: по одному в строке, пустые строки и # пропускаются
+    """
+    with open(path, encoding="utf-8") as f:
+        queries = [line.strip() for line in f]
+    return [query for query in queries if query and not query.startswith("#")]
+
+
+def run_batch(queries: Sequence[str], api_key: str, output_path: str = "search_results_batch.parquet",
+              **options) -> BatchStats:
+    """
+    Выполняет пакет запросов и пишет все результаты в один файл
+
+    Args:
+        queries: Поисковые запросы
+        api_key: Ключ searchapi.io
+        output_path: Итоговый файл (.csv или .parquet)
+        **options: Параметры BatchSearchRunner
+
+    Returns:
+        Статистика выполнения
+    """
+    runner = BatchSearchRunner(api_key, **options)
+    writer = ResultWriter(output_path)
+    try:
+        stats = asyncio.run(runner.run(queries, writer))
+    finally:
+        writer.close()
+
+    print(f"\n📊 Запросов: {stats.queries} (с ошибкой: {len(stats.failed)}), "
+          f"страниц: {stats.pages}, результатов: {stats.rows}")
+    print(f"   HTTP запросов: {stats.requests}, повторов: {stats.retries}, "
+          f"из кэша: {stats.cached}, время: {stats.seconds:.2f} с")
+    if runner.cache is not None:
+        print_cache_stats(runner.cache)
+    print(f"✅ Результаты сохранены в {output_path}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетный поиск через API searchapi.io")
+    parser.add_argument("queries", help="Файл с запросами (по одному в строке)")
+    parser.add_argument("--output", default="search_results_batch.parquet",
+                        help="Итоговый файл .parquet или .csv (по умолчанию: search_results_batch.parquet)")
+    parser.add_argument("--api-key", default=os.environ.get("SEARCHAPI_KEY"),
+                        help="Ключ API (по умолчанию: $SEARCHAPI_KEY)")
+    parser.add_argument("--base-url", default=API_URL, help=f"Адрес API (по умолчанию: {API_URL})")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Одновременных запросов (по умолчанию: 8)")
+    parser.add_argument("--rate", type=float, default=5.0,
+                        help="Запросов в секунду (по умолчанию: 5)")
+    parser.add_argument("--pages", type=int, default=1,
+                        help="Страниц результатов на запрос (по умолчанию: 1)")
+    parser.add_argument("--attempts", type=int, default=5,
+                        help="Попыток на запрос при 429/5xx (по умолчанию: 5)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Не использовать кэш ответов (response_cache.py)")
+    args = parser.parse_args()
+
+    if not args.api_key:
+        parser.error("нужен --api-key или переменная окружения SEARCHAPI_KEY")
+
+    run_batch(read_queries(args.queries), args.api_key, args.output,
+              base_url=args.base_url, concurrency=args.concurrency, rate=args.rate,
+              max_pages=args.pages, retry=RetryPolicy(attempts=args.attempts),
+              cache=None if args.no_cache else default_cache())
+
+
+if __name__ == "__main__":
+    main()
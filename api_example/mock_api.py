@@ -0,0 +1,221 @@
+"""
+Локальный сервер-заглушка searchapi.io для проверки пакетного поиска без сети.
+
+Отвечает на GET /api/v1/search?q=...&page=... в формате searchapi.io
+(organic_results и pagination), с настраиваемой задержкой ответа, числом
+страниц и сбоями: первые ответы на каждую страницу могут быть 429 (с
+Retry-After) или 503, чтобы проверить повторы.
+
+Запуск:
+    python mock_api.py              # тестовый прогон batch_search против заглушки
+    python mock_api.py --serve 8765 # только сервер
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+
+class MockSearchAPI:
+    """
+    HTTP сервер, имитирующий searchapi.io
+
+    Attributes:
+        pages: Страниц результатов на запрос
+        results_per_page: Результатов на странице
+        latency: Задержка ответа, с
+        failures: Коды ответов перед успешным ответом на каждую страницу,
+            например (429, 503) - два сбоя, затем данные
+        api_key: Ожидаемый ключ (None - не проверяется)
+    """
+
+    def __init__(self, pages: int = 3, results_per_page: int = 10, latency: float = 0.0,
+                 failures: Sequence[int] = (), api_key: Optional[str] = None, port: int = 0):
+        self.pages = pages
+        self.results_per_page = results_per_page
+        self.latency = latency
+        self.failures = list(failures)
+        self.api_key = api_key
+        self.attempts = Counter()
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v1/search"
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Заголовки и тело уходят отдельными пакетами - без Nagle ответ не ждет ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with api._lock:
+                    api._in_flight += 1
+                    api.max_in_flight = max(api.max_in_flight, api._in_flight)
+                try:
+                    status, body, headers = api.respond(self.path, self.headers.get("Authorization"))
+                    if api.latency:
+                        time.sleep(api.latency)
+                    payload = json.dumps(body).encode("utf-8")
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(payload)
+                finally:
+                    with api._lock:
+                        api._in_flight -= 1
+
+        return Handler
+
+    def respond(self, path: str, authorization: Optional[str]):
+        """
+        Ответ на запрос: (код, тело JSON, заголовки)
+        """
+        url = urlparse(path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path != "/api/v1/search":
+            return 404, {"error": "not found"}, {}
+        if self.api_key is not None and authorization != f"Bearer {self.api_key}":
+            return 401, {"error": "invalid api key"}, {}
+
+        query = params.get("q", "")
+        page = int(params.get("page", 1))
+        with self._lock:
+            self.attempts[(query, page)] += 1
+            attempt = self.attempts[(query, page)]
+        if attempt <= len(self.failures):
+            status = self.failures[attempt - 1]
+            headers = {"Retry-After": "0.05"} if status == 429 else {}
+            return status, {"error": "temporarily unavailable"}, headers
+
+        if page > self.pages:
+            return 200, {"organic_results": []}, {}
+        first = (page - 1) * self.results_per_page + 1
+        results = [
+            {
+                "position": position,
+                "title": f"{query} - результат {position}",
+                "link": f"https://example.com/{query.replace(' ', '-')}/{position}",
+                "displayed_link": "example.com",
+                "snippet": f"Описание результата {position} по запросу {query}",
+            }
+            for position in range(first, first + self.results_per_page)
+        ]
+        pagination = {"current": page}
+        if page < self.pages:
+            pagination["next"] = f"{self.url}?q={query}&page={page + 1}"
+        return 200, {"organic_results": results, "pagination": pagination}, {}
+
+    def start(self) -> "MockSearchAPI":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockSearchAPI":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Заглушка searchapi.io")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="Только запустить сервер на порту")
+    args = parser.parse_args()
+
+    if args.serve is not None:
+        with MockSearchAPI(port=args.serve, latency=0.05, failures=(429,)) as api:
+            print(f"🌐 Заглушка API: {api.url} (Ctrl+C - остановка)")
+            try:
+                threading.Event().wait()
+            except KeyboardInterrupt:
+                pass
+        raise SystemExit
+
+    # Тестовый запуск: пакетный поиск против заглушки со сбоями и задержкой
+    import os
+    import tempfile
+    import pandas as pd
+    from batch_search import RetryPolicy, run_batch
+    from response_cache import ResponseCache
+
+    queries = [f"query {i}" for i in range(40)]
+    retry = RetryPolicy(attempts=4, backoff=0.01)
+    with tempfile.TemporaryDirectory() as tmp:
+        with MockSearchAPI(pages=3, latency=0.05, failures=(429, 503), api_key="test") as api:
+            stats = run_batch(queries, "test", os.path.join(tmp, "results.parquet"),
+                              base_url=api.url, concurrency=10, rate=200, max_pages=5,
+                              retry=retry)
+            results = pd.read_parquet(os.path.join(tmp, "results.parquet"))
+            assert not stats.failed
+            assert len(results) == stats.rows == 40 * 3 * 10
+            assert stats.retries == 2 * 40 * 3
+            assert not results.duplicated(["query", "position"]).any()
+            assert 1 < api.max_in_flight <= 10
+
+        # Без сбоев: те же 20 запросов последовательно и по 10 одновременно
+        with MockSearchAPI(pages=3, latency=0.05, api_key="test") as api:
+            sequential = run_batch(queries[:20], "test", os.path.join(tmp, "sequential.csv"),
+                                   base_url=api.url, concurrency=1, rate=1000, max_pages=5)
+            assert api.max_in_flight == 1
+            concurrent = run_batch(queries[:20], "test", os.path.join(tmp, "concurrent.csv"),
+                                   base_url=api.url, concurrency=10, rate=1000, max_pages=5)
+            assert pd.read_csv(os.path.join(tmp, "concurrent.csv")).shape[0] == concurrent.rows == 600
+            assert concurrent.seconds < sequential.seconds
+
+        # Ограничение частоты: 20 запросов при 10 в секунду без запаса - не меньше ~2 с
+        with MockSearchAPI(pages=1) as api:
+            limited = run_batch(queries[:20], "test", os.path.join(tmp, "limited.csv"),
+                                base_url=api.url, concurrency=10, rate=10, burst=1)
+            assert limited.seconds >= 1.8
+
+        # Запрос, исчерпавший попытки, не прерывает остальные
+        with MockSearchAPI(pages=1, failures=(503, 503, 503)) as api:
+            failing = run_batch(queries[:3], "test", os.path.join(tmp, "failed.csv"),
+                                base_url=api.url, retry=RetryPolicy(attempts=2, backoff=0.01))
+            assert len(failing.failed) == 3 and failing.rows == 0
+
+        # Повторный прогон с кэшем ответов не обращается к API
+        cache = ResponseCache(os.path.join(tmp, "responses.sqlite"))
+        with MockSearchAPI(pages=2) as api:
+            first = run_batch(queries[:5], "test", os.path.join(tmp, "cached.csv"),
+                              base_url=api.url, max_pages=5, cache=cache)
+            second = run_batch(queries[:5], "test", os.path.join(tmp, "cached.csv"),
+                               base_url=api.url, max_pages=5, cache=cache)
+            assert first.requests == sum(api.attempts.values()) == 5 * 2
+            assert second.requests == 0 and second.cached == 5 * 2
+            assert second.rows == first.rows == 5 * 2 * 10
+            # Ответы заглушки не попадают в кэш под ключом настоящего API
+            assert cache.get("api", "google", queries[0], 1) is None
+        with MockSearchAPI(pages=2) as other:
+            third = run_batch(queries[:5], "test", os.path.join(tmp, "cached.csv"),
+                              base_url=other.url, max_pages=5, cache=cache)
+            assert third.cached == 0 and third.requests == 5 * 2
+        cache.close()
+
+    print(f"\n✅ Пакетный поиск: 60 страниц за {concurrent.seconds:.2f} с при 10 одновременных "
+          f"запросах против {sequential.seconds:.2f} с последовательно")
@@ -0,0 +1,127 @@
+"""
+Бенчмарк разбора страниц поиска на сохраненных HTML (fixtures/).
+
+Сравнивает прежний способ (полное дерево BeautifulSoup с html.parser) с
+разбором только блоков результатов: SoupStrainer с html.parser и lxml, и
+lxml с XPath без BeautifulSoup. Для каждого способа проверяется, что
+найдены те же результаты (позиции и ссылки), и выводится время разбора
+одной страницы (лучшее из нескольких повторов) и ускорение.
+
+Запуск:
+    python parse_benchmark.py
+    python parse_benchmark.py --repeat 50 fixtures/*.html
+"""
+
+import argparse
+import glob
+import os
+import time
+from functools import partial
+from typing import Callable, Dict, List, Sequence
+
+from bs4 import BeautifulSoup
+
+from scraper import _parse_lxml, _parse_soup, lxml
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def parse_results_legacy(html: str) -> List[Dict[str, str]]:
+    """
+    Прежний разбор из load_search_results_scraping: полное дерево страницы
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    results = []
+    for div in soup.find_all('div', class_='result'):
+        title_tag = div.find('a', class_='result__a')
+        snippet_tag = div.find('a', class_='result__snippet')
+        results.append({
+            'title': title_tag.get_text(strip=True) if title_tag else "N/A",
+            'link': title_tag.get('href') if title_tag else "N/A",
+            'snippet': snippet_tag.get_text(strip=True) if snippet_tag else "N/A",
+        })
+    return results
+
+
+def benchmark_parsers() -> Dict[str, Callable[[str], List[Dict[str, str]]]]:
+    """
+    Сравниваемые способы разбора (первый - базовый)
+    """
+    parsers = {
+        "BeautifulSoup, html.parser (прежний)": parse_results_legacy,
+        "SoupStrainer, html.parser": partial(_parse_soup, features="html.parser"),
+    }
+    if lxml is not None:
+        parsers["SoupStrainer, lxml"] = partial(_parse_soup, features="lxml")
+        parsers["lxml, XPath"] = _parse_lxml
+    return parsers
+
+
+def run_benchmark(paths: Sequence[str], repeat: int = 20, rounds: int = 3) -> List[Dict]:
+    """
+    Время разбора страниц каждым способом
+
+    Args:
+        paths: Сохраненные HTML страницы
+        repeat: Разборов всех страниц в одном замере
+        rounds: Замеров (берется лучший)
+
+    Returns:
+        Строки отчета: parser, ms_per_page, speedup, results
+
+    Raises:
+        AssertionError: Способ нашел не те результаты, что прежний
+    """
+    pages = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+
+    rows = []
+    expected = None
+    for name, parse in benchmark_parsers().items():
+        found = [parse(html) for html in pages]
+        links = [[r["link"] for r in results] for results in found]
+        if expected is None:
+            expected = links
+        assert links == expected, f"{name}: результаты отличаются от прежнего разбора"
+
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for html in pages:
+                    parse(html)
+            best = min(best, time.perf_counter() - start)
+        ms_per_page = best / (repeat * len(pages)) * 1000
+        rows.append({
+            "parser": name,
+            "ms_per_page": ms_per_page,
+            "speedup": rows[0]["ms_per_page"] / ms_per_page if rows else 1.0,
+            "results": sum(len(results) for results in found),
+        })
+    return rows
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк разбора страниц поиска")
+    parser.add_argument("paths", nargs="*", help="HTML страницы (по умолчанию fixtures/*.html)")
+    parser.add_argument("--repeat", type=int, default=20, help="Разборов страниц в замере")
+    parser.add_argument("--rounds", type=int, default=3, help="Замеров (берется лучший)")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html")))
+    if not paths:
+        raise SystemExit(f"❌ Нет HTML страниц в {FIXTURES_DIR}")
+    print(f"⏱  Разбор {len(paths)} страниц, {args.repeat} x {args.rounds} повторов\n")
+
+    rows = run_benchmark(paths, args.repeat, args.rounds)
+    print(f"   {'способ':38s} {'мс/страница':>12s} {'ускорение':>10s} {'результатов':>12s}")
+    for row in rows:
+        print(f"   {row['parser']:38s} {row['ms_per_page']:12.2f} {row['speedup']:9.1f}x "
+              f"{row['results']:12d}")
+    print("\n✅ Все способы нашли те же результаты")
+
+
+if __name__ == "__main__":
+    main()
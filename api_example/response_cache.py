@@ -0,0 +1,295 @@
+"""
+Постоянный кэш ответов поискового API и веб-скрапинга.
+
+Ответы хранятся в SQLite (data/cache/responses.sqlite в корне проекта) по
+ключу (источник, поисковик, запрос, страница). Для каждого источника задается
+свой срок жизни (TTL): результаты платного API можно хранить дольше, чем
+HTML страницы поиска. При превышении лимита записей или суммарного размера
+вытесняются давно не использованные записи (LRU). Счетчики попаданий,
+промахов и вытеснений хранятся в той же базе и накапливаются между запусками.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+# База кэша по умолчанию: <корень проекта>/data/cache/responses.sqlite
+DEFAULT_CACHE_PATH = os.environ.get(
+    "SEARCH_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                 "data", "cache", "responses.sqlite")
+)
+
+# Срок жизни ответов по источникам, с
+DEFAULT_TTLS = {
+    "api": 24 * 3600,
+    "scraping": 3600,
+}
+DEFAULT_TTL = 3600
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_MAX_BYTES = 200 * 1024 ** 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    source TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    query TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (source, engine, query, page)
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+CREATE TABLE IF NOT EXISTS counters (
+    source TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (source, name)
+);
+"""
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """
+    Счетчики кэша одного источника
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expired: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResponseCache:
+    """
+    Кэш ответов с TTL по источникам и вытеснением LRU.
+
+    Пример:
+        cache = ResponseCache()
+        body = cache.get_or_fetch("api", "google", "chatgpt", 1,
+                                  lambda: requests.get(url, params=params).text)
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttls: Optional[Dict[str, float]] = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Одно соединение на процесс; обращения из потоков идут под блокировкой
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def ttl(self, source: str) -> float:
+        return self.ttls.get(source, DEFAULT_TTL)
+
+    def _count(self, source: str, name: str, value: int = 1) -> None:
+        self._conn.execute(
+            "INSERT INTO counters (source, name, value) VALUES (?, ?, ?) "
+            "ON CONFLICT (source, name) DO UPDATE SET value = value + excluded.value",
+            (source, name, value),
+        )
+
+    def get(self, source: str, engine: str, query: str, page: int = 1) -> Optional[str]:
+        """
+        Сохраненный ответ, если он есть и не устарел
+
+        Args:
+            source: Источник ("api", "scraping")
+            engine: Поисковик
+            query: Поисковый запрос
+            page: Номер страницы
+
+        Returns:
+            Тело ответа или None
+        """
+        key = (source, engine, query, page)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, created_at FROM responses "
+                "WHERE source = ? AND engine = ? AND query = ? AND page = ?", key
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl(source):
+                self._conn.execute(
+                    "DELETE FROM responses WHERE source = ? AND engine = ? AND query = ? AND page = ?",
+                    key,
+                )
+                self._count(source, "expired")
+                row = None
+            if row is None:
+                self._count(source, "misses")
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? "
+                "WHERE source = ? AND engine = ? AND query = ? AND page = ?", (now, *key)
+            )
+            self._count(source, "hits")
+            return row[0]
+
+    def put(self, source: str, engine: str, query: str, page: int, body: str) -> None:
+        """
+        Сохраняет ответ и при необходимости вытесняет давно не использованные
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(source, engine, query, page, body, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (source, engine, query, page, body, len(body.encode("utf-8")), now, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        entries, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if entries <= self.max_entries and total <= self.max_bytes:
+            return
+
+        evicted = {}
+        rows = self._conn.execute(
+            "SELECT source, engine, query, page, size FROM responses ORDER BY accessed_at"
+        )
+        victims = []
+        for source, engine, query, page, size in rows:
+            if entries <= self.max_entries and total <= self.max_bytes:
+                break
+            victims.append((source, engine, query, page))
+            entries -= 1
+            total -= size
+            evicted[source] = evicted.get(source, 0) + 1
+        self._conn.executemany(
+            "DELETE FROM responses WHERE source = ? AND engine = ? AND query = ? AND page = ?",
+            victims,
+        )
+        for source, count in evicted.items():
+            self._count(source, "evictions", count)
+
+    def get_or_fetch(self, source: str, engine: str, query: str, page: int,
+                     fetch: Callable[[], str], refresh: bool = False) -> str:
+        """
+        Ответ из кэша или результат fetch(), который сохраняется в кэш
+
+        Args:
+            source: Источник ("api", "scraping")
+            engine: Поисковик
+            query: Поисковый запрос
+            page: Номер страницы
+            fetch: Загрузка ответа (исключение не кэшируется)
+            refresh: Не читать кэш, загрузить заново
+
+        Returns:
+            Тело ответа
+        """
+        if not refresh:
+            body = self.get(source, engine, query, page)
+            if body is not None:
+                return body
+        body = fetch()
+        self.put(source, engine, query, page, body)
+        return body
+
+    def stats(self) -> Dict[str, CacheStats]:
+        """
+        Накопленные счетчики по источникам
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT source, name, value FROM counters").fetchall()
+        counters: Dict[str, dict] = {}
+        for source, name, value in rows:
+            counters.setdefault(source, {})[name] = value
+        return {source: CacheStats(**values) for source, values in counters.items()}
+
+    def clear(self) -> None:
+        """
+        Удаляет все ответы и счетчики
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.execute("DELETE FROM counters")
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def print_cache_stats(cache: ResponseCache) -> None:
+    """
+    Выводит счетчики кэша по источникам
+    """
+    for source, s in sorted(cache.stats().items()):
+        print(f"   💾 Кэш {source}: попаданий {s.hits}, промахов {s.misses} "
+              f"({s.hit_rate:.0%}), устарело {s.expired}, вытеснено {s.evictions}")
+
+
+_default_cache: Optional[ResponseCache] = None
+
+
+def default_cache() -> ResponseCache:
+    """
+    Общий кэш для всех функций api_reader (создается при первом обращении)
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
+
+
+if __name__ == "__main__":
+    # Тестовый запуск: TTL, LRU и счетчики
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, "responses.sqlite"),
+                              ttls={"api": 60, "scraping": 0.2}, max_entries=3)
+        calls = []
+
+        def fetch(body):
+            calls.append(body)
+            return body
+
+        assert cache.get_or_fetch("api", "google", "chatgpt", 1, lambda: fetch("a1")) == "a1"
+        assert cache.get_or_fetch("api", "google", "chatgpt", 1, lambda: fetch("x")) == "a1"
+        assert cache.get_or_fetch("api", "google", "chatgpt", 2, lambda: fetch("a2")) == "a2"
+        assert calls == ["a1", "a2"]
+
+        # TTL источника: HTML устаревает быстрее
+        cache.put("scraping", "duckduckgo", "chatgpt", 1, "<html>")
+        time.sleep(0.3)
+        assert cache.get("scraping", "duckduckgo", "chatgpt", 1) is None
+        assert cache.get("api", "google", "chatgpt", 1) == "a1"
+
+        # LRU: при 4-й записи вытесняется давно не использованная (стр. 2)
+        cache.put("api", "google", "python", 1, "p1")
+        cache.put("api", "google", "pandas", 1, "d1")
+        assert cache.get("api", "google", "chatgpt", 2) is None
+        assert cache.get("api", "google", "chatgpt", 1) == "a1"
+
+        # Счетчики сохраняются между экземплярами
+        cache.close()
+        reopened = ResponseCache(os.path.join(tmp, "responses.sqlite"))
+        stats = reopened.stats()
+        assert stats["api"].hits == 3 and stats["api"].evictions == 1
+        assert stats["scraping"].expired == 1
+        print_cache_stats(reopened)
+        reopened.close()
+
+    print("✅ Кэш ответов работает")
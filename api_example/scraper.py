@@ -0,0 +1,283 @@
+"""
+Быстрый разбор страниц поиска DuckDuckGo (HTML версия) и постраничная загрузка.
+
+Вместо полного дерева всей страницы (BeautifulSoup с html.parser) разбираются
+только блоки результатов div.result:
+    - "lxml": lxml.html и XPath без построения объектов BeautifulSoup
+      (самый быстрый, нужен пакет lxml)
+    - "soup": BeautifulSoup с SoupStrainer - в дерево попадают только блоки
+      результатов (парсер lxml, если установлен, иначе html.parser)
+
+Страницы результатов загружаются одновременно в пуле потоков, а результаты
+отдаются генератором по порядку страниц, пока не набрано нужное количество.
+Страницы берутся из кэша ответов (response_cache.py), если он включен.
+"""
+
+import math
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+
+from response_cache import default_cache
+
+try:
+    import lxml.html
+except ImportError:  # lxml не обязателен: разбор через BeautifulSoup
+    lxml = None
+
+SEARCH_URL = "https://html.duckduckgo.com/html/"
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# Результатов на странице (смещение следующей страницы в параметре s)
+RESULTS_PER_PAGE = 10
+
+DEFAULT_PARSER = "lxml" if lxml is not None else "soup"
+
+# В дерево BeautifulSoup попадают только блоки результатов. При отборе во
+# время разбора class - еще целая строка "result results_links ...", поэтому
+# класс ищется регулярным выражением, а не class_="result"
+RESULT_STRAINER = SoupStrainer("div", class_=re.compile(r"(^|\s)result(\s|$)"))
+
+_RESULT_XPATH = "//div[contains(concat(' ', normalize-space(@class), ' '), ' result ')]"
+_TITLE_XPATH = ".//a[contains(concat(' ', normalize-space(@class), ' '), ' result__a ')]"
+_SNIPPET_XPATH = ".//a[contains(concat(' ', normalize-space(@class), ' '), ' result__snippet ')]"
+
+
+def _clean_text(text: str) -> str:
+    # Пробелы между тегами сохраняются: "<b>ChatGPT</b> helps" -> "ChatGPT helps"
+    return " ".join(text.split())
+
+
+def result_url(link: str) -> str:
+    """
+    Адрес результата: ссылки DuckDuckGo ведут через //duckduckgo.com/l/?uddg=<адрес>&rut=...
+    """
+    target = parse_qs(urlparse(link).query).get("uddg")
+    return target[0] if target else link
+
+
+def _result(title: Optional[str], link: Optional[str], snippet: Optional[str]) -> Dict[str, str]:
+    return {
+        "title": title if title is not None else "N/A",
+        "link": link if link is not None else "N/A",
+        "snippet": snippet if snippet is not None else "N/A",
+    }
+
+
+def _parse_lxml(html: str) -> List[Dict[str, str]]:
+    if not html.strip():
+        return []
+    results = []
+    for div in lxml.html.fromstring(html).xpath(_RESULT_XPATH):
+        title_tag = next(iter(div.xpath(_TITLE_XPATH)), None)
+        snippet_tag = next(iter(div.xpath(_SNIPPET_XPATH)), None)
+        results.append(_result(
+            _clean_text(title_tag.text_content()) if title_tag is not None else None,
+            title_tag.get("href") if title_tag is not None else None,
+            _clean_text(snippet_tag.text_content()) if snippet_tag is not None else None,
+        ))
+    return results
+
+
+def _parse_soup(html: str, features: Optional[str] = None) -> List[Dict[str, str]]:
+    features = features or ("lxml" if lxml is not None else "html.parser")
+    soup = BeautifulSoup(html, features, parse_only=RESULT_STRAINER)
+    results = []
+    for div in soup.find_all("div", class_="result"):
+        title_tag = div.find("a", class_="result__a")
+        snippet_tag = div.find("a", class_="result__snippet")
+        results.append(_result(
+            _clean_text(title_tag.get_text()) if title_tag else None,
+            title_tag.get("href") if title_tag else None,
+            _clean_text(snippet_tag.get_text()) if snippet_tag else None,
+        ))
+    return results
+
+
+PARSERS: Dict[str, Callable[[str], List[Dict[str, str]]]] = {
+    "lxml": _parse_lxml,
+    "soup": _parse_soup,
+}
+
+
+def parse_results(html: str, parser: str = DEFAULT_PARSER) -> List[Dict[str, str]]:
+    """
+    Результаты поиска со страницы DuckDuckGo
+
+    Args:
+        html: HTML страницы результатов
+        parser: "lxml" или "soup"
+
+    Returns:
+        Список словарей title, link, snippet в порядке на странице
+
+    Raises:
+        ValueError: Неизвестный парсер или lxml не установлен
+    """
+    if parser not in PARSERS:
+        raise ValueError(f"Неизвестный парсер: {parser!r} (доступны: {', '.join(PARSERS)})")
+    if parser == "lxml" and lxml is None:
+        raise ValueError("Парсер 'lxml' требует пакет lxml: pip install lxml")
+    return PARSERS[parser](html)
+
+
+def fetch_results_page(query: str, page: int = 1, session: Optional[requests.Session] = None,
+                       use_cache: bool = True, refresh: bool = False, timeout: float = 10) -> str:
+    """
+    HTML одной страницы результатов (из кэша или с сайта)
+
+    Args:
+        query: Поисковый запрос
+        page: Номер страницы (с 1)
+        session: Сессия requests (общий пул соединений)
+        use_cache: Использовать кэш ответов
+        refresh: Загрузить заново, не читая кэш
+        timeout: Таймаут запроса, с
+
+    Returns:
+        HTML страницы
+    """
+    params = {"q": query}
+    if page > 1:
+        params["s"] = str((page - 1) * RESULTS_PER_PAGE)
+
+    def fetch():
+        response = (session or requests).get(SEARCH_URL, params=params, headers=HEADERS,
+                                             timeout=timeout)
+        response.raise_for_status()
+        return response.text
+
+    if not use_cache:
+        return fetch()
+    return default_cache().get_or_fetch("scraping", "duckduckgo", query, page, fetch, refresh)
+
+
+def iter_search_results(query: str, num_results: int = 10, concurrency: int = 3,
+                        parser: str = DEFAULT_PARSER, max_pages: int = 10,
+                        fetch_page: Optional[Callable[[str, int], str]] = None,
+                        use_cache: bool = True, refresh: bool = False) -> Iterator[Dict]:
+    """
+    Результаты поиска по всем страницам по мере загрузки
+
+    Одновременно загружаются до concurrency страниц вперед; результаты
+    отдаются по порядку страниц. Загрузка прекращается, когда набрано
+    num_results результатов, страница пуста или прочитано max_pages страниц.
+    Результаты, повторившиеся на следующих страницах (тот же адрес
+    result_url), пропускаются.
+
+    Args:
+        query: Поисковый запрос
+        num_results: Сколько результатов нужно
+        concurrency: Страниц, загружаемых одновременно
+        parser: Парсер страниц ("lxml" или "soup")
+        max_pages: Максимум страниц
+        fetch_page: Загрузка страницы fetch_page(query, page) -> HTML
+            (по умолчанию fetch_results_page)
+        use_cache: Использовать кэш ответов
+        refresh: Загрузить страницы заново, не читая кэш
+
+    Yields:
+        Словари position, title, link, snippet, source
+    """
+    if num_results <= 0:
+        return
+    session = None
+    if fetch_page is None:
+        session = requests.Session()
+        fetch_page = partial(fetch_results_page, session=session, use_cache=use_cache,
+                             refresh=refresh)
+
+    window = max(1, min(concurrency, max_pages, math.ceil(num_results / RESULTS_PER_PAGE)))
+    pool = ThreadPoolExecutor(max_workers=window)
+    pending = deque()
+    next_page = 1
+    seen = set()
+    position = 0
+    try:
+        while len(pending) < window:
+            pending.append(pool.submit(fetch_page, query, next_page))
+            next_page += 1
+
+        while pending:
+            results = parse_results(pending.popleft().result(), parser)
+            if not results:
+                return
+            for result in results:
+                url = result_url(result["link"])
+                if url in seen:
+                    continue
+                seen.add(url)
+                position += 1
+                yield {"position": position, **result, "source": "Web Scraping"}
+                if position >= num_results:
+                    return
+            if next_page <= max_pages:
+                pending.append(pool.submit(fetch_page, query, next_page))
+                next_page += 1
+    finally:
+        # Лишние страницы, загрузка которых не началась, отменяются
+        pool.shutdown(wait=False, cancel_futures=True)
+        if session is not None:
+            session.close()
+
+
+if __name__ == "__main__":
+    # Тестовый запуск на сохраненных страницах (fixtures/)
+    import os
+    import threading
+    import time
+
+    fixtures_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+    pages = {}
+    for name in sorted(os.listdir(fixtures_dir)):
+        if name.startswith("duckduckgo_chatgpt_p"):
+            with open(os.path.join(fixtures_dir, name), encoding="utf-8") as f:
+                pages[int(name[len("duckduckgo_chatgpt_p"):-len(".html")])] = f.read()
+
+    # Оба парсера дают одинаковые результаты
+    for html in pages.values():
+        assert parse_results(html, "lxml") == parse_results(html, "soup")
+    first = parse_results(pages[1])
+    assert len(first) == 11 and all(r["link"].startswith("//duckduckgo.com/l/") for r in first)
+    assert "  " not in first[1]["snippet"] and "ChatGPT " in "".join(r["snippet"] for r in first)
+
+    requested = []
+    in_flight = [0, 0]
+    lock = threading.Lock()
+
+    def fake_fetch(query, page):
+        with lock:
+            requested.append(page)
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight[1], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return pages.get(page, "")
+
+    # 25 результатов: 3 страницы загружаются одновременно, повтор со 2-й страницы пропущен
+    results = list(iter_search_results("chatgpt", 25, concurrency=3, fetch_page=fake_fetch))
+    assert [r["position"] for r in results] == list(range(1, 26))
+    assert len({result_url(r["link"]) for r in results}) == 25
+    assert in_flight[1] == 3
+
+    # Больше результатов, чем есть: остановка на пустой странице
+    requested.clear()
+    results = list(iter_search_results("chatgpt", 100, concurrency=2, fetch_page=fake_fetch))
+    assert len(results) == 30 and 4 in requested
+
+    # Генератор не загружает лишние страницы
+    requested.clear()
+    assert len(list(iter_search_results("chatgpt", 5, fetch_page=fake_fetch))) == 5
+    assert requested == [1]
+
+    print("✅ Разбор и постраничная загрузка результатов работают")
@@ -0,0 +1,262 @@
+"""
+Генератор синтетического датасета вакансий.
+
+Повторяет схему исходного CSV (etl/schema.py) и его особенности: небольшое
+число стран с преобладанием США, тысячи названий вакансий и десятки тысяч
+работодателей, зарплата в основном пустая или записана текстом, дата
+публикации заполнена редко, часть строк - точные дубликаты. Доли пропусков
+и дубликатов задаются параметрами. Данные генерируются порциями, поэтому
+CSV на 10 млн строк пишется с ограниченным потреблением памяти.
+
+Запуск:
+    python -m benchmarks.generate 1000000 data/bench/jobs_1m.csv
+"""
+
+import argparse
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+# Порция генерации
+GENERATE_CHUNK_ROWS = 500_000
+
+_COUNTRIES = [
+    ("United States of America", "US", 0.93),
+    ("United Kingdom", "GB", 0.03),
+    ("Canada", "CA", 0.02),
+    ("Germany", "DE", 0.01),
+    ("India", "IN", 0.01),
+]
+_CITIES = ["New York, NY", "Austin, TX", "Chicago, IL", "Seattle, WA", "Boston, MA",
+           "Denver, CO", "Atlanta, GA", "Phoenix, AZ", "Dallas, TX", "San Jose, CA"]
+_SENIORITY = ["", "Senior ", "Junior ", "Lead ", "Principal ", "Staff ", "Assistant "]
+_ROLES = ["Software Engineer", "Registered Nurse", "Truck Driver", "Sales Associate",
+          "Accountant", "Data Analyst", "Customer Service Representative", "Mechanic",
+          "Project Manager", "Pharmacist", "Teacher", "Electrician", "Cashier",
+          "Marketing Manager", "Physical Therapist", "Web Developer", "Warehouse Worker"]
+_ORG_PREFIXES = ["Acme", "Globex", "Initech", "Umbrella", "Stark", "Wayne", "Hooli",
+                 "Vandelay", "Soylent", "Cyberdyne", "Tyrell", "Wonka", "Gringotts"]
+_ORG_SUFFIXES = ["Inc.", "LLC", "Group", "Health", "Logistics", "Systems", "Partners"]
+_JOB_TYPES = ["Full Time Employee", "Full Time", "Part Time Employee", "Contract",
+              "Full Time, Temporary/Contract/Project", "Per Diem"]
+_SECTORS = ["IT/Software Development", "Health Care", "Sales/Retail/Business Development",
+            "Accounting/Finance/Insurance", "Customer Support/Client Care",
+            "Logistics/Transportation", "Education/Training", "Installation/Maintenance/Repair"]
+_SALARY_TEXT = ["$50,000.00 /year", "$15.00 /hour", "Competitive", "DOE",
+                "$40,000.00 - $60,000.00 /year", "Up to $25.00 /hour"]
+_DESCRIPTION_WORDS = ("experience team work customer support required skills ability "
+                      "benefits position opportunity company service management "
+                      "responsible training including development knowledge").split()
+
+
+@dataclass
+class GeneratorConfig:
+    """
+    Параметры синтетического датасета
+
+    Attributes:
+        duplicate_rate: Доля строк - точных копий других строк
+        null_rates: Доля пропусков по столбцам
+        salary_numeric_rate: Доля заполненных зарплат, записанных числом
+        job_titles: Количество различных названий вакансий
+        organizations: Количество различных работодателей
+        description_words: Длина описания вакансии в словах
+        seed: Зерно генератора
+    """
+    duplicate_rate: float = 0.02
+    null_rates: Dict[str, float] = field(default_factory=lambda: {
+        "country": 0.0,
+        "date_added": 0.95,
+        "job_description": 0.01,
+        "job_type": 0.08,
+        "organization": 0.03,
+        "salary": 0.83,
+        "sector": 0.24,
+    })
+    salary_numeric_rate: float = 0.4
+    job_titles: int = 5_000
+    organizations: int = 30_000
+    description_words: int = 40
+    seed: int = 0
+
+
+def _vocabulary(rng: np.random.Generator, config: GeneratorConfig):
+    """
+    Справочники названий вакансий и работодателей нужной мощности
+    """
+    titles = [
+        f"{rng.choice(_SENIORITY)}{rng.choice(_ROLES)}"
+        + (f" - {rng.choice(_CITIES).split(',')[0]}" if i >= len(_ROLES) * len(_SENIORITY) else "")
+        + (f" #{i}" if i >= len(_ROLES) * len(_SENIORITY) * 4 else "")
+        for i in range(config.job_titles)
+    ]
+    organizations = [
+        f"{rng.choice(_ORG_PREFIXES)} {rng.choice(_ORG_SUFFIXES)}"
+        + (f" {i}" if i >= len(_ORG_PREFIXES) * len(_ORG_SUFFIXES) else "")
+        for i in range(config.organizations)
+    ]
+    descriptions = [" ".join(rng.choice(_DESCRIPTION_WORDS, config.description_words))
+                    for _ in range(2_000)]
+    return np.array(titles, dtype=object), np.array(organizations, dtype=object), \
+        np.array(descriptions, dtype=object)
+
+
+def _zipf_choice(rng: np.random.Generator, values: np.ndarray, size: int) -> np.ndarray:
+    """
+    Выбор с тяжелым хвостом: несколько значений встречаются часто, большинство - редко
+    """
+    ranks = np.minimum(rng.zipf(1.3, size) - 1, len(values) - 1)
+    return values[ranks]
+
+
+def _with_nulls(rng: np.random.Generator, values: np.ndarray, rate: float) -> np.ndarray:
+    values = values.astype(object)
+    if rate > 0:
+        values[rng.random(len(values)) < rate] = None
+    return values
+
+
+def generate_chunk(n_rows: int, offset: int = 0, config: Optional[GeneratorConfig] = None,
+                   rng: Optional[np.random.Generator] = None, vocabulary=None) -> pd.DataFrame:
+    """
+    Генерирует порцию сырых строк в текстовом виде, как в исходном CSV
+
+    Args:
+        n_rows: Количество строк
+        offset: Номер первой строки (для уникальных uniq_id между порциями)
+        config: Параметры датасета
+        rng: Генератор случайных чисел
+        vocabulary: Справочники из _vocabulary (создаются, если не заданы)
+
+    Returns:
+        DataFrame со столбцами исходного CSV (все значения - строки или None)
+    """
+    config = config or GeneratorConfig()
+    rng = rng or np.random.default_rng(config.seed)
+    titles, organizations, descriptions = vocabulary or _vocabulary(rng, config)
+    nulls = config.null_rates
+
+    countries = np.array([c[0] for c in _COUNTRIES], dtype=object)
+    codes = np.array([c[1] for c in _COUNTRIES], dtype=object)
+    country_idx = rng.choice(len(_COUNTRIES), n_rows, p=[c[2] for c in _COUNTRIES])
+
+    numbers = np.arange(offset, offset + n_rows, dtype=np.uint64)
+    # 32 шестнадцатеричных символа, как md5 в исходных данных
+    uniq_id = np.char.add(
+        np.char.mod("%016x", numbers * np.uint64(0x9E3779B97F4A7C15)),
+        np.char.mod("%016x", numbers ^ np.uint64(0xA5A5A5A5A5A5A5A5)),
+    ).astype(object)
+
+    days = rng.integers(0, 730, n_rows)
+    dates = pd.Timestamp("2016-01-01") + pd.to_timedelta(days, unit="D")
+    date_text = (dates.month.astype(str) + "/" + dates.day.astype(str) + "/"
+                 + dates.year.astype(str)).to_numpy(dtype=object)
+
+    salary_numeric = np.char.mod("%.2f", np.round(rng.lognormal(10.8, 0.4, n_rows), -2)).astype(object)
+    salary_text = rng.choice(np.array(_SALARY_TEXT, dtype=object), n_rows)
+    salary = np.where(rng.random(n_rows) < config.salary_numeric_rate, salary_numeric, salary_text)
+
+    df = pd.DataFrame({
+        "country": _with_nulls(rng, countries[country_idx], nulls.get("country", 0)),
+        "country_code": codes[country_idx],
+        "date_added": _with_nulls(rng, date_text, nulls.get("date_added", 0)),
+        "has_expired": np.where(rng.random(n_rows) < 0.01, "Yes", "No").astype(object),
+        "job_board": "jobs.monster.com",
+        "job_description": _with_nulls(rng, rng.choice(descriptions, n_rows),
+                                       nulls.get("job_description", 0)),
+        "job_title": _zipf_choice(rng, titles, n_rows),
+        "job_type": _with_nulls(rng, rng.choice(np.array(_JOB_TYPES, dtype=object), n_rows),
+                                nulls.get("job_type", 0)),
+        "location": rng.choice(np.array(_CITIES, dtype=object), n_rows),
+        "organization": _with_nulls(rng, _zipf_choice(rng, organizations, n_rows),
+                                    nulls.get("organization", 0)),
+        "page_url": np.char.add("http://jobview.monster.com/job-", uniq_id.astype(str)).astype(object),
+        "salary": _with_nulls(rng, salary, nulls.get("salary", 0)),
+        "sector": _with_nulls(rng, rng.choice(np.array(_SECTORS, dtype=object), n_rows),
+                              nulls.get("sector", 0)),
+        "uniq_id": uniq_id,
+    })
+
+    # Точные дубликаты: часть строк заменяется копиями других строк порции
+    n_duplicates = int(n_rows * config.duplicate_rate)
+    if n_duplicates:
+        targets = rng.choice(n_rows, n_duplicates, replace=False)
+        sources = rng.integers(0, n_rows, n_duplicates)
+        df.iloc[targets] = df.iloc[sources].to_numpy()
+
+    return df
+
+
+def iter_jobs(n_rows: int, config: Optional[GeneratorConfig] = None,
+              chunk_rows: int = GENERATE_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Генерирует датасет порциями
+
+    Args:
+        n_rows: Всего строк
+        config: Параметры датасета
+        chunk_rows: Строк в порции
+
+    Yields:
+        Порции сырых строк
+    """
+    config = config or GeneratorConfig()
+    rng = np.random.default_rng(config.seed)
+    vocabulary = _vocabulary(rng, config)
+    for offset in range(0, n_rows, chunk_rows):
+        yield generate_chunk(min(chunk_rows, n_rows - offset), offset, config, rng, vocabulary)
+
+
+def generate_jobs(n_rows: int, config: Optional[GeneratorConfig] = None) -> pd.DataFrame:
+    """
+    Генерирует датасет целиком в памяти
+
+    Args:
+        n_rows: Количество строк
+        config: Параметры датасета
+
+    Returns:
+        DataFrame сырых строк
+    """
+    return pd.concat(list(iter_jobs(n_rows, config)), ignore_index=True)
+
+
+def write_jobs_csv(path: str, n_rows: int, config: Optional[GeneratorConfig] = None) -> str:
+    """
+    Записывает синтетический датасет в CSV (порциями)
+
+    Args:
+        path: Путь к CSV файлу
+        n_rows: Количество строк
+        config: Параметры датасета
+
+    Returns:
+        Путь к файлу
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".part"
+    for i, chunk in enumerate(iter_jobs(n_rows, config)):
+        chunk.to_csv(tmp_path, index=False, mode="w" if i == 0 else "a", header=i == 0)
+    os.replace(tmp_path, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генератор синтетического датасета вакансий")
+    parser.add_argument("rows", type=int, help="Количество строк")
+    parser.add_argument("path", help="Путь к CSV файлу")
+    parser.add_argument("--seed", type=int, default=0, help="Зерно генератора (по умолчанию: 0)")
+    parser.add_argument("--duplicate-rate", type=float, default=0.02,
+                        help="Доля точных дубликатов (по умолчанию: 0.02)")
+    args = parser.parse_args()
+
+    config = GeneratorConfig(seed=args.seed, duplicate_rate=args.duplicate_rate)
+    write_jobs_csv(args.path, args.rows, config)
+    print(f"✅ Сгенерировано {args.rows} строк: {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Набор бенчмарков этапов ETL.
+
+Для каждого размера синтетического датасета (10k, 1m, 10m строк) замеряются
+этапы пайплайна и их подшаги (через etl.profiling): extract_data,
+transform_data, валидация правилами TRANSFORMED_RULES, load_to_parquet,
+сжатый CSV (etl.export), секционированный датасет и SQL приемники - SQLite
+как локальная замена БД и PostgreSQL через COPY (если задан ETL_DB_DSN или
+--pg-dsn). Результаты сравниваются с сохраненным baseline.json; замедление
+больше допуска считается регрессией (код возврата 1).
+
+Запуск:
+    python -m benchmarks.run --sizes 10k,1m
+    python -m benchmarks.run --sizes 10k,1m --update-baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from benchmarks.generate import write_jobs_csv  # noqa: E402
+from etl.bulk import copy_dataframe  # noqa: E402
+from etl.dataset import write_dataset  # noqa: E402
+from etl.db import DSN_ENV_VAR, get_engine  # noqa: E402
+from etl.extract import extract_data  # noqa: E402
+from etl.load import load_to_csv, load_to_parquet  # noqa: E402
+from etl.options import DATA_DIR  # noqa: E402
+from etl.profiling import Profiler, stage  # noqa: E402
+from etl.transform import transform_data  # noqa: E402
+from etl.validate import TRANSFORMED_RULES, validate  # noqa: E402
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+DEFAULT_SIZES = "10k,1m"
+
+BENCH_DIR = os.path.join(DATA_DIR, "bench")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Регрессия: медленнее baseline больше чем на TOLERANCE и больше чем на MIN_DELTA_S
+# (абсолютный порог отсекает шум на коротких этапах)
+DEFAULT_TOLERANCE = 0.25
+MIN_DELTA_S = 0.25
+
+
+def dataset_path(size: str, bench_dir: str = BENCH_DIR) -> str:
+    """
+    Путь к синтетическому CSV размера size (генерируется при первом обращении)
+    """
+    path = os.path.join(bench_dir, f"jobs_{size}.csv")
+    if not os.path.exists(path):
+        print(f"   генерация {SIZES[size]:,} строк -> {path}")
+        write_jobs_csv(path, SIZES[size])
+    return path
+
+
+def run_pipeline(csv_path: str, work_dir: str, pg_dsn: Optional[str]) -> None:
+    """
+    Один прогон всех этапов; метрики собирает активный Profiler
+    """
+    quiet = contextlib.redirect_stdout(io.StringIO())
+
+    with quiet:
+        with stage("extract"):
+            staging_path = extract_data(csv_path, output_dir=work_dir, use_cache=False)
+        with stage("transform"):
+            df = transform_data(staging_path, output_dir=work_dir)
+        with stage("validate") as step:
+            step.rows_in = len(df)
+            validate(df, TRANSFORMED_RULES)
+        with stage("load.parquet") as step:
+            step.wrote_file(load_to_parquet(df, work_dir))
+        with stage("load.csv") as step:
+            step.wrote_file(load_to_csv(df, work_dir))
+        with stage("load.dataset") as step:
+            step.wrote_file(write_dataset(df, os.path.join(work_dir, "processed_data")))
+
+        # SQLite: локальная замена БД для построчной загрузки to_sql
+        sqlite_path = os.path.join(work_dir, "bench.sqlite")
+        engine = create_engine(f"sqlite:///{sqlite_path}")
+        with stage("load.sqlite") as step:
+            df.to_sql("bench_jobs", engine, if_exists="replace", index=False, chunksize=50_000)
+            step.rows_in = len(df)
+            step.wrote_file(sqlite_path)
+        engine.dispose()
+
+        if pg_dsn:
+            with stage("load.postgres") as step:
+                with get_engine(pg_dsn).begin() as conn:
+                    step.rows_out = copy_dataframe(df, conn, "bench_jobs", mode="replace")
+            with get_engine(pg_dsn).begin() as conn:
+                conn.execute(text('DROP TABLE IF EXISTS public."bench_jobs"'))
+
+
+def bench_size(size: str, repeat: int, pg_dsn: Optional[str],
+               bench_dir: str = BENCH_DIR) -> Dict[str, dict]:
+    """
+    Замеряет все этапы на датасете size; для каждого этапа берется лучший прогон
+
+    Returns:
+        Этап -> метрики (wall_s, cpu_s, peak_rss_bytes, rows_out, bytes_written)
+    """
+    csv_path = dataset_path(size, bench_dir)
+    best: Dict[str, dict] = {}
+
+    for _ in range(repeat):
+        work_dir = tempfile.mkdtemp(prefix=f"bench_{size}_", dir=bench_dir)
+        profiler = Profiler()
+        try:
+            with profiler.activate():
+                run_pipeline(csv_path, work_dir, pg_dsn)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        for r in profiler.records:
+            metrics = {
+                "wall_s": r.wall_s,
+                "cpu_s": r.cpu_s,
+                "peak_rss_bytes": r.peak_rss_bytes,
+                "rows_out": r.rows_out,
+                "bytes_written": r.bytes_written,
+            }
+            if r.stage not in best or metrics["wall_s"] < best[r.stage]["wall_s"]:
+                best[r.stage] = metrics
+
+    return best
+
+
+def compare(results: Dict[str, Dict[str, dict]], baseline: Dict[str, Dict[str, dict]],
+            tolerance: float) -> List[str]:
+    """
+    Печатает сравнение с baseline и возвращает список регрессий
+    """
+    regressions = []
+    for size, stages in results.items():
+        print(f"\n📊 {size} ({SIZES[size]:,} строк)")
+        print(f"   {'этап':28s} {'wall, с':>9s} {'baseline':>9s} {'изм.':>8s} {'пик RSS, МБ':>12s}")
+        for name, metrics in stages.items():
+            base = baseline.get(size, {}).get(name)
+            wall = metrics["wall_s"]
+            peak = f"{metrics['peak_rss_bytes'] / 2**20:.0f}" if metrics["peak_rss_bytes"] else "-"
+            if base:
+                change = (wall - base["wall_s"]) / base["wall_s"] if base["wall_s"] else 0.0
+                regressed = change > tolerance and wall - base["wall_s"] > MIN_DELTA_S
+                mark = " ❌" if regressed else ""
+                print(f"   {name:28s} {wall:9.3f} {base['wall_s']:9.3f} {change:+8.0%} {peak:>12s}{mark}")
+                if regressed:
+                    regressions.append(f"{size}/{name}: {base['wall_s']:.3f} -> {wall:.3f} с "
+                                       f"({change:+.0%})")
+            else:
+                print(f"   {name:28s} {wall:9.3f} {'-':>9s} {'':>8s} {peak:>12s}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки этапов ETL на синтетических данных")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"Размеры через запятую из {', '.join(SIZES)} (по умолчанию: {DEFAULT_SIZES})")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Прогонов на размер, берется лучший (по умолчанию: 1)")
+    parser.add_argument("--pg-dsn", default=os.environ.get(DSN_ENV_VAR),
+                        help=f"PostgreSQL для замера COPY (по умолчанию: ${DSN_ENV_VAR}, иначе пропуск)")
+    parser.add_argument("--baseline", default=BASELINE_PATH,
+                        help="Файл с эталонными результатами")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Сохранить результаты как новый baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Допустимое замедление (по умолчанию: {DEFAULT_TOLERANCE})")
+    parser.add_argument("--bench-dir", default=BENCH_DIR,
+                        help=f"Каталог для данных и результатов (по умолчанию: {BENCH_DIR})")
+    args = parser.parse_args()
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"неизвестные размеры: {', '.join(unknown)}")
+
+    os.makedirs(args.bench_dir, exist_ok=True)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+
+    results = {}
+    for size in sizes:
+        print(f"⏱️  Бенчмарк {size}...")
+        results[size] = bench_size(size, args.repeat, args.pg_dsn, args.bench_dir)
+
+    regressions = compare(results, baseline, args.tolerance)
+
+    report = {
+        "machine": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    results_path = os.path.join(args.bench_dir, "results.json")
+    with open(results_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n   Результаты: {results_path}")
+
+    if args.update_baseline:
+        merged = {**baseline, **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({**report, "results": merged}, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"✅ Baseline обновлен: {args.baseline}")
+    elif regressions:
+        print("\n❌ Регрессии производительности:")
+        for line in regressions:
+            print(f"   {line}")
+        sys.exit(1)
+    else:
+        print("\n✅ Регрессий нет")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Проверка времени запуска CLI ETL.
+
+Каждая команда CLI запускается с --help под python -X importtime: по отчету
+импорта считается время импорта модулей etl (вместе со всем, что они
+импортируют) и проверяется, что тяжелые зависимости (pandas, pyarrow,
+SQLAlchemy...) не загружаются. Превышение бюджета или загрузка тяжелого
+модуля считается регрессией (код возврата 1).
+
+Запуск:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --budget-ms 150 --repeat 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Команды, которые не должны загружать тяжелые зависимости
+COMMANDS = [
+    ["-c", "import etl"],
+    ["-m", "etl", "--help"],
+    ["-m", "etl", "run", "--help"],
+    ["-m", "etl", "extract", "--help"],
+    ["-m", "etl", "transform", "--help"],
+    ["-m", "etl", "load", "--help"],
+    ["-m", "etl.main", "--help"],
+]
+
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "sqlalchemy", "sqlite3", "requests", "psycopg2")
+
+# Бюджет на импорт модулей etl (до изменений --help импортировал их ~450 мс)
+DEFAULT_BUDGET_MS = 100.0
+
+
+def import_times(command: List[str]) -> Tuple[Dict[str, int], float]:
+    """
+    Запускает команду под -X importtime
+
+    Returns:
+        Модуль -> кумулятивное время импорта (мкс) и время работы команды (с)
+    """
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(
+        filter(None, [os.path.abspath(ROOT), os.environ.get("PYTHONPATH")]))}
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", *command], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall_s = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"Команда {' '.join(command)} завершилась с кодом {result.returncode}")
+
+    # Строки отчета: "import time: <собственное> | <кумулятивное> | <модуль>";
+    # отступ имени - глубина вложенности импорта
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name[1:].rstrip()] = int(cumulative)
+    return times, wall_s
+
+
+def check_startup(budget_ms: float = DEFAULT_BUDGET_MS, repeat: int = 3) -> List[str]:
+    """
+    Проверяет все команды и печатает время импорта
+
+    Args:
+        budget_ms: Бюджет на импорт модулей etl
+        repeat: Запусков каждой команды (берется лучший)
+
+    Returns:
+        Список регрессий
+    """
+    regressions = []
+    print(f"   {'команда':36s} {'импорт etl, мс':>15s} {'запуск, мс':>11s}")
+    for command in COMMANDS:
+        best_ms, best_wall = None, None
+        for _ in range(repeat):
+            times, wall_s = import_times(command)
+            # Модули etl, импортированные верхним уровнем (вложенные уже входят
+            # в их кумулятивное время)
+            etl_ms = sum(us for name, us in times.items()
+                         if name == "etl" or name.startswith("etl.")) / 1000
+            best_ms = etl_ms if best_ms is None else min(best_ms, etl_ms)
+            best_wall = wall_s if best_wall is None else min(best_wall, wall_s)
+
+        label = " ".join(command)
+        heavy = sorted(name.strip() for name in times if name.strip() in HEAVY_MODULES)
+        regressed = best_ms > budget_ms or heavy
+        mark = " ❌" if regressed else ""
+        print(f"   {label:36s} {best_ms:15.1f} {best_wall * 1000:11.0f}{mark}")
+        if heavy:
+            regressions.append(f"{label}: загружены {', '.join(heavy)}")
+        if best_ms > budget_ms:
+            regressions.append(f"{label}: импорт etl {best_ms:.1f} мс (бюджет {budget_ms:.0f} мс)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка времени запуска CLI ETL")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Бюджет на импорт модулей etl (по умолчанию: {DEFAULT_BUDGET_MS:.0f})")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Запусков каждой команды, берется лучший (по умолчанию: 3)")
+    args = parser.parse_args()
+
+    print("⏱️  Время запуска CLI (python -X importtime)...")
+    regressions = check_startup(args.budget_ms, args.repeat)
+    if regressions:
+        print("\n❌ Регрессии времени запуска:")
+        for line in regressions:
+            print(f"   {line}")
+        sys.exit(1)
+    print("\n✅ Регрессий нет")
+
+
+if __name__ == "__main__":
+    main()
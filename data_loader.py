@@ -1,61 +1,52 @@
-import pandas as pd
+from etl.cache import cached_download
+from etl.export import write_csv, write_feather
+from etl.schema import read_csv
+from etl.sinks import run_sinks
 
 # 1. Введите свой FILE_ID ниже
 FILE_ID = "17jS24dobHhStIKS0M1m9kdGf4qST3r35"
-file_url = f"https://drive.google.com/uc?export=download&id={FILE_ID}"
 
-try:
-    # 2. Считываем CSV-файл (разделитель — запятая)
-    raw_data = pd.read_csv(
-        file_url,
-        sep=",",
-        quotechar='"',
-        skipinitialspace=True,
-        encoding="utf-8",
-        on_bad_lines="skip"
-    )
-
-    print("Датасет успешно загружен.")
-    print(f"Размер датасета: {raw_data.shape[0]} строк, {raw_data.shape[1]} столбцов.")
-    print("\nПервые 10 строк датасета:")
-    print(raw_data.head(10))
-
-    # 3. Приведение типов под структуру вакансий
-    df = raw_data.copy()
+# Сжатие выходных файлов (etl/export.py): CSV - "gzip", "zstd" (нужен пакет
+# zstandard) или "none"; Feather - "lz4", "zstd" или "uncompressed".
+# Уровень None - по умолчанию для кодека
+CSV_CODEC = "gzip"
+CSV_LEVEL = None
+FEATHER_CODEC = "lz4"
+FEATHER_LEVEL = None
 
-    # Текстовые или категориальные поля
-    text_cols = [
-        "country", "country_code", "job_board", "job_title", "job_type", "location",
-        "organization", "page_url", "sector", "uniq_id"
-    ]
-    category_cols = ["has_expired", "job_type", "sector"]
+CSV_PATH = {"gzip": "dataset_converted.csv.gz",
+            "zstd": "dataset_converted.csv.zst"}.get(CSV_CODEC, "dataset_converted.csv")
+FEATHER_PATH = "dataset_converted.feather"
 
-    for col in text_cols:
-        if col in df.columns:
-            df[col] = df[col].astype("string")
-
-    for col in category_cols:
-        if col in df.columns:
-            df[col] = df[col].astype("category")
+try:
+    # 2. Скачиваем файл через общий кэш (data/cache): повторно он загружается,
+    #    только если изменился на Google Диске
+    cached = cached_download(FILE_ID)
 
-    # Числовые и идентификаторы (кроме uniq_id!):
-    for col in df.columns:
-        if col.lower() in ["salary"]:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+    # 3. Считываем CSV-файл (разделитель — запятая) сразу с типами из общей схемы
+    #    etl/schema.py: строки, категории, зарплата и дата приводятся при чтении
+    df = read_csv(cached.path)
 
-    # Дата
-    if "date_added" in df.columns:
-        df["date_added"] = pd.to_datetime(df["date_added"], errors="coerce")
+    print("Датасет успешно загружен.")
+    print(f"Размер датасета: {df.shape[0]} строк, {df.shape[1]} столбцов.")
+    print("\nПервые 10 строк датасета:")
+    print(df.head(10))
 
     print("\nТипы после приведения:")
     print(df.dtypes)
 
-    # 4. Сохраняем в feather и сжатый CSV
-    df.reset_index(drop=True).to_feather("dataset_converted.feather")
-    df.to_csv("dataset_converted.csv.gz", index=False, compression="gzip")
+    # 4. Сохраняем в feather и сжатый CSV одновременно (в пуле потоков);
+    #    CSV пишется порциями и сжимается блоками на всех ядрах
+    results = run_sinks(df, {
+        "feather": lambda data: write_feather(data, FEATHER_PATH, FEATHER_CODEC, FEATHER_LEVEL),
+        "csv": lambda data: write_csv(data, CSV_PATH, CSV_CODEC, CSV_LEVEL),
+    })
+    for result in results:
+        if not result.ok:
+            raise result.error
     print("\nФайлы сохранены:")
-    print(" - dataset_converted.feather")
-    print(" - dataset_converted.csv.gz")
+    print(f" - {FEATHER_PATH}")
+    print(f" - {CSV_PATH}")
 
 except Exception as e:
     print(f"Ошибка при загрузке файла: {e}")
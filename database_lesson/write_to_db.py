@@ -1,52 +1,29 @@
-import sqlite3
 import os
+import sys
 import pandas as pd
-from sqlalchemy import create_engine
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from etl.bulk import copy_dataframe  # noqa: E402
+from etl.db import get_engine as get_shared_engine, load_credentials  # noqa: E402
 
 
 def load_credentials_from_sqlite(db_path="creds.db"):
     """
-    Загружает учетные данные из SQLite базы данных creds.db
+    Загружает учетные данные из SQLite базы данных creds.db (один раз за процесс)
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute("SELECT url, port, user, pass FROM access;")
-    row = cursor.fetchone()
-    conn.close()
-
-    if not row:
-        raise Exception("Не найдены учетные данные в таблице access")
-
-    url, port, user, password = row
+    return load_credentials(db_path)
 
-    os.environ["DB_USER"] = user
-    os.environ["DB_PASSWORD"] = password
-    os.environ["DB_URL"] = url
-    os.environ["DB_PORT"] = str(port)
-    os.environ["DB_ROOT_BASE"] = "homeworks"
 
-
-def get_engine():
+def get_engine(db_path="creds.db"):
     """
-    Создает SQLAlchemy engine для подключения к PostgreSQL
+    Возвращает общий SQLAlchemy engine с пулом соединений к PostgreSQL
     """
-    user = os.getenv("DB_USER")
-    password = os.getenv("DB_PASSWORD")
-    url = os.getenv("DB_URL")
-    port = os.getenv("DB_PORT")
-    dbname = os.getenv("DB_ROOT_BASE")
-
-    if not all([user, password, url, port, dbname]):
-        raise Exception("Не все переменные среды заданы!")
-
-    engine_url = f"postgresql+psycopg2://{user}:{password}@{url}:{port}/{dbname}"
-    engine = create_engine(engine_url)
-    return engine
+    return get_shared_engine(creds_path=db_path)
 
 
 def load_and_write_data(engine, table_name):
     """
-    Загружает данные из feather файла и записывает в PostgreSQL
+    Загружает данные из feather файла и записывает в PostgreSQL через COPY
     """
     script_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -66,20 +43,13 @@ def load_and_write_data(engine, table_name):
         raise FileNotFoundError("Файл dataset_converted.feather не найден!")
 
     df = pd.read_feather(data_path)
-    df = df.head(100)
 
-    df.to_sql(
-        name=table_name,
-        con=engine,
-        schema="public",
-        if_exists="replace",
-        index=False
-    )
-    print(f"Данные успешно записаны в таблицу public.{table_name}")
+    with engine.begin() as conn:
+        rows = copy_dataframe(df, conn, table_name, schema="public", mode="replace")
+    print(f"Данные успешно записаны в таблицу public.{table_name} ({rows} строк)")
 
 
 if __name__ == "__main__":
-    load_credentials_from_sqlite()
     engine = get_engine()
     table_name = "demidova"
     load_and_write_data(engine, table_name)
@@ -0,0 +1,32 @@
+"""
+ETL пакет для обработки данных о вакансиях.
+
+Функции этапов импортируются лениво (PEP 562): import etl не загружает
+pandas, pyarrow и SQLAlchemy, пока функция этапа не понадобится.
+"""
+
+import importlib
+
+__version__ = "1.0.0"
+__author__ = "Demidova"
+
+# Функция -> модуль, из которого она импортируется при первом обращении
+_LAZY_ATTRS = {
+    'extract_data': '.extract',
+    'transform_data': '.transform',
+    'load_data': '.load',
+}
+
+__all__ = ['extract_data', 'transform_data', 'load_data']
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
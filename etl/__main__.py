@@ -0,0 +1,8 @@
+"""
+Запуск CLI: python -m etl {run,extract,transform,load} ...
+"""
+
+from etl.main import main
+
+if __name__ == "__main__":
+    main()
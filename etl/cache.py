@@ -0,0 +1,232 @@
+"""
+Модуль локального кэша загрузок с Google Drive.
+
+Файлы хранятся по SHA-256 содержимого (data/cache/blobs/<sha256>), индекс
+file_id -> {sha256, etag, last_modified, size, last_access} лежит в index.json.
+При повторном запросе выполняется условный GET (If-None-Match / If-Modified-Since);
+если сервер вернул 304 или файл с тем же хешем, загрузка считается неизменной.
+Кэш общий для etl.extract, data_loader.py и notebooks/EDA.ipynb.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+
+from .options import DATA_DIR
+
+# Каталог кэша по умолчанию: <каталог данных>/cache (не зависит от текущей директории)
+DEFAULT_CACHE_DIR = os.environ.get("ETL_CACHE_DIR", os.path.join(DATA_DIR, "cache"))
+
+# Максимальный суммарный размер файлов в кэше
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+@dataclass
+class CachedFile:
+    """
+    Результат обращения к кэшу
+
+    Attributes:
+        path: Путь к локальной копии файла
+        sha256: Хеш содержимого
+        changed: True, если содержимое отличается от предыдущей загрузки
+    """
+    path: str
+    sha256: str
+    changed: bool
+
+
+class DownloadCache:
+    """
+    Контентно-адресуемый кэш загрузок с ревалидацией и вытеснением по размеру
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 timeout: int = 60):
+        self.cache_dir = cache_dir
+        self.blobs_dir = os.path.join(cache_dir, "blobs")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        os.makedirs(self.blobs_dir, exist_ok=True)
+
+    def _load_index(self) -> dict:
+        if not os.path.exists(self.index_path):
+            return {}
+        with open(self.index_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_index(self, index: dict) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.blobs_dir, sha256)
+
+    def fetch(self, key: str, url: str, refresh: bool = False) -> CachedFile:
+        """
+        Возвращает локальную копию файла, при необходимости загружая его
+
+        Args:
+            key: Ключ кэша (Google Drive FILE_ID)
+            url: URL для загрузки
+            refresh: Игнорировать сохраненные ETag/Last-Modified и загрузить файл заново
+
+        Returns:
+            CachedFile с путем к локальной копии
+        """
+        index = self._load_index()
+        entry = index.get(key)
+        if entry and not os.path.exists(self._blob_path(entry["sha256"])):
+            entry = None
+
+        headers = {}
+        if entry and not refresh:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = requests.get(url, headers=headers, stream=True, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            if entry is None:
+                raise
+            print(f"⚠️  Источник недоступен ({e}), используется кэшированная копия")
+            return self._hit(index, key, changed=False)
+
+        with response:
+            if response.status_code == 304 and entry:
+                return self._hit(index, key, changed=False)
+
+            # Потоковая запись во временный файл с одновременным расчетом хеша
+            digest = hashlib.sha256()
+            size = 0
+            fd, tmp_path = tempfile.mkstemp(dir=self.blobs_dir, suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    for block in response.iter_content(DOWNLOAD_CHUNK_BYTES):
+                        digest.update(block)
+                        size += len(block)
+                        f.write(block)
+                sha256 = digest.hexdigest()
+                blob_path = self._blob_path(sha256)
+                if os.path.exists(blob_path):
+                    os.remove(tmp_path)
+                else:
+                    os.replace(tmp_path, blob_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        changed = entry is None or entry["sha256"] != sha256
+        index[key] = {
+            "sha256": sha256,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "size": size,
+        }
+        return self._hit(index, key, changed=changed)
+
+    def _hit(self, index: dict, key: str, changed: bool) -> CachedFile:
+        entry = index[key]
+        entry["last_access"] = time.time()
+        self._evict(index, keep=key)
+        self._save_index(index)
+        return CachedFile(self._blob_path(entry["sha256"]), entry["sha256"], changed)
+
+    def _evict(self, index: dict, keep: Optional[str] = None) -> None:
+        """
+        Вытесняет давно использованные записи, пока размер кэша больше max_bytes
+        """
+        # Один blob может принадлежать нескольким ключам: размер считается
+        # один раз и вычитается, когда вытеснен последний ключ blob
+        refs = Counter(entry["sha256"] for entry in index.values())
+        sizes = {entry["sha256"]: entry["size"] for entry in index.values()}
+        total = sum(sizes.values())
+
+        for key in sorted(index, key=lambda k: index[k].get("last_access", 0)):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            sha256 = index.pop(key)["sha256"]
+            refs[sha256] -= 1
+            if refs[sha256]:
+                continue
+            total -= sizes[sha256]
+            blob_path = self._blob_path(sha256)
+            # Blob мог быть удален вручную или не дописан - вытеснение не должно падать
+            if os.path.exists(blob_path):
+                os.remove(blob_path)
+
+    def clear(self) -> None:
+        """
+        Удаляет все файлы из кэша
+        """
+        index = self._load_index()
+        for entry in index.values():
+            blob_path = self._blob_path(entry["sha256"])
+            if os.path.exists(blob_path):
+                os.remove(blob_path)
+        self._save_index({})
+
+
+def cached_download(file_id: str, url: Optional[str] = None, refresh: bool = False,
+                    cache_dir: str = DEFAULT_CACHE_DIR,
+                    max_bytes: int = DEFAULT_MAX_BYTES) -> CachedFile:
+    """
+    Загружает файл с Google Drive через общий кэш
+
+    Args:
+        file_id: Google Drive FILE_ID (ключ кэша)
+        url: URL для загрузки (по умолчанию - ссылка Google Drive для file_id)
+        refresh: Принудительно загрузить файл заново
+        cache_dir: Каталог кэша
+        max_bytes: Максимальный размер кэша в байтах
+
+    Returns:
+        CachedFile с путем к локальной копии
+    """
+    if url is None:
+        url = f"https://drive.google.com/uc?export=download&id={file_id}"
+    return DownloadCache(cache_dir, max_bytes).fetch(file_id, url, refresh=refresh)
+
+
+if __name__ == "__main__":
+    # Тестовый запуск против локального HTTP сервера
+    import functools
+    import http.server
+    import threading
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src_dir = os.path.join(tmp, "src")
+        os.makedirs(src_dir)
+        with open(os.path.join(src_dir, "data.csv"), "w") as f:
+            f.write("job_title,country\nEngineer,USA\n")
+
+        handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=src_dir)
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/data.csv"
+
+        cache_dir = os.path.join(tmp, "cache")
+        first = cached_download("test", url, cache_dir=cache_dir)
+        second = cached_download("test", url, cache_dir=cache_dir)
+        server.shutdown()
+
+        assert first.changed and not second.changed and first.path == second.path
+        print("✅ Кэш загрузок работает: повторная загрузка не потребовалась")
@@ -0,0 +1,397 @@
+"""
+Модуль контрольных точек этапов ETL.
+
+Результат этапа сохраняется под ключом - SHA-256 от входных данных этапа
+(хеш источника или ключ предыдущего этапа), параметров, влияющих на
+результат, и версии кода этапа (хеш исходных файлов его модулей). Повторный
+запуск с теми же входами берет готовый результат вместо повторного
+выполнения, поэтому после сбоя загрузки в БД не нужно заново скачивать и
+трансформировать данные.
+
+Структура каталога (data/checkpoints):
+    <этап>/<ключ>.arrow - результат этапа (Arrow IPC, etl.staging)
+    <этап>/<ключ>.json  - метаданные; время изменения - время последнего
+                          использования (по нему работает очистка)
+
+Этап load результата в каталоге не хранит: его ключ записывается в сами
+хранилища (etl.load.loaded_checkpoint), и запись пропускается, только если
+текущее содержимое хранилища получено с этим ключом.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .files import set_default_mode
+from .options import DATA_DIR
+
+# Каталог контрольных точек по умолчанию: <каталог данных>/checkpoints
+DEFAULT_CHECKPOINT_DIR = os.environ.get("ETL_CHECKPOINT_DIR", os.path.join(DATA_DIR, "checkpoints"))
+
+# Очистка: записи, не использованные дольше срока, и давно использованные
+# записи сверх суммарного размера
+DEFAULT_MAX_AGE_DAYS = 14
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+
+# Версия формата ключей: изменение делает недействительными все записи
+CHECKPOINT_VERSION = 1
+
+STAGES = ("extract", "transform", "load")
+
+# Исходные файлы, от которых зависит результат этапа (относительно etl/)
+STAGE_SOURCES = {
+    "extract": ("extract.py", "schema.py", "validate.py", "staging.py"),
+    "transform": ("transform.py", "dedup.py", "parallel.py", "schema.py", "validate.py",
+                  "staging.py"),
+    "load": ("load.py", "bulk.py", "dataset.py", "db.py", "dtypes.py", "export.py", "schema.py",
+             "sinks.py", "validate.py"),
+}
+
+DATA_SUFFIX = ".arrow"
+META_SUFFIX = ".json"
+
+
+@lru_cache(maxsize=None)
+def code_version(stage: str) -> str:
+    """
+    Хеш исходных файлов модулей этапа (STAGE_SOURCES)
+    """
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for name in STAGE_SOURCES[stage]:
+        path = os.path.join(package_dir, name)
+        digest.update(name.encode())
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def stage_key(stage: str, inputs: Dict[str, Any]) -> str:
+    """
+    Ключ результата этапа
+
+    Args:
+        stage: Название этапа (STAGES)
+        inputs: Входные данные и параметры этапа (значения сериализуются в JSON)
+
+    Returns:
+        SHA-256 от версии формата, версии кода этапа и inputs
+    """
+    payload = json.dumps({
+        "version": CHECKPOINT_VERSION,
+        "stage": stage,
+        "code": code_version(stage),
+        "inputs": inputs,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """
+    Атомарно помещает src по пути dst: жесткая ссылка, если файлы на одном
+    диске, иначе копия
+
+    Файлы этапов (etl.staging.write_staging) записываются через временный
+    файл и os.replace, поэтому общая жесткая ссылка не изменится при
+    перезаписи data/raw или data/processed.
+    """
+    directory = os.path.dirname(dst) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        os.remove(tmp_path)
+        try:
+            os.link(src, tmp_path)
+        except OSError:
+            shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class CheckpointStore:
+    """
+    Контентно-адресуемое хранилище результатов этапов с очисткой по
+    возрасту и размеру
+    """
+
+    def __init__(self, root: str = DEFAULT_CHECKPOINT_DIR):
+        self.root = root
+
+    def _path(self, stage: str, key: str, suffix: str) -> str:
+        return os.path.join(self.root, stage, key + suffix)
+
+    def _write_meta(self, stage: str, key: str, meta: Dict[str, Any]) -> None:
+        directory = os.path.join(self.root, stage)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"stage": stage, "key": key, "created": time.time(), **meta},
+                      f, ensure_ascii=False, indent=2, default=str)
+        set_default_mode(tmp_path)
+        os.replace(tmp_path, self._path(stage, key, META_SUFFIX))
+
+    def _touch(self, meta_path: str) -> None:
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+
+    def has(self, stage: str, key: str) -> bool:
+        """
+        Есть ли запись; обновляет время последнего использования
+        """
+        meta_path = self._path(stage, key, META_SUFFIX)
+        if not os.path.exists(meta_path):
+            return False
+        self._touch(meta_path)
+        return True
+
+    def get(self, stage: str, key: str) -> Optional[str]:
+        """
+        Путь к результату этапа или None, если его нет
+
+        Метаданные записываются после файла данных, поэтому прерванная
+        запись не считается результатом.
+        """
+        data_path = self._path(stage, key, DATA_SUFFIX)
+        if not os.path.exists(data_path) or not self.has(stage, key):
+            return None
+        return data_path
+
+    def put(self, stage: str, key: str, path: str, **meta) -> str:
+        """
+        Сохраняет готовый файл результата этапа
+
+        Args:
+            stage: Название этапа
+            key: Ключ (stage_key)
+            path: Файл результата (сохраняется жесткой ссылкой или копией)
+            **meta: Дополнительные метаданные (строки, параметры)
+
+        Returns:
+            Путь к результату в хранилище
+        """
+        data_path = self._path(stage, key, DATA_SUFFIX)
+        _link_or_copy(path, data_path)
+        self._write_meta(stage, key, meta)
+        return data_path
+
+    def save(self, stage: str, key: str, write: Callable[[str], Any], **meta) -> str:
+        """
+        Записывает результат этапа функцией write(path) через временный файл
+
+        Returns:
+            Путь к результату в хранилище
+        """
+        directory = os.path.join(self.root, stage)
+        os.makedirs(directory, exist_ok=True)
+        data_path = self._path(stage, key, DATA_SUFFIX)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=DATA_SUFFIX + ".tmp")
+        os.close(fd)
+        try:
+            write(tmp_path)
+            # Результат восстанавливается жесткой ссылкой (restore) и получает эти права
+            set_default_mode(tmp_path)
+            os.replace(tmp_path, data_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._write_meta(stage, key, meta)
+        return data_path
+
+    def restore(self, stage: str, key: str, target: str) -> Optional[str]:
+        """
+        Помещает результат этапа по пути target (например, data/raw/raw_data.arrow)
+
+        Returns:
+            target или None, если результата нет
+        """
+        data_path = self.get(stage, key)
+        if data_path is None:
+            return None
+        _link_or_copy(data_path, target)
+        return target
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        Все записи: этап, ключ, размер (с файлом данных) и время последнего использования
+        """
+        result = []
+        for stage in sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []:
+            directory = os.path.join(self.root, stage)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if not name.endswith(META_SUFFIX):
+                    continue
+                key = name[:-len(META_SUFFIX)]
+                meta_path = os.path.join(directory, name)
+                data_path = self._path(stage, key, DATA_SUFFIX)
+                try:
+                    last_access = os.path.getmtime(meta_path)
+                    size = os.path.getsize(meta_path)
+                    if os.path.exists(data_path):
+                        size += os.path.getsize(data_path)
+                except OSError:
+                    continue
+                result.append({"stage": stage, "key": key, "size": size,
+                               "last_access": last_access})
+        return result
+
+    def _remove(self, stage: str, key: str) -> None:
+        # Сначала метаданные: запись без них уже не считается результатом
+        for suffix in (META_SUFFIX, DATA_SUFFIX):
+            path = self._path(stage, key, suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def gc(self, max_age_days: Optional[float] = DEFAULT_MAX_AGE_DAYS,
+           max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+           keep: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        """
+        Удаляет записи, не использованные дольше max_age_days, и затем давно
+        использованные записи, пока суммарный размер больше max_bytes
+
+        Args:
+            max_age_days: Срок хранения с последнего использования (None - без ограничения)
+            max_bytes: Максимальный суммарный размер (None - без ограничения)
+            keep: Ключи, которые не удаляются (записи текущего запуска)
+
+        Returns:
+            Удаленные записи
+        """
+        keep = set(keep)
+        entries = sorted(self.entries(), key=lambda e: e["last_access"])
+        removed = []
+
+        if max_age_days is not None:
+            deadline = time.time() - max_age_days * 86400
+            for entry in entries:
+                if entry["last_access"] < deadline and entry["key"] not in keep:
+                    removed.append(entry)
+
+        if max_bytes is not None:
+            total = sum(e["size"] for e in entries if e not in removed)
+            for entry in entries:
+                if total <= max_bytes:
+                    break
+                if entry in removed or entry["key"] in keep:
+                    continue
+                removed.append(entry)
+                total -= entry["size"]
+
+        for entry in removed:
+            self._remove(entry["stage"], entry["key"])
+        return removed
+
+    def clear(self) -> None:
+        """
+        Удаляет все записи
+        """
+        for entry in self.entries():
+            self._remove(entry["stage"], entry["key"])
+
+
+class RunCheckpoints:
+    """
+    Контрольные точки одного запуска ETL
+
+    Attributes:
+        store: Хранилище результатов этапов
+        force: Этапы, которые выполняются заново даже при наличии результата
+        keys: Этап -> ключ его результата в этом запуске (None - ключ
+            неизвестен, например, хеш источника без кэша загрузок)
+        used: Ключи, использованные в этом запуске (не удаляются при очистке)
+    """
+
+    def __init__(self, store: Optional[CheckpointStore] = None, force: Iterable[str] = ()):
+        self.store = store or CheckpointStore()
+        self.force = set(force)
+        self.keys: Dict[str, Optional[str]] = {}
+        self.used: List[str] = []
+
+    def key(self, stage: str, **inputs) -> str:
+        key = stage_key(stage, inputs)
+        self.used.append(key)
+        return key
+
+    def forced(self, stage: str) -> bool:
+        """
+        Выполнять ли этап заново: указан он или любой предыдущий этап
+        (результат предыдущего этапа пересчитывается, следующие зависят от него)
+        """
+        return any(name in self.force for name in STAGES[:STAGES.index(stage) + 1])
+
+    def gc(self, max_age_days: Optional[float] = DEFAULT_MAX_AGE_DAYS,
+           max_bytes: Optional[int] = DEFAULT_MAX_BYTES) -> List[Dict[str, Any]]:
+        return self.store.gc(max_age_days, max_bytes, keep=self.used)
+
+
+def parse_stages(value: str) -> List[str]:
+    """
+    Разбирает список этапов через запятую ("all" - все этапы)
+
+    Raises:
+        ValueError: Если этап неизвестен
+    """
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    if "all" in names:
+        return list(STAGES)
+    unknown = set(names) - set(STAGES)
+    if unknown:
+        raise ValueError(f"неизвестные этапы: {', '.join(sorted(unknown))} "
+                         f"(доступны: {', '.join(STAGES)}, all)")
+    return names
+
+
+if __name__ == "__main__":
+    # Тестовый запуск: ключи, сохранение, восстановление и очистка
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CheckpointStore(os.path.join(tmp, "checkpoints"))
+
+        key = stage_key("extract", {"source": "abc", "csv_engine": "c"})
+        assert key == stage_key("extract", {"csv_engine": "c", "source": "abc"})
+        assert key != stage_key("extract", {"source": "abc", "csv_engine": "pyarrow"})
+        assert key != stage_key("transform", {"source": "abc", "csv_engine": "c"})
+        assert store.get("extract", key) is None
+
+        source = os.path.join(tmp, "raw.arrow")
+        with open(source, "wb") as f:
+            f.write(b"x" * 1000)
+        saved = store.put("extract", key, source, rows=1)
+        assert store.get("extract", key) == saved
+
+        # Перезапись исходного файла через os.replace не меняет запись
+        with open(source + ".new", "wb") as f:
+            f.write(b"y" * 10)
+        os.replace(source + ".new", source)
+        restored = store.restore("extract", key, os.path.join(tmp, "restored.arrow"))
+        with open(restored, "rb") as f:
+            assert f.read() == b"x" * 1000
+
+        # Очистка: старая запись по возрасту, затем по размеру
+        old_key = stage_key("transform", {"raw": key})
+        store.save("transform", old_key, lambda path: open(path, "wb").write(b"z" * 5000))
+        old_meta = store._path("transform", old_key, META_SUFFIX)
+        os.utime(old_meta, (time.time() - 30 * 86400,) * 2)
+        removed = store.gc(max_age_days=7, max_bytes=None)
+        assert [e["key"] for e in removed] == [old_key]
+
+        extra_key = stage_key("extract", {"source": "def"})
+        store.save("extract", extra_key, lambda path: open(path, "wb").write(b"w" * 500))
+        removed = store.gc(max_age_days=None, max_bytes=1500, keep=[key])
+        assert [e["key"] for e in removed] == [extra_key]
+        assert store.get("extract", key) is not None
+
+    print("✅ Контрольные точки: ключи стабильны, результаты восстанавливаются, очистка работает")
@@ -0,0 +1,365 @@
+"""
+Модуль секционированного Parquet датасета.
+
+Данные раскладываются по каталогам в стиле Hive (country_code=US/added_month=2017-03/)
+и внутри секции сортируются по date_added. Категориальные столбцы пишутся со
+словарным кодированием, для всех столбцов сохраняется статистика min/max по
+row group. Читатель с фильтром по ключам секций открывает только нужные
+каталоги, а по остальным столбцам пропускает row group по статистике.
+
+Запись не оставляет датасет частично замененным: новые секции пишутся в
+<путь>.part, затем в журнал <путь>.journal.json записывается список
+заменяемых и новых каталогов; старые каталоги переносятся в <путь>.old и
+удаляются только после того, как все новые встали на место. Если процесс
+прервался, следующая запись доводит замену по журналу до конца, а
+<путь>.part без журнала (запись не завершена) удаляет.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from typing import List, Optional, Sequence, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .options import PROCESSED_DIR
+from .schema import ARROW_STRING, CATEGORY, COLUMNS
+
+# Производный столбец секционирования: месяц date_added в виде "ГГГГ-ММ"
+MONTH_COLUMN = "added_month"
+PARTITION_COLUMNS = ("country_code", MONTH_COLUMN)
+
+# Датасет по умолчанию (хранилище "dataset" в etl.load)
+DEFAULT_DATASET_PATH = os.path.join(PROCESSED_DIR, "processed_data")
+
+# Строк в одной row group (меньше - точнее отсечение, больше - лучше сжатие)
+DEFAULT_ROW_GROUP_ROWS = 128_000
+
+Filters = Union[ds.Expression, List[tuple], None]
+
+
+def _partitioning(partition_cols: Sequence[str]) -> ds.Partitioning:
+    """
+    Схема секционирования Hive; все ключи секций - строки
+    """
+    return ds.partitioning(pa.schema([(name, pa.string()) for name in partition_cols]),
+                           flavor="hive")
+
+
+def _to_arrow(df: pd.DataFrame, partition_cols: Sequence[str]) -> pa.Table:
+    """
+    Добавляет месяц публикации и упорядочивает строки для секций и статистики
+    """
+    if MONTH_COLUMN in partition_cols and MONTH_COLUMN not in df.columns:
+        df = df.assign(**{MONTH_COLUMN: df["date_added"].dt.strftime("%Y-%m").astype(ARROW_STRING)})
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for name in partition_cols:
+        table = table.set_column(table.schema.get_field_index(name), name,
+                                 table[name].cast(pa.string()))
+
+    # Сортировка сужает диапазоны min/max в row group
+    sort_keys = [(name, "ascending") for name in partition_cols]
+    if "date_added" in table.column_names:
+        sort_keys.append(("date_added", "ascending"))
+    return table.sort_by(sort_keys)
+
+
+def _write(table: pa.Table, path: str, partition_cols: Sequence[str], row_group_rows: int,
+           existing_data_behavior: str) -> None:
+    dictionary_columns = [
+        field.name for field in table.schema
+        if pa.types.is_dictionary(field.type)
+        or (field.name in COLUMNS and COLUMNS[field.name].kind == CATEGORY)
+    ]
+    file_options = ds.ParquetFileFormat().make_write_options(
+        compression="snappy",
+        use_dictionary=dictionary_columns,
+        write_statistics=True,
+    )
+    ds.write_dataset(
+        table,
+        path,
+        format="parquet",
+        partitioning=_partitioning(partition_cols),
+        file_options=file_options,
+        basename_template="part-{i}.parquet",
+        max_rows_per_group=row_group_rows,
+        min_rows_per_group=min(row_group_rows, 16_384),
+        existing_data_behavior=existing_data_behavior,
+    )
+
+
+def _journal_path(path: str) -> str:
+    return path + ".journal.json"
+
+
+def _move(src: str, dst: str) -> None:
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    os.replace(src, dst)
+
+
+def _write_journal(path: str, journal: dict) -> None:
+    """
+    Атомарно записывает журнал замены: после него замена считается начатой
+    """
+    journal_path = _journal_path(path)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(journal_path) or ".", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(journal, f)
+    os.replace(tmp, journal_path)
+
+
+def _apply_journal(path: str, journal: dict) -> None:
+    """
+    Переносит новые каталоги из <путь>.part на место старых по журналу
+
+    Повторный вызов после сбоя на любом шаге доводит замену до конца:
+    каталог из .part еще не перенесен, пока он есть в .part, поэтому
+    одноименный каталог датасета - старый.
+    """
+    tmp_path, old_path = path + ".part", path + ".old"
+    if journal.get("full"):
+        if os.path.isdir(tmp_path):
+            if os.path.isdir(path):
+                shutil.rmtree(old_path, ignore_errors=True)
+                os.replace(path, old_path)
+            os.replace(tmp_path, path)
+    else:
+        new_dirs = set(journal["new"])
+        for rel in journal["old"]:
+            if rel not in new_dirs and os.path.isdir(os.path.join(path, rel)):
+                _move(os.path.join(path, rel), os.path.join(old_path, rel))
+        for rel in journal["new"]:
+            source = os.path.join(tmp_path, rel)
+            if not os.path.isdir(source):
+                continue
+            target = os.path.join(path, rel)
+            if os.path.isdir(target):
+                _move(target, os.path.join(old_path, rel))
+            _move(source, target)
+        # Каталоги верхнего уровня секций, оставшиеся пустыми
+        for rel in journal["old"]:
+            parent = os.path.dirname(os.path.join(path, rel))
+            if parent != os.path.normpath(path) and os.path.isdir(parent) and not os.listdir(parent):
+                os.rmdir(parent)
+
+    # Старые данные удаляются только после всех замен
+    shutil.rmtree(old_path, ignore_errors=True)
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.remove(_journal_path(path))
+
+
+def _recover(path: str) -> None:
+    """
+    Доводит прерванную замену по журналу или удаляет незавершенную запись
+    """
+    journal_path = _journal_path(path)
+    if os.path.exists(journal_path):
+        with open(journal_path, encoding="utf-8") as f:
+            journal = json.load(f)
+        print(f"⚠️  Найдена прерванная запись датасета {path}: замена завершается по журналу")
+        _apply_journal(path, journal)
+    elif os.path.isdir(path + ".part"):
+        shutil.rmtree(path + ".part")
+
+
+def write_dataset(df: pd.DataFrame, path: str = DEFAULT_DATASET_PATH,
+                  partition_cols: Sequence[str] = PARTITION_COLUMNS,
+                  row_group_rows: int = DEFAULT_ROW_GROUP_ROWS) -> str:
+    """
+    Записывает данные в секционированный Parquet датасет (с полной перезаписью)
+
+    Датасет пишется во временный каталог и заменяет старый только после
+    успешной записи (см. журнал замены в описании модуля).
+
+    Args:
+        df: Данные с типами из схемы
+        path: Каталог датасета
+        partition_cols: Столбцы секционирования
+        row_group_rows: Максимум строк в row group
+
+    Returns:
+        Путь к каталогу датасета
+    """
+    _recover(path)
+    tmp_path = path + ".part"
+    _write(_to_arrow(df, partition_cols), tmp_path, partition_cols, row_group_rows,
+           existing_data_behavior="error")
+
+    if os.path.isdir(path):
+        _write_journal(path, {"full": True})
+        _apply_journal(path, {"full": True})
+    else:
+        os.replace(tmp_path, path)
+    print(f"✅ Данные сохранены в Parquet датасет: {path} "
+          f"(секции: {', '.join(partition_cols)})")
+    return path
+
+
+def upsert_dataset(df: pd.DataFrame, path: str = DEFAULT_DATASET_PATH,
+                   partition_cols: Sequence[str] = PARTITION_COLUMNS,
+                   row_group_rows: int = DEFAULT_ROW_GROUP_ROWS, key: str = "uniq_id") -> str:
+    """
+    Добавляет новые и заменяет измененные строки в секционированном датасете
+
+    Перезаписываются только секции, в которые попадают новые строки или в
+    которых лежат заменяемые (строка могла сменить секцию). Новые версии секций
+    сначала пишутся во временный каталог, старые удаляются только после
+    замены всех секций (см. журнал замены в описании модуля).
+
+    Args:
+        df: Новые и измененные строки
+        path: Каталог датасета
+        partition_cols: Столбцы секционирования
+        row_group_rows: Максимум строк в row group
+        key: Ключевой столбец
+
+    Returns:
+        Путь к каталогу датасета
+    """
+    if df.empty:
+        return path
+    _recover(path)
+    if not os.path.isdir(path):
+        return write_dataset(df, path, partition_cols, row_group_rows)
+
+    delta = _to_arrow(df, partition_cols)
+    dataset = ds.dataset(path, format="parquet", partitioning=_partitioning(partition_cols))
+
+    # Секции со строками, которые заменяются (читается только ключевой столбец)
+    keys = dataset.to_table(columns=[key, *partition_cols],
+                            filter=pc.field(key).isin(delta[key].combine_chunks()))
+    touched = pa.concat_tables([
+        keys.select(list(partition_cols)),
+        delta.select(list(partition_cols)),
+    ]).group_by(list(partition_cols)).aggregate([])
+
+    partition_filter = None
+    for row in touched.to_pylist():
+        condition = None
+        for name, value in row.items():
+            term = pc.field(name).is_null() if value is None else pc.field(name) == value
+            condition = term if condition is None else condition & term
+        partition_filter = condition if partition_filter is None else partition_filter | condition
+
+    existing = dataset.to_table(filter=partition_filter & ~pc.field(key).isin(delta[key].combine_chunks()))
+    schema = existing.schema
+    combined = pa.concat_tables([existing, delta.select(schema.names).cast(schema)]).unify_dictionaries()
+
+    # Новые версии затронутых секций пишутся рядом и подменяют старые каталоги
+    old_dirs = {os.path.relpath(os.path.dirname(fragment.path), path)
+                for fragment in dataset.get_fragments(filter=partition_filter)}
+    tmp_path = path + ".part"
+    _write(combined.sort_by([(name, "ascending") for name in partition_cols]), tmp_path,
+           partition_cols, row_group_rows, existing_data_behavior="error")
+    new_dirs = {os.path.relpath(os.path.dirname(file), tmp_path)
+                for file in ds.dataset(tmp_path, format="parquet").files}
+
+    journal = {"old": sorted(old_dirs), "new": sorted(new_dirs)}
+    _write_journal(path, journal)
+    _apply_journal(path, journal)
+
+    print(f"✅ Данные обновлены в Parquet датасете: {path} "
+          f"(+{len(delta)} строк, из них заменено {len(keys)}, секций: {len(touched)})")
+    return path
+
+
+def read_dataset(path: str = DEFAULT_DATASET_PATH, columns: Optional[List[str]] = None,
+                 filters: Filters = None,
+                 partition_cols: Sequence[str] = PARTITION_COLUMNS) -> pd.DataFrame:
+    """
+    Читает секционированный датасет с передачей фильтров в сканирование
+
+    Условия на столбцы секционирования (country_code, added_month) отсекают
+    каталоги целиком, условия на остальные столбцы - row group по статистике.
+
+    Args:
+        path: Каталог датасета
+        columns: Читать только эти столбцы (None - все)
+        filters: Выражение pyarrow.dataset или список условий
+            [("country_code", "=", "US"), ("salary", ">", 50000)] (как в pd.read_parquet)
+        partition_cols: Столбцы секционирования
+
+    Returns:
+        DataFrame с типами из схемы
+    """
+    if isinstance(filters, list):
+        filters = pq.filters_to_expression(filters)
+
+    dataset = ds.dataset(path, format="parquet", partitioning=_partitioning(partition_cols))
+    table = dataset.to_table(columns=columns, filter=filters)
+    return table.to_pandas(types_mapper=lambda t: ARROW_STRING if pa.types.is_string(t) else None)
+
+
+if __name__ == "__main__":
+    # Тестовый запуск: запись, чтение с фильтром и upsert
+    import tempfile
+    import numpy as np
+
+    rows = 200_000
+    rng = np.random.default_rng(0)
+    test_df = pd.DataFrame({
+        "uniq_id": pd.Series([f"id{i}" for i in range(rows)], dtype=ARROW_STRING),
+        "country_code": pd.Series(rng.choice(["US", "GB", "DE", None], rows), dtype=ARROW_STRING),
+        "date_added": pd.Timestamp("2017-01-01")
+                      + pd.to_timedelta(rng.integers(0, 180, rows), unit="D"),
+        "job_type": pd.Categorical(rng.choice(["Permanent", "Contract"], rows)),
+        "salary": rng.normal(50_000, 10_000, rows),
+    })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "processed_data")
+        write_dataset(test_df, path, row_group_rows=20_000)
+
+        us_march = read_dataset(path, filters=[("country_code", "=", "US"),
+                                               (MONTH_COLUMN, "=", "2017-03")])
+        expected = test_df[(test_df["country_code"] == "US")
+                           & (test_df["date_added"].dt.month == 3)]
+        assert len(us_march) == len(expected)
+        assert isinstance(us_march["job_type"].dtype, pd.CategoricalDtype)
+
+        # Строка меняет страну: старая копия должна исчезнуть из прежней секции
+        update = test_df.head(1000).assign(salary=-1.0, country_code="FR")
+        upsert_dataset(update, path, row_group_rows=20_000)
+        result = read_dataset(path, columns=["uniq_id", "salary", "country_code"])
+        assert len(result) == rows
+        assert (result["salary"] == -1.0).sum() == 1000
+        assert (result["country_code"] == "FR").sum() == 1000
+
+        # Сбой посреди замены секций: следующая запись доводит замену по журналу
+        update = test_df.iloc[1000:2000].assign(salary=-2.0, country_code="IT")
+        original_move = _move
+        calls = []
+
+        def failing_move(src, dst):
+            calls.append(src)
+            if len(calls) == 3:
+                raise OSError("сбой")
+            original_move(src, dst)
+
+        _move = failing_move
+        try:
+            upsert_dataset(update, path, row_group_rows=20_000)
+        except OSError:
+            pass
+        _move = original_move
+        assert os.path.exists(_journal_path(path))
+
+        _recover(path)
+        assert not os.path.exists(_journal_path(path)) and not os.path.exists(path + ".old")
+        result = read_dataset(path, columns=["uniq_id", "salary", "country_code"])
+        assert len(result) == rows and result["uniq_id"].is_unique
+        assert (result["salary"] == -2.0).sum() == 1000
+
+        # Незавершенная запись без журнала удаляется
+        os.makedirs(os.path.join(path + ".part", "country_code=XX"))
+        write_dataset(test_df, path, row_group_rows=20_000)
+        assert len(read_dataset(path, columns=["uniq_id"])) == rows
+
+    print("✅ Секционированный датасет работает")
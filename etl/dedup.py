@@ -0,0 +1,218 @@
+"""
+Модуль удаления дубликатов по 64-битным отпечаткам строк.
+
+Отпечатки считаются векторно (pd.util.hash_pandas_object) по всей строке или по
+ключевому столбцу (uniq_id, page_url) и хранятся в индексе из отсортированных
+массивов uint64. Проверка порции - это бинарный поиск по индексу, поэтому
+дубликаты удаляются по порциям и между запусками (индекс сохраняется на диск
+в .npy и при следующем запуске отображается в память).
+"""
+
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .options import DEDUP_STRATEGIES
+
+
+def row_fingerprints(df: pd.DataFrame) -> np.ndarray:
+    """
+    Считает 64-битный отпечаток содержимого каждой строки
+
+    Args:
+        df: Данные с типами из схемы
+
+    Returns:
+        Массив uint64 с отпечатками строк
+    """
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def key_fingerprints(values: pd.Series) -> np.ndarray:
+    """
+    Считает 64-битный отпечаток значений ключевого столбца
+
+    Args:
+        values: Значения ключа (uniq_id, page_url)
+
+    Returns:
+        Массив uint64 с отпечатками значений
+    """
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+class FingerprintIndex:
+    """
+    Множество отпечатков uint64 в виде набора отсортированных массивов.
+
+    Новые отпечатки добавляются отдельным массивом; соседние массивы близкого
+    размера сливаются, поэтому массивов всегда O(log n), а вставка амортизированно
+    стоит O(log n) на элемент.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._runs = []
+        if path and os.path.exists(path):
+            self._runs.append(np.load(path, mmap_mode="r"))
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self._runs)
+
+    def contains(self, fingerprints: np.ndarray) -> np.ndarray:
+        """
+        Проверяет наличие отпечатков в индексе
+
+        Args:
+            fingerprints: Массив отпечатков
+
+        Returns:
+            Булев массив той же длины
+        """
+        if not any(len(run) for run in self._runs):
+            return np.zeros(len(fingerprints), dtype=bool)
+
+        # Отсортированные ключи ищутся в разы быстрее (последовательный доступ к памяти)
+        order = np.argsort(fingerprints, kind="stable")
+        needles = fingerprints[order]
+        found_sorted = np.zeros(len(needles), dtype=bool)
+        for run in self._runs:
+            if len(run) == 0:
+                continue
+            positions = np.minimum(np.searchsorted(run, needles), len(run) - 1)
+            found_sorted |= run[positions] == needles
+
+        found = np.empty(len(fingerprints), dtype=bool)
+        found[order] = found_sorted
+        return found
+
+    def add(self, fingerprints: np.ndarray, assume_unique: bool = False) -> None:
+        """
+        Добавляет отпечатки, которых еще нет в индексе
+
+        Args:
+            fingerprints: Массив новых отпечатков
+            assume_unique: Отпечатки уже без повторов (достаточно сортировки)
+        """
+        if len(fingerprints) == 0:
+            return
+        self._runs.append(np.sort(fingerprints) if assume_unique else np.unique(fingerprints))
+        while len(self._runs) > 1 and len(self._runs[-2]) <= 2 * len(self._runs[-1]):
+            last = self._runs.pop()
+            self._runs[-1] = np.sort(np.concatenate([self._runs[-1], last]), kind="stable")
+
+    def values(self) -> np.ndarray:
+        """
+        Все отпечатки индекса одним отсортированным массивом
+        """
+        if not self._runs:
+            return np.empty(0, dtype=np.uint64)
+        return self._runs[0] if len(self._runs) == 1 else np.sort(np.concatenate(self._runs))
+
+    def clear(self) -> None:
+        """
+        Очищает индекс
+        """
+        self._runs = []
+
+    def save(self) -> None:
+        """
+        Сохраняет индекс одним отсортированным массивом в self.path
+        """
+        if not self.path:
+            return
+        merged = self.values()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp.npy"
+        np.save(tmp_path, merged)
+        os.replace(tmp_path, self.path)
+        self._runs = [merged]
+
+
+class Deduplicator:
+    """
+    Удаляет дубликаты по выбранной стратегии с учетом уже обработанных данных.
+
+    Стратегия "row" совпадает с df.drop_duplicates(); "uniq_id" и "page_url"
+    оставляют первую строку для каждого значения ключа. Строки с пустым ключом
+    не считаются дубликатами.
+    """
+
+    def __init__(self, strategy: str = "row", index_path: Optional[str] = None):
+        if strategy not in DEDUP_STRATEGIES:
+            raise ValueError(f"Неизвестная стратегия удаления дубликатов: {strategy} "
+                             f"(доступны: {', '.join(DEDUP_STRATEGIES)})")
+        self.strategy = strategy
+        self.key = DEDUP_STRATEGIES[strategy]
+        self.index = FingerprintIndex(index_path)
+
+    def fingerprints(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Считает отпечатки строк порции по стратегии
+
+        Отпечатки не зависят от разбиения данных на порции, поэтому их можно
+        считать параллельно по частям и затем передать в keep_mask.
+
+        Args:
+            df: Порция данных с типами из схемы
+
+        Returns:
+            Отпечатки uint64 и булев массив "ключ заполнен"
+        """
+        if self.key is None:
+            return row_fingerprints(df), np.ones(len(df), dtype=bool)
+        return key_fingerprints(df[self.key]), df[self.key].notna().to_numpy()
+
+    def keep_mask(self, fingerprints: np.ndarray, has_key: np.ndarray,
+                  updates: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Отмечает строки, которые не встречались ранее, и запоминает их отпечатки
+
+        Args:
+            fingerprints: Отпечатки строк в порядке данных
+            has_key: Ключ заполнен (строки с пустым ключом всегда остаются)
+            updates: Строки-обновления ранее загруженных данных (инкрементальный
+                режим): совпадение с индексом для них не считается дубликатом,
+                повторы внутри порции удаляются как обычно
+
+        Returns:
+            Булев массив: True - строку оставить
+        """
+        in_index = self.index.contains(fingerprints)
+        seen_before = in_index if updates is None else in_index & ~updates
+        keep = ~pd.Series(fingerprints).duplicated().to_numpy()
+        keep &= ~seen_before
+        keep |= ~has_key
+
+        self.index.add(fingerprints[keep & has_key & ~in_index], assume_unique=True)
+        return keep
+
+    def drop_duplicates(self, df: pd.DataFrame,
+                        updates: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Удаляет из порции строки, встреченные ранее в этой порции или в индексе
+
+        Args:
+            df: Порция данных с типами из схемы
+            updates: Строки-обновления ранее загруженных данных (см. keep_mask)
+
+        Returns:
+            Порция без дубликатов
+        """
+        if df.empty:
+            return df
+        return df[self.keep_mask(*self.fingerprints(df), updates=updates)]
+
+    def reset(self) -> None:
+        """
+        Забывает все обработанные ранее отпечатки
+        """
+        self.index.clear()
+
+    def save(self) -> None:
+        """
+        Сохраняет индекс отпечатков на диск (если задан путь)
+        """
+        self.index.save()
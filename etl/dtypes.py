@@ -0,0 +1,261 @@
+"""
+Модуль автоматического выбора компактных типов столбцов.
+
+Схема (etl/schema.py) задает типы, общие для всех данных. Оптимизатор
+смотрит на сами данные и для каждого столбца выбирает самый компактный тип
+без потери значений: строки с двумя значениями вида Yes/No становятся
+boolean, строки с малым числом различных значений - category, остальные
+строки хранятся в буферах Arrow, числа сужаются (float32, int8...), если
+значения при этом не меняются. Отчет показывает память каждого столбца до и
+после (memory_usage(deep=True)).
+
+Суженные числа годятся для файлов, но не для таблиц БД: to_sql создает
+столбец по типу DataFrame (float32 -> REAL), и следующие загрузки теряли бы
+точность. Перед записью в БД числа возвращаются к полной разрядности
+(widen_numbers).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .schema import ARROW_STRING
+
+# Категория выгоднее строк, если различных значений не больше этой доли
+DEFAULT_CATEGORY_RATIO = 0.5
+
+# Пары строковых значений, которые означают логический тип: (истина, ложь)
+BOOLEAN_VALUES = [("Yes", "No"), ("True", "False"), ("true", "false"), ("Y", "N")]
+
+BOOLEAN = pd.BooleanDtype()
+
+
+@dataclass(frozen=True)
+class ColumnChange:
+    """
+    Выбранный тип одного столбца
+
+    Attributes:
+        column: Название столбца
+        before: Тип до оптимизации
+        after: Выбранный тип
+        bytes_before: Память столбца до оптимизации
+        bytes_after: Память столбца после оптимизации
+        distinct: Количество различных непустых значений (для строк)
+    """
+    column: str
+    before: str
+    after: str
+    bytes_before: int
+    bytes_after: int
+    distinct: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class MemoryReport:
+    """
+    Память DataFrame до и после оптимизации типов
+    """
+    columns: List[ColumnChange]
+
+    @property
+    def bytes_before(self) -> int:
+        return sum(c.bytes_before for c in self.columns)
+
+    @property
+    def bytes_after(self) -> int:
+        return sum(c.bytes_after for c in self.columns)
+
+    @property
+    def dtypes(self) -> Dict[str, str]:
+        """
+        Столбец -> выбранный тип
+        """
+        return {c.column: c.after for c in self.columns}
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Отчет в виде таблицы (по строке на столбец)
+        """
+        return pd.DataFrame([c.__dict__ for c in self.columns]).set_index("column")
+
+
+def _memory(values: pd.Series) -> int:
+    return int(values.memory_usage(index=False, deep=True))
+
+
+def _is_string(values: pd.Series) -> bool:
+    return isinstance(values.dtype, pd.StringDtype) or values.dtype == object
+
+
+def _to_boolean(values: pd.Series, pair: Tuple[str, str]) -> pd.Series:
+    """
+    Логический столбец: bool (1 байт) без пропусков, иначе boolean с пропусками
+    """
+    flags = values.map({pair[0]: True, pair[1]: False})
+    return flags.astype(BOOLEAN if flags.hasnans else bool)
+
+
+def _boolean_pair(uniques: Sequence) -> Optional[Tuple[str, str]]:
+    """
+    Пара (истина, ложь), если все значения столбца из одной пары BOOLEAN_VALUES
+    """
+    found = set(uniques)
+    for pair in BOOLEAN_VALUES:
+        if found and found <= set(pair):
+            return pair
+    return None
+
+
+def _optimize_strings(values: pd.Series, category_ratio: float) -> Tuple[pd.Series, int]:
+    uniques = values.dropna().unique()
+    non_null = int(values.notna().sum())
+
+    pair = _boolean_pair(uniques) if len(uniques) <= 2 else None
+    if pair is not None:
+        return _to_boolean(values, pair), len(uniques)
+    if len(uniques) <= max(1, non_null * category_ratio):
+        return values.astype("category"), len(uniques)
+    if values.dtype != ARROW_STRING:
+        return values.astype(ARROW_STRING), len(uniques)
+    return values, len(uniques)
+
+
+def _optimize_categories(values: pd.Series) -> Tuple[pd.Series, int]:
+    values = values.cat.remove_unused_categories()
+    uniques = values.cat.categories
+    pair = _boolean_pair(uniques) if len(uniques) <= 2 else None
+    if pair is not None:
+        return _to_boolean(values, pair), len(uniques)
+    return values, len(uniques)
+
+
+def _optimize_numbers(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_float_dtype(values.dtype) and values.dtype != np.float32:
+        data = values.to_numpy()
+        narrow = data.astype(np.float32)
+        with np.errstate(over="ignore", invalid="ignore"):
+            lossless = np.array_equal(narrow.astype(data.dtype), data, equal_nan=True)
+        return values.astype(np.float32) if lossless else values
+    if pd.api.types.is_integer_dtype(values.dtype) and isinstance(values.dtype, np.dtype):
+        downcast = "unsigned" if len(values) and values.min() >= 0 else "integer"
+        return pd.to_numeric(values, downcast=downcast)
+    return values
+
+
+def optimize_dtypes(df: pd.DataFrame, category_ratio: float = DEFAULT_CATEGORY_RATIO,
+                    exclude: Sequence[str] = ()) -> Tuple[pd.DataFrame, MemoryReport]:
+    """
+    Выбирает для каждого столбца самый компактный тип по его данным
+
+    Правила (значения при этом не меняются):
+        - строки из пары BOOLEAN_VALUES -> bool (boolean, если есть пропуски)
+        - строки, где различных значений не больше category_ratio от
+          непустых -> category
+        - остальные строки -> строки в буферах Arrow
+        - float64 -> float32, если все значения представимы точно
+        - целые -> наименьший целый тип
+
+    Args:
+        df: Данные
+        category_ratio: Максимальная доля различных значений для category
+        exclude: Столбцы, которые не изменяются
+
+    Returns:
+        Новый DataFrame и отчет о памяти по столбцам
+    """
+    columns = {}
+    changes = []
+    for name in df.columns:
+        values = df[name]
+        distinct = None
+        if name in exclude:
+            optimized = values
+        elif isinstance(values.dtype, pd.CategoricalDtype):
+            optimized, distinct = _optimize_categories(values)
+        elif _is_string(values):
+            optimized, distinct = _optimize_strings(values, category_ratio)
+        else:
+            optimized = _optimize_numbers(values)
+
+        columns[name] = optimized
+        changes.append(ColumnChange(name, str(values.dtype), str(optimized.dtype),
+                                    _memory(values), _memory(optimized), distinct))
+
+    return pd.DataFrame(columns, index=df.index), MemoryReport(changes)
+
+
+def widen_numbers(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Возвращает числа к полной разрядности: float -> float64, целые -> int64
+
+    Тип столбца таблицы БД не должен зависеть от значений одной загрузки.
+    Обратное приведение точное: optimize_dtypes сужает только без потерь.
+
+    Args:
+        df: Данные (не изменяются)
+
+    Returns:
+        DataFrame с расширенными числовыми столбцами (df, если расширять нечего)
+    """
+    wide = {}
+    for name, dtype in df.dtypes.items():
+        if not isinstance(dtype, np.dtype):
+            continue
+        if dtype.kind == "f" and dtype != np.float64:
+            wide[name] = np.float64
+        elif dtype.kind in "iu" and dtype != np.int64:
+            wide[name] = np.int64
+    return df.astype(wide) if wide else df
+
+
+def print_memory_report(report: MemoryReport) -> None:
+    """
+    Выводит отчет о памяти в консоль
+
+    Args:
+        report: Отчет optimize_dtypes
+    """
+    print(f"   {'столбец':18s} {'тип до':>16s} {'тип после':>16s} "
+          f"{'до, МБ':>9s} {'после, МБ':>10s} {'различных':>10s}")
+    for c in report.columns:
+        distinct = "-" if c.distinct is None else str(c.distinct)
+        print(f"   {c.column:18s} {c.before:>16s} {c.after:>16s} "
+              f"{c.bytes_before / 2**20:9.1f} {c.bytes_after / 2**20:10.1f} {distinct:>10s}")
+    saved = 1 - report.bytes_after / report.bytes_before if report.bytes_before else 0.0
+    print(f"   Всего: {report.bytes_before / 2**20:.1f} МБ -> {report.bytes_after / 2**20:.1f} МБ "
+          f"(-{saved:.0%})")
+
+
+if __name__ == "__main__":
+    # Тестовый запуск: типы выбираются по данным, значения не меняются
+    rows = 100_000
+    rng = np.random.default_rng(0)
+    test_df = pd.DataFrame({
+        "uniq_id": pd.Series([f"id{i}" for i in range(rows)], dtype=ARROW_STRING),
+        "country_code": pd.Series(rng.choice(["US", "GB", None], rows), dtype=ARROW_STRING),
+        "has_expired": pd.Categorical(rng.choice(["Yes", "No"], rows)),
+        "salary": rng.choice([50_000.0, 15.5, np.nan], rows),
+        "salary_exact": rng.normal(50_000, 1_000, rows),
+        "views": rng.integers(0, 200, rows),
+    })
+
+    optimized, report = optimize_dtypes(test_df)
+    print_memory_report(report)
+
+    assert report.dtypes == {
+        "uniq_id": "string", "country_code": "category", "has_expired": "bool",
+        "salary": "float32", "salary_exact": "float64", "views": "uint8",
+    }
+    assert report.bytes_after < report.bytes_before
+    assert optimized["country_code"].astype(ARROW_STRING).equals(test_df["country_code"])
+    assert (optimized["has_expired"] == (test_df["has_expired"] == "Yes")).all()
+    assert np.array_equal(optimized["salary"].astype("float64"), test_df["salary"], equal_nan=True)
+
+    wide = widen_numbers(optimized)
+    assert wide["salary"].dtype == np.float64 and wide["views"].dtype == np.int64
+    assert np.array_equal(wide["salary"], test_df["salary"], equal_nan=True)
+    assert wide["has_expired"].dtype == bool
+    print("✅ Типы оптимизированы без изменения значений")
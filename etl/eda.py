@@ -0,0 +1,375 @@
+"""
+Модуль профиля данных для исследовательского анализа (EDA).
+
+ETL после извлечения считает по сырым данным профиль: пропуски по столбцам,
+дубликаты (строки целиком, uniq_id, page_url), число различных значений,
+топ значений категориальных столбцов, распределения зарплаты и дат, а также
+агрегаты для графиков блокнота: число вакансий по стране, сектору и типу
+работы и квартили зарплат по странам. Профиль
+сохраняется в JSON (data/eda/profile_<sha256>.json) с ключом - SHA-256
+исходного файла, тем же, что у кэша загрузок (etl/cache.py). Блокнот
+notebooks/EDA.ipynb ищет готовый профиль по хешу файла из кэша загрузок и
+читает CSV, только чтобы посчитать профиль, если его для этих данных нет
+или он создан другой версией (PROFILE_VERSION).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .files import set_default_mode
+from .options import DATA_DIR
+from .profiling import stage
+from .schema import CATEGORY, SCHEMA
+from .staging import read_staging
+
+# Версия формата профиля: профиль другой версии считается устаревшим
+PROFILE_VERSION = 2
+
+# Каталог профилей по умолчанию: <каталог данных>/eda
+DEFAULT_EDA_DIR = os.environ.get("ETL_EDA_DIR", os.path.join(DATA_DIR, "eda"))
+
+# Ключи, по которым считаются дубликаты (кроме строки целиком)
+DUPLICATE_KEYS = ("uniq_id", "page_url")
+
+# Столбцы с топом значений: категории схемы и строки с небольшим числом значений
+TOP_VALUE_COLUMNS = tuple(c.name for c in SCHEMA if c.kind == CATEGORY) \
+    + ("country", "job_board", "location")
+DEFAULT_TOP_K = 20
+
+SALARY_COLUMN = "salary"
+DATE_COLUMN = "date_added"
+SALARY_BINS = 50
+
+# Иерархия для sunburst: число вакансий по стране, сектору и типу работы
+# в самых частых странах
+HIERARCHY_COLUMNS = ("country", "sector", "job_type")
+HIERARCHY_TOP = 10
+
+# Квартили зарплат (для boxplot) в странах с наибольшим числом зарплат
+SALARY_GROUP_COLUMN = "country"
+SALARY_GROUP_TOP = 8
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """
+    SHA-256 содержимого файла (читается блоками)
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def profile_path(data_hash: str, eda_dir: str = DEFAULT_EDA_DIR) -> str:
+    return os.path.join(eda_dir, f"profile_{data_hash}.json")
+
+
+def _number(value) -> Optional[float]:
+    return None if value is None or pd.isna(value) else float(value)
+
+
+def _top_values(values: pd.Series, top_k: int) -> list:
+    counts = values.value_counts(dropna=True).head(top_k)
+    return [[str(value), int(count)] for value, count in counts.items()]
+
+
+def _salary_profile(values: pd.Series) -> dict:
+    salary = values.dropna().to_numpy(dtype="float64")
+    if not len(salary):
+        return {"count": 0}
+    q1, median, q3 = np.quantile(salary, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    lower, upper = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    counts, edges = np.histogram(salary, bins=SALARY_BINS)
+    return {
+        "count": int(len(salary)),
+        "min": float(salary.min()),
+        "max": float(salary.max()),
+        "mean": float(salary.mean()),
+        "median": float(median),
+        "std": _number(salary.std(ddof=1)) if len(salary) > 1 else None,
+        "q1": float(q1),
+        "q3": float(q3),
+        "iqr": float(iqr),
+        "lower_bound": float(lower),
+        "upper_bound": float(upper),
+        "outliers": int(((salary < lower) | (salary > upper)).sum()),
+        "histogram": {"edges": edges.tolist(), "counts": counts.tolist()},
+    }
+
+
+def _hierarchy(df: pd.DataFrame, columns: Sequence[str], top: int) -> list:
+    """
+    [[значение первого столбца, ..., число строк], ...] для top самых частых
+    значений первого столбца (строки с пропуском в любом столбце не входят)
+    """
+    top_values = df[columns[0]].value_counts().head(top).index
+    data = df.loc[df[columns[0]].isin(top_values), list(columns)].dropna()
+    counts = data.groupby(list(columns), observed=True).size()
+    return [[*(str(value) for value in key), int(count)] for key, count in counts.items() if count]
+
+
+def _salary_by_group(df: pd.DataFrame, column: str, top: int) -> list:
+    """
+    Статистика boxplot зарплат для top значений column с наибольшим числом
+    зарплат: квартили и усы по правилу 1.5 IQR (как в seaborn.boxplot)
+    """
+    data = df.loc[df[SALARY_COLUMN].notna(), [column, SALARY_COLUMN]]
+    groups = []
+    for value in data[column].value_counts().head(top).index:
+        salary = data.loc[data[column] == value, SALARY_COLUMN].to_numpy(dtype="float64")
+        q1, median, q3 = np.quantile(salary, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        inside = salary[(salary >= q1 - 1.5 * iqr) & (salary <= q3 + 1.5 * iqr)]
+        groups.append({
+            "label": str(value),
+            "count": int(len(salary)),
+            "q1": float(q1),
+            "median": float(median),
+            "q3": float(q3),
+            "whislo": float(inside.min()),
+            "whishi": float(inside.max()),
+            "outliers": int(len(salary) - len(inside)),
+        })
+    return groups
+
+
+def _date_profile(values: pd.Series, now: pd.Timestamp) -> dict:
+    dates = values.dropna()
+    if not len(dates):
+        return {"count": 0}
+    daily = dates.dt.normalize().value_counts().sort_index()
+    return {
+        "count": int(len(dates)),
+        "min": dates.min().isoformat(),
+        "max": dates.max().isoformat(),
+        "range_days": int((dates.max() - dates.min()).days),
+        "future": int((dates > now).sum()),
+        "before_2000": int((dates < pd.Timestamp("2000-01-01")).sum()),
+        "daily_counts": [[day.date().isoformat(), int(count)] for day, count in daily.items()],
+    }
+
+
+def build_profile(df: pd.DataFrame, data_hash: str, top_k: int = DEFAULT_TOP_K,
+                  top_columns: Iterable[str] = TOP_VALUE_COLUMNS) -> dict:
+    """
+    Считает профиль данных для EDA
+
+    Args:
+        df: Сырые данные с типами из схемы (до удаления дубликатов)
+        data_hash: SHA-256 исходного файла
+        top_k: Сколько самых частых значений сохранить для каждого столбца
+        top_columns: Столбцы с топом значений
+
+    Returns:
+        Профиль (словарь, сериализуемый в JSON)
+    """
+    created_at = datetime.now(timezone.utc)
+    missing = df.isna()
+
+    # Дубликаты ключа - через число различных значений (пропуск - тоже значение,
+    # как в duplicated): это хеш-таблица Arrow без построчных отпечатков
+    duplicates = {"row": int(df.duplicated().sum())}
+    for key in DUPLICATE_KEYS:
+        if key in df.columns:
+            duplicates[key] = int(len(df) - df[key].nunique(dropna=False))
+
+    profile = {
+        "version": PROFILE_VERSION,
+        "data_hash": data_hash,
+        "created_at": created_at.isoformat(timespec="seconds"),
+        "rows": int(len(df)),
+        "columns": {name: str(dtype) for name, dtype in df.dtypes.items()},
+        "missing": {name: int(count) for name, count in missing.sum().items()},
+        "empty_rows": int(missing.all(axis=1).sum()),
+        "duplicates": duplicates,
+        "unique": {name: int(df[name].nunique()) for name in df.columns},
+        "top_values": {name: _top_values(df[name], top_k)
+                       for name in top_columns if name in df.columns},
+    }
+    if SALARY_COLUMN in df.columns:
+        profile["salary"] = _salary_profile(df[SALARY_COLUMN])
+        if SALARY_GROUP_COLUMN in df.columns:
+            profile["salary_by_country"] = _salary_by_group(df, SALARY_GROUP_COLUMN,
+                                                            SALARY_GROUP_TOP)
+    if all(name in df.columns for name in HIERARCHY_COLUMNS):
+        profile["hierarchy"] = _hierarchy(df, HIERARCHY_COLUMNS, HIERARCHY_TOP)
+    if DATE_COLUMN in df.columns:
+        now = pd.Timestamp(created_at).tz_localize(None)
+        profile["date_added"] = _date_profile(df[DATE_COLUMN], now)
+    return profile
+
+
+def save_profile(profile: dict, eda_dir: str = DEFAULT_EDA_DIR) -> str:
+    """
+    Сохраняет профиль (атомарно: временный файл и os.replace)
+
+    Returns:
+        Путь к файлу профиля
+    """
+    os.makedirs(eda_dir, exist_ok=True)
+    path = profile_path(profile["data_hash"], eda_dir)
+    fd, tmp_path = tempfile.mkstemp(dir=eda_dir, suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, indent=1)
+    set_default_mode(tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_profile(data_hash: str, eda_dir: str = DEFAULT_EDA_DIR) -> Optional[dict]:
+    """
+    Загружает профиль данных с указанным хешем
+
+    Args:
+        data_hash: SHA-256 исходного файла
+        eda_dir: Каталог профилей
+
+    Returns:
+        Профиль или None, если его нет или он создан другой версией
+    """
+    path = profile_path(data_hash, eda_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        profile = json.load(f)
+    if profile.get("version") != PROFILE_VERSION or profile.get("data_hash") != data_hash:
+        return None
+    return profile
+
+
+def staging_data_hash(raw_data_path: str, source: Optional[str] = None) -> str:
+    """
+    Хеш данных промежуточного файла etl.extract
+
+    Это SHA-256 исходного CSV: из файла <raw_data_path>.sha256, который
+    extract_data пишет для загрузок через кэш, или по локальному файлу source.
+    Если исходный файл неизвестен, хешируется сам промежуточный файл.
+    """
+    sidecar = raw_data_path + ".sha256"
+    if os.path.exists(sidecar):
+        with open(sidecar, encoding="utf-8") as f:
+            return f.read().strip()
+    if source and os.path.isfile(source):
+        return file_sha256(source)
+    return file_sha256(raw_data_path)
+
+
+def profile_staging(raw_data_path: str, source: Optional[str] = None,
+                    eda_dir: str = DEFAULT_EDA_DIR, refresh: bool = False) -> str:
+    """
+    Сохраняет профиль сырых данных, если для них его еще нет
+
+    Args:
+        raw_data_path: Промежуточный файл etl.extract (raw_data.arrow)
+        source: Путь к исходному CSV (для хеша, если загрузка шла не через кэш)
+        eda_dir: Каталог профилей
+        refresh: Пересчитать профиль, даже если он уже есть
+
+    Returns:
+        Путь к файлу профиля
+    """
+    data_hash = staging_data_hash(raw_data_path, source)
+    if not refresh and load_profile(data_hash, eda_dir) is not None:
+        print(f"✅ Профиль EDA актуален: {profile_path(data_hash, eda_dir)}")
+        return profile_path(data_hash, eda_dir)
+
+    with stage("profile.build") as step:
+        df = read_staging(raw_data_path)
+        step.rows_in = len(df)
+        profile = build_profile(df, data_hash)
+    path = save_profile(profile, eda_dir)
+    print(f"✅ Профиль EDA сохранен: {path}")
+    return path
+
+
+def print_profile(profile: dict) -> None:
+    """
+    Выводит основные показатели профиля
+    """
+    rows = profile["rows"]
+    missing = {name: count for name, count in profile["missing"].items() if count}
+    print(f"   Строк: {rows}, столбцов: {len(profile['columns'])} "
+          f"(данные {profile['data_hash'][:12]}, профиль от {profile['created_at']})")
+    print(f"   Столбцов с пропусками: {len(missing)}, "
+          f"полностью пустых строк: {profile['empty_rows']}")
+    print("   Дубликатов: " + ", ".join(f"{key} {count}"
+                                        for key, count in profile["duplicates"].items()))
+
+
+if __name__ == "__main__":
+    # Тестовый запуск: профиль совпадает с вычислениями pandas из блокнота
+    import time
+
+    rows = 200_000
+    rng = np.random.default_rng(0)
+    ids = rng.integers(0, rows // 2, rows)
+    test_df = pd.DataFrame({
+        "country": pd.Series(rng.choice(["United States of America", "Canada", None], rows),
+                             dtype="string[pyarrow]"),
+        "has_expired": pd.Categorical(rng.choice(["No", "Yes"], rows)),
+        "job_type": pd.Categorical(rng.choice(["Full Time", "Contract", None], rows)),
+        "sector": pd.Categorical(rng.choice(["IT", "Health Care"], rows)),
+        "salary": rng.choice([50_000.0, 15.0, 1e7, np.nan], rows, p=[0.1, 0.1, 0.01, 0.79]),
+        "date_added": pd.to_datetime(rng.choice(["2016-01-05", "2017-12-31", "2999-01-01", None],
+                                                rows)),
+        "uniq_id": pd.Series([f"id{i}" for i in ids], dtype="string[pyarrow]"),
+        "page_url": pd.Series([f"https://jobs.example/{i % 1000}" for i in ids],
+                              dtype="string[pyarrow]"),
+    })
+
+    start = time.perf_counter()
+    profile = build_profile(test_df, "0" * 64)
+    seconds = time.perf_counter() - start
+
+    assert profile["missing"] == test_df.isnull().sum().to_dict()
+    assert profile["duplicates"] == {
+        "row": int(test_df.duplicated().sum()),
+        "uniq_id": int(test_df.duplicated(subset=["uniq_id"]).sum()),
+        "page_url": int(test_df.duplicated(subset=["page_url"]).sum()),
+    }
+    assert dict(profile["top_values"]["country"]) == \
+        {str(k): int(v) for k, v in test_df["country"].value_counts().items()}
+    salary = test_df["salary"].dropna()
+    assert profile["salary"]["median"] == salary.median()
+    assert np.isclose(profile["salary"]["std"], salary.std())
+    assert profile["date_added"]["future"] == int((test_df["date_added"] > pd.Timestamp.now()).sum())
+
+    # Агрегаты для графиков совпадают с расчетом по исходным строкам в блокноте
+    hierarchy = test_df.dropna(subset=list(HIERARCHY_COLUMNS)) \
+        .groupby(list(HIERARCHY_COLUMNS), observed=True).size()
+    assert {tuple(row[:-1]): row[-1] for row in profile["hierarchy"]} == \
+        {tuple(map(str, key)): int(count) for key, count in hierarchy.items()}
+    by_country = {group["label"]: group for group in profile["salary_by_country"]}
+    canada = test_df.loc[test_df["country"] == "Canada", "salary"].dropna()
+    assert by_country["Canada"]["count"] == len(canada)
+    assert by_country["Canada"]["median"] == canada.median()
+    assert by_country["Canada"]["whishi"] == 50_000.0 and by_country["Canada"]["outliers"] > 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        assert load_profile("0" * 64, tmp) is None
+        save_profile(profile, tmp)
+        start = time.perf_counter()
+        loaded = load_profile("0" * 64, tmp)
+        load_ms = (time.perf_counter() - start) * 1000
+        assert loaded == profile
+        assert load_profile("1" * 64, tmp) is None
+
+        # Профиль другой версии устарел
+        with open(profile_path("0" * 64, tmp), "w", encoding="utf-8") as f:
+            json.dump({**profile, "version": PROFILE_VERSION - 1}, f)
+        assert load_profile("0" * 64, tmp) is None
+
+    print_profile(profile)
+    print(f"   Расчет профиля: {seconds:.2f} с, загрузка: {load_ms:.1f} мс")
+    print("✅ Профиль EDA совпадает с вычислениями pandas")
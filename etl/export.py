@@ -0,0 +1,218 @@
+"""
+Модуль экспорта DataFrame в сжатые CSV и Feather.
+
+CSV формируется порциями по chunk_rows строк (без одной строки на весь файл)
+и сжимается параллельно с форматированием следующих порций:
+    gzip - каждая порция сжимается в пуле потоков в отдельный gzip-член;
+           последовательность членов - корректный gzip файл, который читают
+           pd.read_csv, gzip и zcat
+    zstd - один zstd кадр, многопоточное сжатие libzstd (пакет zstandard,
+           он же нужен pandas для чтения .zst)
+    none - без сжатия
+
+Feather пишется через pyarrow со сжатием буферов столбцов lz4 или zstd
+(буферы сжимаются в пуле потоков Arrow), файл читает pd.read_feather.
+
+lz4 для CSV не поддерживается: pd.read_csv не умеет его читать.
+"""
+
+import contextlib
+import gzip
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+try:
+    import zstandard
+except ImportError:  # zstandard не обязателен: нужен только для CSV со сжатием zstd
+    zstandard = None
+
+from .files import set_default_mode
+
+CSV_CODECS = ("gzip", "zstd", "none")
+FEATHER_CODECS = ("lz4", "zstd", "uncompressed")
+
+# Уровни по умолчанию: gzip 6 сжимает почти как 9 (по умолчанию в pandas)
+# при заметно меньшем времени
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+
+# Расширение файла -> кодек CSV (как compression="infer" в pandas)
+CSV_EXTENSIONS = {".gz": "gzip", ".zst": "zstd"}
+
+# Строк в порции CSV: порция форматируется целиком и сжимается как один блок
+DEFAULT_CHUNK_ROWS = 25_000
+
+
+def csv_codec_from_path(path: str) -> str:
+    """
+    Кодек CSV по расширению файла (.gz, .zst, иначе без сжатия)
+    """
+    return CSV_EXTENSIONS.get(os.path.splitext(path)[1].lower(), "none")
+
+
+@contextlib.contextmanager
+def _replace_on_success(path: str) -> Iterator[str]:
+    """
+    Временный файл рядом с path, который заменяет path только при успешной записи
+    (с правами обычного нового файла, а не 0600 от mkstemp)
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp_path
+        set_default_mode(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _csv_blocks(df: pd.DataFrame, chunk_rows: int) -> Iterator[bytes]:
+    """
+    CSV по порциям строк: заголовок в первой порции, как у df.to_csv(index=False)
+    """
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        yield chunk.to_csv(index=False, header=start == 0).encode("utf-8")
+
+
+def write_csv(df: pd.DataFrame, path: str, codec: Optional[str] = None,
+              level: Optional[int] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+              workers: Optional[int] = None) -> str:
+    """
+    Сохраняет DataFrame в CSV со сжатием в несколько потоков
+
+    Args:
+        df: Данные для сохранения
+        path: Путь к файлу
+        codec: Кодек из CSV_CODECS (None - по расширению файла)
+        level: Уровень сжатия (None - DEFAULT_LEVELS)
+        chunk_rows: Строк в порции
+        workers: Потоков сжатия (None - по числу ядер)
+
+    Returns:
+        Путь к сохраненному файлу
+
+    Raises:
+        ValueError: Если кодек не поддерживается для CSV
+        ImportError: Если для zstd не установлен пакет zstandard
+    """
+    codec = codec or csv_codec_from_path(path)
+    if codec not in CSV_CODECS:
+        raise ValueError(f"Кодек {codec!r} не поддерживается для CSV "
+                         f"(доступны: {', '.join(CSV_CODECS)})")
+    if codec == "zstd" and zstandard is None:
+        raise ImportError("Для CSV со сжатием zstd нужен пакет zstandard")
+    level = DEFAULT_LEVELS.get(codec) if level is None else level
+    workers = workers or os.cpu_count() or 1
+
+    with _replace_on_success(path) as tmp_path, open(tmp_path, "wb") as out:
+        if codec == "gzip":
+            # Порции сжимаются в пуле, пока форматируется следующая порция;
+            # в очереди не больше workers сжатых блоков
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gzip") as pool:
+                pending = deque()
+                for block in _csv_blocks(df, chunk_rows):
+                    pending.append(pool.submit(gzip.compress, block, level, mtime=0))
+                    while len(pending) > workers:
+                        out.write(pending.popleft().result())
+                while pending:
+                    out.write(pending.popleft().result())
+        elif codec == "zstd":
+            # threads > 0: libzstd сжимает в своих потоках, write не ждет сжатия
+            compressor = zstandard.ZstdCompressor(level=level, threads=workers)
+            with compressor.stream_writer(out, closefd=False) as writer:
+                for block in _csv_blocks(df, chunk_rows):
+                    writer.write(block)
+        else:
+            for block in _csv_blocks(df, chunk_rows):
+                out.write(block)
+
+    return path
+
+
+def write_feather(df: pd.DataFrame, path: str, codec: str = "lz4",
+                  level: Optional[int] = None) -> str:
+    """
+    Сохраняет DataFrame в Feather v2 со сжатием буферов столбцов
+
+    Args:
+        df: Данные для сохранения (индекс не сохраняется)
+        path: Путь к файлу
+        codec: Кодек из FEATHER_CODECS
+        level: Уровень сжатия (только для zstd; None - по умолчанию Arrow)
+
+    Returns:
+        Путь к сохраненному файлу
+
+    Raises:
+        ValueError: Если кодек не поддерживается или не имеет уровней сжатия
+    """
+    if codec not in FEATHER_CODECS:
+        raise ValueError(f"Кодек {codec!r} не поддерживается для Feather "
+                         f"(доступны: {', '.join(FEATHER_CODECS)})")
+    if level is not None and (codec == "uncompressed" or not pa.Codec.supports_compression_level(codec)):
+        raise ValueError(f"Кодек {codec} не поддерживает уровень сжатия")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with _replace_on_success(path) as tmp_path:
+        feather.write_feather(table, tmp_path, compression=codec, compression_level=level)
+    return path
+
+
+if __name__ == "__main__":
+    # Тестовый запуск: файлы читаются стандартными pd.read_csv / pd.read_feather
+    import time
+    import numpy as np
+
+    rows = 300_000
+    rng = np.random.default_rng(0)
+    test_df = pd.DataFrame({
+        "uniq_id": [f"id{i}" for i in range(rows)],
+        "job_title": rng.choice(["Data Engineer", "Analyst, BI", 'Dev "Ops"'], rows),
+        "salary": rng.normal(50_000, 10_000, rows).round(2),
+        "has_expired": rng.choice([True, False], rows),
+    })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = os.path.join(tmp, "t.csv.gz")
+        start = time.perf_counter()
+        test_df.to_csv(base, index=False, compression="gzip")
+        pandas_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        path = write_csv(test_df, os.path.join(tmp, "t_export.csv.gz"), chunk_rows=50_000)
+        export_s = time.perf_counter() - start
+        pd.testing.assert_frame_equal(pd.read_csv(path), pd.read_csv(base))
+        print(f"   gzip: pandas {pandas_s:.2f} с, write_csv {export_s:.2f} с "
+              f"({os.path.getsize(base) / 2**20:.1f} -> {os.path.getsize(path) / 2**20:.1f} МБ)")
+
+        plain = write_csv(test_df, os.path.join(tmp, "t.csv"))
+        pd.testing.assert_frame_equal(pd.read_csv(plain), pd.read_csv(base))
+
+        if zstandard is not None:
+            path = write_csv(test_df, os.path.join(tmp, "t.csv.zst"), chunk_rows=50_000)
+            pd.testing.assert_frame_equal(pd.read_csv(path), pd.read_csv(base))
+
+        try:
+            write_csv(test_df, os.path.join(tmp, "t.csv.lz4"), codec="lz4")
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("lz4 для CSV не должен поддерживаться")
+
+        write_csv(test_df.iloc[:0], os.path.join(tmp, "empty.csv.gz"))
+        assert list(pd.read_csv(os.path.join(tmp, "empty.csv.gz")).columns) == list(test_df.columns)
+
+        for codec, level in (("lz4", None), ("zstd", 5), ("uncompressed", None)):
+            path = write_feather(test_df, os.path.join(tmp, f"t_{codec}.feather"), codec, level)
+            pd.testing.assert_frame_equal(pd.read_feather(path), test_df)
+
+    print("✅ Экспорт: CSV и Feather читаются стандартными функциями pandas")
@@ -4,16 +4,72 @@
 
 import pandas as pd
 import os
-from .validate import validate_raw_data
+from typing import Iterator, Optional, Tuple
+from .cache import cached_download
+from .options import DEFAULT_CHUNK_ROWS, RAW_DIR
+from .profiling import stage
+from .schema import read_csv
+from .staging import write_staging
+from .validate import RAW_RULES, Validator, print_report, validate_raw_data
 
 
-def extract_data(file_id: str, output_dir: str = "data/raw") -> str:
+def build_file_url(file_id: str) -> str:
+    """
+    Формирует URL для загрузки файла с Google Drive
+
+    Args:
+        file_id: Google Drive FILE_ID
+
+    Returns:
+        URL для загрузки
+    """
+    return f"https://drive.google.com/uc?export=download&id={file_id}"
+
+
+def resolve_source(source: str, use_cache: bool = True,
+                   refresh: bool = False) -> Tuple[str, Optional[str]]:
+    """
+    Определяет, откуда читать данные: локальный файл, кэш загрузок или URL
+
+    Args:
+        source: Google Drive FILE_ID или путь к локальному CSV файлу
+        use_cache: Использовать локальный кэш загрузок
+        refresh: Принудительно обновить файл в кэше
+
+    Returns:
+        Путь или URL для чтения и SHA-256 содержимого (None, если неизвестен)
+    """
+    if os.path.exists(source):
+        return source, None
+
+    file_url = build_file_url(source)
+    if not use_cache:
+        return file_url, None
+
+    cached = cached_download(source, file_url, refresh=refresh)
+    status = "обновлен" if cached.changed else "не изменился"
+    print(f"   ✓ Кэш загрузок: источник {status} ({cached.sha256[:12]})")
+    return cached.path, cached.sha256
+
+
+def extract_data(file_id: str, output_dir: str = RAW_DIR, use_cache: bool = True,
+                 refresh: bool = False, debug_csv: bool = False, csv_engine: str = "c",
+                 resolved: Optional[Tuple[str, Optional[str]]] = None) -> str:
     """
     Извлекает данные из Google Drive и сохраняет в data/raw
 
+    Сырые данные сохраняются в Arrow IPC (raw_data.arrow), который этап
+    transform читает через memory map без повторного разбора CSV.
+
     Args:
         file_id: Google Drive FILE_ID
         output_dir: Директория для сохранения сырых данных
+        use_cache: Использовать локальный кэш загрузок (data/cache)
+        refresh: Принудительно загрузить файл заново, минуя ревалидацию
+        debug_csv: Дополнительно сохранить raw_data.csv для отладки
+        csv_engine: Движок разбора CSV: "c" или "pyarrow" (многопоточный)
+        resolved: Уже полученный результат resolve_source (путь и хеш), чтобы
+            не ревалидировать кэш загрузок повторно
 
     Returns:
         Путь к сохраненному файлу
@@ -25,33 +81,58 @@ def extract_data(file_id: str, output_dir: str = "data/raw") -> str:
     # Создаем директорию если её нет
     os.makedirs(output_dir, exist_ok=True)
 
-    # URL для загрузки
-    file_url = f"https://drive.google.com/uc?export=download&id={file_id}"
+    output_path = os.path.join(output_dir, "raw_data.arrow")
+    # Хеш источника, из которого получен сохраненный raw_data.arrow
+    source_hash_path = output_path + ".sha256"
 
     try:
         # Загружаем данные
         print(f"\n1️⃣ Загрузка данных из Google Drive (FILE_ID: {file_id[:10]}...)")
-        raw_data = pd.read_csv(
-            file_url,
-            sep=",",
-            quotechar='"',
-            skipinitialspace=True,
-            encoding="utf-8",
-            on_bad_lines="skip"
-        )
+        if resolved is None:
+            with stage("extract.download"):
+                resolved = resolve_source(file_id, use_cache, refresh)
+        file_url, source_hash = resolved
+
+        # Источник не изменился - повторный разбор не нужен
+        if source_hash and not refresh and os.path.exists(output_path) \
+                and os.path.exists(source_hash_path):
+            with open(source_hash_path, encoding="utf-8") as f:
+                if f.read().strip() == source_hash:
+                    print(f"✅ Источник не изменился, используются сохраненные данные: {output_path}")
+                    return output_path
+
+        # Типизированный разбор за один проход по схеме etl.schema
+        with stage("extract.parse") as step:
+            raw_data = read_csv(file_url, engine=csv_engine)
+            step.read_file(file_url)
+            step.rows_out = len(raw_data)
 
         print(f"✅ Данные загружены: {raw_data.shape[0]} строк, {raw_data.shape[1]} столбцов")
 
         # Валидация сырых данных
         print("\n2️⃣ Валидация сырых данных...")
-        validate_raw_data(raw_data)
+        with stage("extract.validate") as step:
+            step.rows_in = len(raw_data)
+            validate_raw_data(raw_data)
         print("✅ Валидация пройдена")
 
         # Сохраняем в data/raw
-        output_path = os.path.join(output_dir, "raw_data.csv")
-        raw_data.to_csv(output_path, index=False)
+        if os.path.exists(source_hash_path):
+            os.remove(source_hash_path)
+        with stage("extract.staging") as step:
+            write_staging(raw_data, output_path)
+            step.rows_in = len(raw_data)
+            step.wrote_file(output_path)
+        if source_hash:
+            with open(source_hash_path, "w", encoding="utf-8") as f:
+                f.write(source_hash)
         print(f"\n3️⃣ Сырые данные сохранены: {output_path}")
 
+        if debug_csv:
+            csv_path = os.path.join(output_dir, "raw_data.csv")
+            raw_data.to_csv(csv_path, index=False)
+            print(f"   ✓ Отладочная копия CSV: {csv_path}")
+
         return output_path
 
     except Exception as e:
@@ -59,6 +140,49 @@ def extract_data(file_id: str, output_dir: str = "data/raw") -> str:
         raise
 
 
+def extract_stream(source: str, chunk_rows: int = DEFAULT_CHUNK_ROWS, use_cache: bool = True,
+                   refresh: bool = False, csv_engine: str = "c") -> Iterator[pd.DataFrame]:
+    """
+    Потоково извлекает данные порциями по chunk_rows строк.
+
+    В отличие от extract_data не держит весь файл в памяти и не пишет
+    промежуточный raw_data.csv. Правила RAW_RULES накапливаются по порциям и
+    проверяются после чтения всего потока.
+
+    Args:
+        source: Google Drive FILE_ID или путь к локальному CSV файлу
+        chunk_rows: Количество строк в одной порции
+        use_cache: Использовать локальный кэш загрузок (data/cache)
+        refresh: Принудительно загрузить файл заново, минуя ревалидацию
+        csv_engine: Движок разбора CSV: "c" или "pyarrow" (потоковый читатель Arrow)
+
+    Yields:
+        Порции сырых данных
+    """
+    print("=" * 70)
+    print(f"EXTRACT: Потоковая загрузка данных (порции по {chunk_rows} строк)")
+    print("=" * 70)
+
+    validator = Validator(RAW_RULES, stage="raw")
+    total_rows = 0
+
+    try:
+        file_url, _ = resolve_source(source, use_cache, refresh)
+        for chunk in read_csv(file_url, engine=csv_engine, chunksize=chunk_rows):
+            validator.update(chunk)
+            total_rows += len(chunk)
+            yield chunk
+
+        report = validator.report()
+        print_report(report)
+        report.raise_for_errors()
+        print(f"✅ Извлечено: {total_rows} строк")
+
+    except Exception as e:
+        print(f"❌ Ошибка при извлечении данных: {e}")
+        raise
+
+
 if __name__ == "__main__":
     # Тестовый запуск
     FILE_ID = "17jS24dobHhStIKS0M1m9kdGf4qST3r35"
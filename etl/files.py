@@ -0,0 +1,43 @@
+"""
+Модуль прав доступа файлов, записанных через временный файл.
+
+tempfile.mkstemp создает файл с правами 0600, и после os.replace итоговый
+файл получает их же - другие пользователи (и группа) не могут его прочитать,
+хотя обычный open() создал бы его с правами 0666 с учетом umask. Модуль не
+импортирует pandas и pyarrow: его использует etl.checkpoint, который
+загружается при разборе аргументов CLI.
+"""
+
+import os
+
+# umask процесса читается один раз при импорте: os.umask меняет его для всех
+# потоков сразу, а хранилища пишутся параллельно (etl.sinks)
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+def set_default_mode(path: str) -> None:
+    """
+    Выставляет файлу права, как у созданного open(): 0o666 с учетом umask
+
+    Args:
+        path: Временный файл перед os.replace
+    """
+    os.chmod(path, 0o666 & ~UMASK)
+
+
+if __name__ == "__main__":
+    # Тестовый запуск: временный файл получает права обычного файла
+    import stat
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = os.path.join(tmp, "plain")
+        open(plain, "w").close()
+        fd, temp = tempfile.mkstemp(dir=tmp)
+        os.close(fd)
+        assert stat.S_IMODE(os.stat(temp).st_mode) == 0o600
+        set_default_mode(temp)
+        assert stat.S_IMODE(os.stat(temp).st_mode) == stat.S_IMODE(os.stat(plain).st_mode)
+
+    print(f"✅ Права файлов: {0o666 & ~UMASK:o} (umask {UMASK:03o})")
@@ -1,12 +0,0 @@
-"""
-ETL пакет для обработки данных о вакансиях.
-"""
-
-__version__ = "1.0.0"
-__author__ = "Demidova"
-
-from .extract import extract_data
-from .transform import transform_data
-from .load import load_data
-
-__all__ = ['extract_data', 'transform_data', 'load_data']
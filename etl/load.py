@@ -4,13 +4,40 @@
 
 import pandas as pd
 import os
-import sqlite3
-from sqlalchemy import create_engine
+from typing import Iterable, List, Optional, Sequence
+from sqlalchemy import inspect, text
+from .bulk import copy_dataframe
+from .dataset import upsert_dataset, write_dataset
+from .db import connect, get_engine, is_configured
+from .dtypes import optimize_dtypes, print_memory_report, widen_numbers
+from .export import write_csv, write_feather
+from .options import DEFAULT_SINKS, PROCESSED_DIR, RAW_DATA_PATH, SINKS, STREAM_SINKS
+from .profiling import stage
+from .sinks import SinkResult, run_sinks
+from .staging import read_staging
 from .validate import validate_loaded_data
 
+# Метка содержимого хранилища - ключ контрольной точки этапа load (etl.checkpoint):
+# в метаданных схемы Parquet и в комментарии таблицы PostgreSQL. Запись без
+# ключа (инкрементальная, потоковая) метку снимает
+CHECKPOINT_METADATA_KEY = "etl_checkpoint"
+STAMPED_SINKS = ("parquet", "postgres")
 
-def load_to_parquet(df: pd.DataFrame, output_dir: str = "data/processed",
-                    filename: str = "processed_data.parquet") -> str:
+
+def _stamp_schema(schema, checkpoint: Optional[str]):
+    """
+    Схема Arrow с меткой checkpoint в метаданных (None - без метки)
+    """
+    metadata = {k: v for k, v in (schema.metadata or {}).items()
+                if k != CHECKPOINT_METADATA_KEY.encode()}
+    if checkpoint:
+        metadata[CHECKPOINT_METADATA_KEY.encode()] = checkpoint.encode()
+    return schema.with_metadata(metadata)
+
+
+def load_to_parquet(df: pd.DataFrame, output_dir: str = PROCESSED_DIR,
+                    filename: str = "processed_data.parquet",
+                    checkpoint: Optional[str] = None) -> str:
     """
     Сохраняет данные в формате Parquet
 
@@ -18,107 +45,464 @@ def load_to_parquet(df: pd.DataFrame, output_dir: str = "data/processed",
         df: DataFrame для сохранения
         output_dir: Директория для сохранения
         filename: Имя файла
+        checkpoint: Ключ контрольной точки load для метаданных файла
 
     Returns:
         Путь к сохраненному файлу
     """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
     os.makedirs(output_dir, exist_ok=True)
     output_path = os.path.join(output_dir, filename)
 
-    df.to_parquet(output_path, index=False, compression='snappy')
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(_stamp_schema(table.schema, checkpoint).metadata)
+    pq.write_table(table, output_path, compression="snappy")
     print(f"✅ Данные сохранены в Parquet: {output_path}")
 
     return output_path
 
 
-def load_to_database(df: pd.DataFrame, table_name: str = "demidova", max_rows: int = 100) -> None:
+def upsert_to_parquet(df: pd.DataFrame, output_dir: str = PROCESSED_DIR,
+                      filename: str = "processed_data.parquet", key: str = "uniq_id") -> str:
     """
-    Загружает данные в PostgreSQL базу данных
+    Добавляет новые и заменяет измененные строки в существующем Parquet файле
+
+    Строки существующего файла с тем же значением key заменяются строками df.
+    Файл перезаписывается атомарно через временный файл.
 
     Args:
-        df: DataFrame для загрузки
-        table_name: Название таблицы
-        max_rows: Максимальное количество строк для загрузки
+        df: Новые и измененные строки
+        output_dir: Директория для сохранения
+        filename: Имя файла
+        key: Ключевой столбец
+
+    Returns:
+        Путь к сохраненному файлу
     """
-    print(f"\n2️⃣ Загрузка данных в PostgreSQL (таблица: {table_name})...")
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
 
-    try:
-        # Ограничиваем количество строк
-        df_to_load = df.head(max_rows)
-        print(f"   Отобрано для загрузки: {len(df_to_load)} строк (max: {max_rows})")
-
-        # Загрузка credentials из SQLite
-        conn = sqlite3.connect("creds.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT url, port, user, pass FROM access;")
-        row = cursor.fetchone()
-        conn.close()
-
-        if not row:
-            raise Exception("Не найдены учетные данные в creds.db")
-
-        url, port, user, password = row
-
-        # Создание engine для PostgreSQL
-        engine_url = f"postgresql+psycopg2://{user}:{password}@{url}:{port}/homeworks"
-        engine = create_engine(engine_url)
-
-        # Загрузка в БД
-        df_to_load.to_sql(
-            name=table_name,
-            con=engine,
-            schema="public",
-            if_exists="replace",
-            index=False
-        )
-
-        print(f"✅ Данные загружены в БД: public.{table_name} ({len(df_to_load)} строк)")
-
-    except FileNotFoundError:
-        print("⚠️  Файл creds.db не найден. Пропуск загрузки в БД.")
-    except Exception as e:
-        print(f"⚠️  Ошибка при загрузке в БД: {e}")
+    output_path = os.path.join(output_dir, filename)
+    if not os.path.exists(output_path):
+        return load_to_parquet(df, output_dir, filename)
+
+    existing = pq.read_table(output_path)
+    schema = _widen_dictionaries(existing.schema)
+    delta = pa.Table.from_pandas(df, preserve_index=False).select(schema.names).cast(schema)
+    existing = existing.cast(schema)
+
+    replaced = pc.is_in(existing[key], value_set=delta[key].combine_chunks())
+    replaced_rows = pc.sum(replaced).as_py() or 0
+    existing = existing.filter(pc.invert(replaced))
+    combined = pa.concat_tables([existing, delta]).unify_dictionaries()
+    # Содержимое изменилось - метка полной загрузки больше не верна
+    combined = combined.replace_schema_metadata(_stamp_schema(combined.schema, None).metadata)
+
+    tmp_path = output_path + ".part"
+    pq.write_table(combined, tmp_path, compression="snappy")
+    os.replace(tmp_path, output_path)
+    print(f"✅ Данные обновлены в Parquet: {output_path} "
+          f"(+{len(delta)} строк, из них заменено {replaced_rows})")
+
+    return output_path
+
+
+def load_to_feather(df: pd.DataFrame, output_dir: str = PROCESSED_DIR,
+                    filename: str = "processed_data.feather") -> str:
+    """
+    Сохраняет данные в формате Feather (сжатие lz4, etl.export)
+
+    Args:
+        df: DataFrame для сохранения
+        output_dir: Директория для сохранения
+        filename: Имя файла
+
+    Returns:
+        Путь к сохраненному файлу
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, filename)
+
+    write_feather(df, output_path)
+    print(f"✅ Данные сохранены в Feather: {output_path}")
+
+    return output_path
+
+
+def load_to_csv(df: pd.DataFrame, output_dir: str = PROCESSED_DIR,
+                filename: str = "processed_data.csv.gz") -> str:
+    """
+    Сохраняет данные в сжатый CSV (кодек по расширению файла, сжатие в
+    несколько потоков, etl.export)
+
+    Args:
+        df: DataFrame для сохранения
+        output_dir: Директория для сохранения
+        filename: Имя файла
+
+    Returns:
+        Путь к сохраненному файлу
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, filename)
+
+    write_csv(df, output_path)
+    print(f"✅ Данные сохранены в CSV: {output_path}")
+
+    return output_path
+
+
+def _write_to_database(df: pd.DataFrame, table_name: str, max_rows: Optional[int],
+                       if_exists: str, method: str, checkpoint: Optional[str] = None) -> int:
+    """
+    Загружает данные в PostgreSQL; ошибки не перехватываются
+
+    Ключ checkpoint записывается в комментарий таблицы в той же транзакции
+    (None - комментарий снимается).
+
+    Returns:
+        Количество загруженных строк
+    """
+    # Ограничиваем количество строк
+    df_to_load = df if max_rows is None else df.head(max_rows)
+    print(f"   Отобрано для загрузки: {len(df_to_load)} строк (max: {max_rows or 'без ограничения'})")
+
+    # Загрузка в БД (соединение из общего пула)
+    with connect() as conn:
+        if method == "copy":
+            copy_dataframe(df_to_load, conn, table_name, schema="public", mode=if_exists)
+        else:
+            if if_exists == "upsert" and inspect(conn).has_table(table_name, schema="public"):
+                ids = df_to_load["uniq_id"].dropna().tolist()
+                conn.execute(
+                    text(f'DELETE FROM public."{table_name}" WHERE uniq_id = ANY(:ids)'),
+                    {"ids": ids}
+                )
+            df_to_load.to_sql(
+                name=table_name,
+                con=conn,
+                schema="public",
+                if_exists="append" if if_exists == "upsert" else if_exists,
+                index=False
+            )
+        # Ключ - шестнадцатеричная строка (etl.checkpoint.stage_key)
+        comment = f"'{CHECKPOINT_METADATA_KEY}={checkpoint}'" if checkpoint else "NULL"
+        conn.execute(text(f'COMMENT ON TABLE public."{table_name}" IS {comment}'))
+
+    print(f"✅ Данные загружены в БД: public.{table_name} ({len(df_to_load)} строк)")
+    return len(df_to_load)
+
+
+def loaded_checkpoint(sink: str, table_name: str = "demidova",
+                      output_dir: str = PROCESSED_DIR) -> Optional[str]:
+    """
+    Ключ контрольной точки load, с которым записано текущее содержимое хранилища
 
+    Args:
+        sink: Хранилище (метку хранят только STAMPED_SINKS)
+        table_name: Название таблицы в БД
+        output_dir: Директория файлов
 
-def load_data(df: pd.DataFrame, table_name: str = "demidova", max_rows: int = 100,
-              output_dir: str = "data/processed") -> None:
+    Returns:
+        Ключ или None, если метки нет или хранилище недоступно
     """
-    Загружает данные в БД и сохраняет в Parquet
+    if sink == "parquet":
+        import pyarrow.parquet as pq
+
+        path = os.path.join(output_dir, "processed_data.parquet")
+        if not os.path.exists(path):
+            return None
+        try:
+            metadata = pq.read_schema(path).metadata or {}
+        except Exception:
+            return None
+        value = metadata.get(CHECKPOINT_METADATA_KEY.encode())
+        return value.decode() if value else None
+
+    if sink == "postgres":
+        try:
+            with connect() as conn:
+                comment = conn.execute(
+                    text("SELECT obj_description(to_regclass(:name), 'pg_class')"),
+                    {"name": f'public."{table_name}"'}
+                ).scalar()
+        except Exception:
+            return None
+        prefix = f"{CHECKPOINT_METADATA_KEY}="
+        return comment[len(prefix):] if comment and comment.startswith(prefix) else None
+
+    return None
+
+
+def load_data(df: pd.DataFrame, table_name: str = "demidova", max_rows: Optional[int] = None,
+              output_dir: str = PROCESSED_DIR, incremental: bool = False,
+              db_method: str = "copy", sinks: Sequence[str] = DEFAULT_SINKS,
+              compact_dtypes: bool = True, checkpoint: Optional[str] = None) -> List[SinkResult]:
+    """
+    Загружает данные во все выбранные хранилища параллельно
+
+    Parquet (обязательное хранилище, если выбрано) при ошибке прерывает загрузку;
+    ошибки остальных хранилищ выводятся, но не прерывают загрузку - их видно
+    по результатам (SinkResult.ok). PostgreSQL без настроенного подключения
+    (etl.db.is_configured) пропускается и в результаты не входит.
 
     Args:
         df: DataFrame для загрузки
         table_name: Название таблицы в БД
-        max_rows: Максимальное количество строк для БД
-        output_dir: Директория для Parquet файла
+        max_rows: Максимальное количество строк для БД (None - без ограничения)
+        output_dir: Директория для файлов
+        incremental: Дописать/обновить строки по uniq_id вместо полной перезаписи
+        db_method: Способ загрузки в БД: "copy" или "to_sql"
+        sinks: Хранилища из SINKS ("dataset" - Parquet датасет с секциями
+            по country_code и месяцу date_added, см. etl.dataset)
+        compact_dtypes: Перед записью выбрать компактные типы столбцов по данным
+            (etl.dtypes) - их получают все хранилища, кроме чисел в БД
+            (там полная разрядность, см. etl.dtypes.widen_numbers)
+        checkpoint: Ключ контрольной точки load: записывается в метаданные
+            Parquet и комментарий таблицы PostgreSQL (см. loaded_checkpoint)
+
+    Returns:
+        Результаты записи по хранилищам (пустой список, если загружать нечего)
     """
     print("\n" + "=" * 70)
     print("LOAD: Загрузка данных")
     print("=" * 70)
 
+    if incremental and df.empty:
+        print("\n✅ Новых данных нет, загрузка не требуется")
+        return []
+
+    unknown = set(sinks) - set(SINKS)
+    if unknown:
+        raise ValueError(f"Неизвестные хранилища: {', '.join(sorted(unknown))} "
+                         f"(доступны: {', '.join(SINKS)})")
+
     try:
         # Валидация перед загрузкой
         print("\n1️⃣ Валидация данных перед загрузкой...")
-        validate_loaded_data(df)
+        with stage("load.validate") as step:
+            step.rows_in = len(df)
+            validate_loaded_data(df)
         print("✅ Валидация пройдена")
 
-        # Сохранение в Parquet
-        print("\n2️⃣ Сохранение в Parquet...")
-        parquet_path = load_to_parquet(df, output_dir)
+        # Компактные типы: category, bool, float32 и т.п. по данным
+        if compact_dtypes:
+            print("\n2️⃣ Выбор компактных типов столбцов...")
+            with stage("load.dtypes") as step:
+                step.rows_in = step.rows_out = len(df)
+                df, memory_report = optimize_dtypes(df)
+            print_memory_report(memory_report)
+
+        writers = {
+            "parquet": lambda data: (upsert_to_parquet(data, output_dir) if incremental
+                                     else load_to_parquet(data, output_dir, checkpoint=checkpoint)),
+            "dataset": lambda data: (upsert_dataset if incremental else write_dataset)(
+                data, os.path.join(output_dir, "processed_data")
+            ),
+            "feather": lambda data: load_to_feather(data, output_dir),
+            "csv": lambda data: load_to_csv(data, output_dir),
+            # Столбцы таблицы создаются по типам DataFrame: без суженных чисел
+            "postgres": lambda data: _write_to_database(
+                widen_numbers(data), table_name, max_rows, "upsert" if incremental else "replace", db_method,
+                None if incremental else checkpoint
+            ),
+        }
+        if incremental:
+            # Файлы без поддержки upsert содержали бы только изменения
+            skipped = [name for name in sinks if name in ("feather", "csv")]
+            if skipped:
+                print(f"⚠️  Инкрементальный режим не поддерживается для: {', '.join(skipped)}")
+            sinks = [name for name in sinks if name not in skipped]
+        if "postgres" in sinks and not is_configured():
+            # Пропуск по настройке, а не ошибка записи: инкрементальный режим
+            # без БД работает так же, как полная загрузка
+            print("⚠️  Файл creds.db не найден. Пропуск загрузки в БД.")
+            sinks = [name for name in sinks if name != "postgres"]
+
+        # Запись во все хранилища одновременно
+        print(f"\n3️⃣ Параллельная запись: {', '.join(sinks)}...")
+        results = run_sinks(df, {name: writers[name] for name in sinks})
+
+        for result in results:
+            if result.ok:
+                continue
+            if result.name == "parquet":
+                raise result.error
+            print(f"⚠️  Ошибка хранилища {result.name}: {result.error}")
+
+        failed = [result.name for result in results if not result.ok]
+        print("\n" + "=" * 70)
+        if failed:
+            print(f"⚠️  LOAD ЗАВЕРШЕН С ОШИБКАМИ (не загружено: {', '.join(failed)})")
+        else:
+            print("✅ LOAD ЗАВЕРШЕН УСПЕШНО")
+        print("=" * 70)
+        return results
+
+    except Exception as e:
+        print(f"❌ Ошибка при загрузке данных: {e}")
+        raise
+
+
+def _arrow_stream_schema(df: pd.DataFrame):
+    """
+    Строит схему Parquet для потоковой записи по первой порции.
+    """
+    import pyarrow as pa
+
+    return _widen_dictionaries(pa.Schema.from_pandas(df, preserve_index=False))
+
+
+def _widen_dictionaries(schema):
+    """
+    Фиксирует индексы словарей (категорий) как int32.
+
+    Категории в разных порциях и загрузках различаются, поэтому индексы
+    приводятся к одному типу, чтобы схема подходила для всех частей.
+    """
+    import pyarrow as pa
+
+    for i, field in enumerate(schema):
+        if pa.types.is_dictionary(field.type):
+            schema = schema.set(i, field.with_type(pa.dictionary(pa.int32(), field.type.value_type)))
+    return schema
+
+
+def load_stream(chunks: Iterable[pd.DataFrame], table_name: str = "demidova",
+                max_rows: Optional[int] = None,
+                output_dir: str = PROCESSED_DIR,
+                filename: str = "processed_data.parquet",
+                db_method: str = "copy",
+                sinks: Sequence[str] = DEFAULT_SINKS) -> Optional[str]:
+    """
+    Потоково загружает порции данных в Parquet и PostgreSQL.
+
+    Parquet пишется по row group на порцию во временный файл, который
+    переименовывается только после успешного завершения потока. В БД все
+    порции (не более max_rows строк суммарно) передаются в одной транзакции.
+    Если поток прерывается ошибкой (например, глобальная валидация в
+    transform_stream не пройдена), временный файл удаляется, транзакция откатывается.
+
+    Компактные типы (etl.dtypes) в потоке не подбираются: тип столбца,
+    выбранный по одной порции, может не подойти следующей.
+
+    Args:
+        chunks: Порции трансформированных данных
+        table_name: Название таблицы в БД
+        max_rows: Максимальное количество строк для БД (None - без ограничения)
+        output_dir: Директория для Parquet файла
+        filename: Имя Parquet файла
+        db_method: Способ загрузки в БД: "copy" или "to_sql"
+        sinks: Хранилища из STREAM_SINKS
+
+    Returns:
+        Путь к сохраненному Parquet файлу (None, если parquet не выбран)
+
+    Raises:
+        ValueError: Если хранилище не поддерживается в потоковом режиме
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
 
-        # Загрузка в БД
-        print("\n3️⃣ Загрузка в базу данных...")
-        load_to_database(df, table_name, max_rows)
+    unsupported = set(sinks) - set(STREAM_SINKS)
+    if unsupported:
+        raise ValueError(f"Хранилища не поддерживаются в потоковом режиме: "
+                         f"{', '.join(sorted(unsupported))} (доступны: {', '.join(STREAM_SINKS)})")
+
+    print("\n" + "=" * 70)
+    print("LOAD: Потоковая загрузка данных")
+    print("=" * 70)
+
+    to_parquet = "parquet" in sinks
+    output_path = os.path.join(output_dir, filename)
+    tmp_path = output_path + ".part"
+    if to_parquet:
+        os.makedirs(output_dir, exist_ok=True)
+
+    writer = None
+    schema = None
+    db_conn = None
+    db_tx = None
+    db_rows = 0
+    total_rows = 0
+
+    # Подключение к БД (ошибка подключения не прерывает запись в Parquet)
+    if "postgres" in sinks:
+        try:
+            db_conn = get_engine().connect()
+            db_tx = db_conn.begin()
+        except FileNotFoundError:
+            print("⚠️  Файл creds.db не найден. Пропуск загрузки в БД.")
+        except Exception as e:
+            print(f"⚠️  Ошибка подключения к БД: {e}")
+
+    try:
+        for i, chunk in enumerate(chunks, 1):
+            # Parquet
+            if to_parquet:
+                if writer is None:
+                    schema = _arrow_stream_schema(chunk)
+                    writer = pq.ParquetWriter(tmp_path, schema, compression="snappy")
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            total_rows += len(chunk)
+
+            # PostgreSQL
+            if db_conn is not None and (max_rows is None or db_rows < max_rows):
+                part = chunk if max_rows is None else chunk.head(max_rows - db_rows)
+                mode = "replace" if db_rows == 0 else "append"
+                try:
+                    if db_method == "copy":
+                        copy_dataframe(part, db_conn, table_name, schema="public", mode=mode)
+                    else:
+                        part.to_sql(name=table_name, con=db_conn, schema="public",
+                                    if_exists=mode, index=False)
+                    db_rows += len(part)
+                except Exception as e:
+                    print(f"⚠️  Ошибка при загрузке в БД: {e}")
+                    db_tx.rollback()
+                    db_conn.close()
+                    db_conn = None
+
+            print(f"   ✓ Порция {i}: {len(chunk)} строк (всего {total_rows})")
+
+        if total_rows == 0:
+            raise ValueError("Нет данных для загрузки!")
+
+        if writer is not None:
+            writer.close()
+            writer = None
+            os.replace(tmp_path, output_path)
+            print(f"✅ Данные сохранены в Parquet: {output_path} ({total_rows} строк)")
+
+        if db_conn is not None:
+            db_tx.commit()
+            print(f"✅ Данные загружены в БД: public.{table_name} ({db_rows} строк)")
 
         print("\n" + "=" * 70)
         print("✅ LOAD ЗАВЕРШЕН УСПЕШНО")
         print("=" * 70)
 
+        return output_path if to_parquet else None
+
     except Exception as e:
         print(f"❌ Ошибка при загрузке данных: {e}")
+        if writer is not None:
+            writer.close()
+        if to_parquet and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        if db_conn is not None:
+            db_tx.rollback()
         raise
 
+    finally:
+        if db_conn is not None:
+            db_conn.close()
+
 
 if __name__ == "__main__":
     # Тестовый запуск
-    df = pd.read_csv("data/raw/raw_data.csv")
+    df = read_staging(RAW_DATA_PATH)
     load_data(df)
@@ -1,36 +1,376 @@
 """
 Главный модуль ETL пакета с CLI интерфейсом.
+
+Команды запускают весь процесс или отдельные этапы на уже сохраненных
+промежуточных файлах:
+    run       - extract, transform и load подряд (команда по умолчанию)
+    extract   - загрузка и валидация сырых данных -> data/raw/raw_data.arrow
+    transform - data/raw/raw_data.arrow -> data/processed/transformed_data.arrow
+    load      - data/processed/transformed_data.arrow -> хранилища
+
+Команда run сохраняет результаты этапов в контрольных точках (etl/checkpoint.py)
+и при повторном запуске с теми же входами пропускает выполненные этапы:
+после сбоя загрузки в БД повторяется только запись в хранилища, содержимое
+которых не записано с ключом этого запуска.
+
+Все каталоги данных отсчитываются от ETL_DATA_DIR (по умолчанию
+<корень проекта>/data, etl/options.py), а не от текущей директории.
+
+Модули этапов (pandas, pyarrow, SQLAlchemy) импортируются внутри функций,
+поэтому --help и разбор аргументов не загружают тяжелые зависимости
+(время запуска проверяет benchmarks/startup.py).
 """
 
 import argparse
+import contextlib
+import os
 import sys
-from etl.extract import extract_data
-from etl.transform import transform_data
-from etl.load import load_data
+from typing import Optional, Sequence
+
+from etl.checkpoint import DEFAULT_CHECKPOINT_DIR, STAGES, parse_stages
+from etl.options import (DEDUP_STRATEGIES, DEFAULT_CHUNK_ROWS, DEFAULT_SINKS, RAW_DATA_PATH,
+                         SINKS, STREAM_SINKS, TRANSFORMED_DATA_PATH)
+from etl.profiling import DEFAULT_PROFILE_DIR, JsonLinesWriter, Profiler, stage
+
+COMMANDS = ("run", "extract", "transform", "load")
+
+
+def run_extract(file_id: str, use_cache: bool = True, refresh: bool = False,
+                debug_csv: bool = False, csv_engine: str = "c", eda_profile: bool = True,
+                checkpoints=None) -> str:
+    """
+    Этап EXTRACT: загрузка, валидация и сохранение сырых данных
+
+    Args:
+        file_id: Google Drive FILE_ID или путь к локальному CSV файлу
+        use_cache: Использовать локальный кэш загрузок (data/cache)
+        refresh: Принудительно загрузить исходный файл заново
+        debug_csv: Сохранить отладочную копию сырых данных в CSV
+        csv_engine: Движок разбора CSV ("c" или "pyarrow")
+        eda_profile: Сохранить профиль сырых данных для EDA (data/eda), если
+            для этих данных его еще нет
+        checkpoints: Контрольные точки запуска (etl.checkpoint.RunCheckpoints):
+            результат берется по хешу источника, если он уже был получен
+
+    Returns:
+        Путь к промежуточному файлу (data/raw/raw_data.arrow)
+    """
+    from etl.extract import extract_data, resolve_source
+
+    with stage("extract") as step:
+        raw_data_path, resolved, key = None, None, None
+        if checkpoints is not None:
+            with stage("extract.download"):
+                resolved = resolve_source(file_id, use_cache, refresh)
+                if resolved[1] is None and os.path.isfile(resolved[0]):
+                    from etl.eda import file_sha256
+
+                    resolved = (resolved[0], file_sha256(resolved[0]))
+            if resolved[1] is None:
+                print("⚠️  Хеш источника неизвестен (загрузка без кэша), контрольные точки не используются")
+            else:
+                key = checkpoints.key("extract", source=resolved[1], csv_engine=csv_engine)
+                if not checkpoints.forced("extract") and not debug_csv:
+                    raw_data_path = checkpoints.store.restore("extract", key, RAW_DATA_PATH)
+            checkpoints.keys["extract"] = key
+
+        if raw_data_path is not None:
+            # Хеш источника рядом с файлом, как после extract_data (etl.eda)
+            with open(raw_data_path + ".sha256", "w", encoding="utf-8") as f:
+                f.write(resolved[1])
+            print(f"✅ Контрольная точка extract ({key[:12]}): {raw_data_path}")
+        else:
+            forced = checkpoints is not None and checkpoints.forced("extract")
+            raw_data_path = extract_data(file_id, output_dir=os.path.dirname(RAW_DATA_PATH),
+                                         use_cache=use_cache, refresh=refresh or forced,
+                                         debug_csv=debug_csv, csv_engine=csv_engine,
+                                         resolved=resolved)
+            if key is not None:
+                checkpoints.store.put("extract", key, raw_data_path, source=file_id)
+        step.wrote_file(raw_data_path)
+
+    # Профиль сырых данных для notebooks/EDA.ipynb (по хешу исходного файла)
+    if eda_profile:
+        from etl.eda import profile_staging
+
+        with stage("profile") as step:
+            step.read_file(raw_data_path)
+            step.wrote_file(profile_staging(raw_data_path, source=file_id))
+
+    return raw_data_path
+
+
+def run_transform(input_path: str = RAW_DATA_PATH, dedup_strategy: str = "row",
+                  validation_sample: bool = False, workers: int = 1, state=None, dedup=None,
+                  output_path: Optional[str] = None, checkpoints=None):
+    """
+    Этап TRANSFORM по промежуточному файлу этапа extract
+
+    Args:
+        input_path: Сырые данные (Arrow IPC из extract или CSV)
+        dedup_strategy: Стратегия удаления дубликатов (если dedup не задан)
+        validation_sample: Проверять доли пропусков и диапазоны по выборке
+        workers: Количество процессов для трансформации по частям
+        state: Состояние инкрементальной загрузки (etl.state.IncrementalState)
+        dedup: Стратегия и индекс удаления дубликатов (etl.dedup.Deduplicator)
+        output_path: Сохранить результат в Arrow IPC для отдельного этапа load
+        checkpoints: Контрольные точки запуска (etl.checkpoint.RunCheckpoints):
+            результат берется по ключу этапа extract и параметрам удаления
+            дубликатов и валидации; не используются с состоянием
+            инкрементальной загрузки
+
+    Returns:
+        Трансформированный DataFrame
+
+    Raises:
+        FileNotFoundError: Если промежуточного файла нет
+    """
+    from etl.dedup import Deduplicator
+    from etl.transform import transform_data
+    from etl.validate import Sampling
+
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"Нет файла {input_path}: сначала выполните этап extract")
+
+    key, checkpoint_path = None, None
+    if checkpoints is not None:
+        if state is None and checkpoints.keys.get("extract"):
+            # workers не влияет на результат и в ключ не входит
+            key = checkpoints.key("transform", raw=checkpoints.keys["extract"],
+                                  dedup=dedup_strategy, validation_sample=validation_sample)
+            if not checkpoints.forced("transform"):
+                checkpoint_path = checkpoints.store.get("transform", key)
+        checkpoints.keys["transform"] = key
+
+    if checkpoint_path is not None:
+        from etl.staging import read_staging
+
+        with stage("transform") as step:
+            transformed_df = read_staging(checkpoint_path)
+            step.read_file(checkpoint_path)
+            step.rows_out = len(transformed_df)
+        print(f"✅ Контрольная точка transform ({key[:12]}): {len(transformed_df)} строк")
+    else:
+        with stage("transform") as step:
+            transformed_df = transform_data(input_path, state=state,
+                                            dedup=dedup or Deduplicator(dedup_strategy),
+                                            sampling=Sampling() if validation_sample else None,
+                                            workers=workers)
+            step.read_file(input_path)
+            step.rows_out = len(transformed_df)
+
+        if key is not None:
+            from etl.staging import write_staging
+
+            with stage("transform.checkpoint") as step:
+                step.rows_in = len(transformed_df)
+                step.wrote_file(checkpoints.store.save(
+                    "transform", key, lambda path: write_staging(transformed_df, path),
+                    rows=len(transformed_df)))
+
+    if output_path:
+        from etl.staging import write_staging
+
+        with stage("transform.staging") as step:
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+            step.rows_in = len(transformed_df)
+            step.wrote_file(write_staging(transformed_df, output_path))
+        print(f"✅ Трансформированные данные сохранены: {output_path}")
+
+    return transformed_df
+
+
+def run_load(df=None, input_path: str = TRANSFORMED_DATA_PATH, table_name: str = "demidova",
+             max_rows: Optional[int] = None, incremental: bool = False,
+             db_method: str = "copy", sinks: Sequence[str] = DEFAULT_SINKS,
+             compact_dtypes: bool = True, checkpoints=None) -> list:
+    """
+    Этап LOAD: запись трансформированных данных в хранилища
+
+    Args:
+        df: Трансформированные данные; None - прочитать input_path
+        input_path: Промежуточный файл этапа transform
+        table_name: Название таблицы в БД
+        max_rows: Максимальное количество строк для БД (None - без ограничения)
+        incremental: Дописать/обновить строки по uniq_id вместо полной перезаписи
+        db_method: Способ загрузки в PostgreSQL: "copy" или "to_sql"
+        sinks: Хранилища (etl.options.SINKS)
+        compact_dtypes: Перед загрузкой выбрать компактные типы столбцов по данным
+        checkpoints: Контрольные точки запуска (etl.checkpoint.RunCheckpoints):
+            ключ этапа load (по ключу transform и параметрам загрузки)
+            записывается в Parquet и PostgreSQL, и хранилище пропускается,
+            только если его текущее содержимое записано с тем же ключом
+            (etl.load.loaded_checkpoint); остальные хранилища пишутся всегда
 
+    Returns:
+        Результаты записи по хранилищам (etl.sinks.SinkResult); хранилища,
+        пропущенные по контрольной точке, в них не входят
 
-def run_etl(file_id: str, table_name: str = "demidova", max_rows: int = 100) -> None:
+    Raises:
+        FileNotFoundError: Если df не передан и промежуточного файла нет
+    """
+    from etl.load import load_data
+
+    if df is None:
+        from etl.staging import read_staging
+
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"Нет файла {input_path}: сначала выполните этап transform")
+        with stage("load.read") as step:
+            df = read_staging(input_path)
+            step.read_file(input_path)
+            step.rows_out = len(df)
+
+    key = None
+    if checkpoints is not None and checkpoints.keys.get("transform") and not incremental:
+        from etl.load import STAMPED_SINKS, loaded_checkpoint
+
+        key = checkpoints.key("load", data=checkpoints.keys["transform"], table=table_name,
+                              max_rows=max_rows, db_method=db_method,
+                              compact_dtypes=compact_dtypes)
+        if not checkpoints.forced("load"):
+            # Метку проверяет само хранилище: файл мог быть перезаписан другим
+            # запуском или удален, таблица - пересоздана
+            done = [name for name in sinks
+                    if name in STAMPED_SINKS and loaded_checkpoint(name, table_name) == key]
+            if done:
+                print(f"✅ Контрольная точка load: уже загружено в {', '.join(done)}")
+            sinks = [name for name in sinks if name not in done]
+            if not sinks:
+                return []
+
+    with stage("load") as step:
+        step.rows_in = len(df)
+        return load_data(df, table_name, max_rows, incremental=incremental,
+                         db_method=db_method, sinks=sinks, compact_dtypes=compact_dtypes,
+                         checkpoint=key)
+
+
+def run_etl(file_id: str, table_name: str = "demidova", max_rows: Optional[int] = None,
+            stream: bool = False, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+            use_cache: bool = True, refresh: bool = False, debug_csv: bool = False,
+            csv_engine: str = "c", incremental: bool = False, full_refresh: bool = False,
+            dedup_strategy: str = "row", db_method: str = "copy",
+            sinks: Sequence[str] = DEFAULT_SINKS, validation_sample: bool = False,
+            workers: int = 1, compact_dtypes: bool = True, eda_profile: bool = True,
+            checkpoints: bool = True, force_stages: Sequence[str] = ()) -> None:
     """
     Запускает полный ETL процесс
 
     Args:
         file_id: Google Drive FILE_ID для загрузки данных
         table_name: Название таблицы в БД
-        max_rows: Максимальное количество строк для загрузки в БД
+        max_rows: Максимальное количество строк для загрузки в БД (None - без ограничения)
+        stream: Потоковый режим - данные проходят этапы порциями с ограниченной памятью
+            (хранилища только из STREAM_SINKS, без подбора компактных типов)
+        chunk_rows: Количество строк в порции для потокового режима
+        use_cache: Использовать локальный кэш загрузок (data/cache)
+        refresh: Принудительно загрузить исходный файл заново
+        debug_csv: Сохранить отладочную копию сырых данных в CSV
+        csv_engine: Движок разбора CSV ("c" или "pyarrow")
+        incremental: Обрабатывать только строки, новые или измененные с прошлого запуска
+        full_refresh: Полная перезагрузка со сбросом состояния инкрементальной загрузки
+        dedup_strategy: Стратегия удаления дубликатов: "row", "uniq_id" или "page_url"
+        db_method: Способ загрузки в PostgreSQL: "copy" (COPY FROM STDIN) или "to_sql"
+        sinks: Хранилища, в которые данные записываются параллельно (etl.load.SINKS)
+        validation_sample: Проверять доли пропусков и диапазоны по выборке
+            (погрешность ±1 п.п. с вероятностью 99%) на данных от 1 млн строк
+        workers: Количество процессов для трансформации по частям (1 - в текущем процессе)
+        compact_dtypes: Перед загрузкой выбрать компактные типы столбцов по данным
+        eda_profile: Сохранить профиль сырых данных для EDA (data/eda), если
+            для этих данных его еще нет; в потоковом режиме - профиль на
+            скетчах (data/eda/sketch_profile.json, etl/sketches.py)
+        checkpoints: Пропускать этапы, результат которых для тех же входов,
+            параметров и версии кода уже есть в контрольных точках
+            (data/checkpoints, etl/checkpoint.py); не используется в потоковом
+            режиме, в инкрементальном - только для extract
+        force_stages: Этапы, которые выполняются заново даже при наличии
+            контрольной точки (вместе со всеми следующими этапами)
     """
     print("\n" + "🚀 " * 35)
-    print("ЗАПУСК ETL ПРОЦЕССА")
+    print("ЗАПУСК ETL ПРОЦЕССА" + (" (ПОТОКОВЫЙ РЕЖИМ)" if stream else ""))
     print("🚀 " * 35 + "\n")
 
+    run_checkpoints = None
     try:
-        # EXTRACT
-        raw_data_path = extract_data(file_id)
+        if stream:
+            from etl.dedup import Deduplicator
+            from etl.eda import DEFAULT_EDA_DIR
+            from etl.extract import extract_stream
+            from etl.load import load_stream
+            from etl.sketches import SketchProfiler, print_sketch_report, save_report
+            from etl.transform import transform_stream
+            from etl.validate import Sampling
+
+            # EXTRACT -> TRANSFORM -> LOAD как цепочка генераторов
+            with stage("stream") as step:
+                chunks = extract_stream(file_id, chunk_rows, use_cache, refresh, csv_engine)
+                # Профиль сырых данных считается по порциям на скетчах
+                sketches = SketchProfiler() if eda_profile else None
+                if sketches is not None:
+                    chunks = sketches.observe(chunks)
+                dedup = Deduplicator(dedup_strategy)
+                transformed = transform_stream(chunks, dedup,
+                                               sampling=Sampling() if validation_sample else None)
+                output_path = load_stream(transformed, table_name, max_rows,
+                                          db_method=db_method, sinks=sinks)
+                if output_path is not None:
+                    step.wrote_file(output_path)
+
+            if sketches is not None:
+                report = sketches.report()
+                print("\n📊 Профиль сырых данных (скетчи):")
+                print_sketch_report(report)
+                path = save_report(report, os.path.join(DEFAULT_EDA_DIR, "sketch_profile.json"))
+                print(f"✅ Профиль сохранен: {path}")
+        else:
+            from etl.checkpoint import RunCheckpoints
+            from etl.dedup import Deduplicator
+            from etl.state import IncrementalState
+
+            if checkpoints:
+                run_checkpoints = RunCheckpoints(force=force_stages)
 
-        # TRANSFORM
-        transformed_df = transform_data(raw_data_path)
+            # EXTRACT
+            raw_data_path = run_extract(file_id, use_cache=use_cache, refresh=refresh,
+                                        debug_csv=debug_csv, csv_engine=csv_engine,
+                                        eda_profile=eda_profile, checkpoints=run_checkpoints)
 
-        # LOAD
-        load_data(transformed_df, table_name, max_rows)
+            # Состояние инкрементальной загрузки (watermark и загруженные uniq_id)
+            # и индекс отпечатков для удаления дубликатов между запусками
+            state = None
+            dedup = Deduplicator(dedup_strategy)
+            if incremental or full_refresh:
+                state = IncrementalState.load(table_name)
+                dedup = Deduplicator(dedup_strategy, state.dedup_index_path(dedup_strategy))
+                if full_refresh:
+                    state.reset()
+                    dedup.reset()
+            upsert = state is not None and not state.is_empty()
+
+            # TRANSFORM
+            transformed_df = run_transform(raw_data_path, dedup_strategy=dedup_strategy,
+                                           validation_sample=validation_sample,
+                                           workers=workers, state=state, dedup=dedup,
+                                           checkpoints=run_checkpoints)
+
+            # LOAD
+            results = run_load(transformed_df, table_name=table_name, max_rows=max_rows,
+                               incremental=upsert, db_method=db_method, sinks=sinks,
+                               compact_dtypes=compact_dtypes, checkpoints=run_checkpoints)
+
+            if state is not None:
+                # Состояние сдвигается, только если строки попали во все хранилища:
+                # иначе при следующем запуске они не считались бы новыми
+                failed = [result.name for result in results if not result.ok]
+                if failed:
+                    raise RuntimeError(f"не загружено в {', '.join(failed)}, состояние "
+                                       f"инкрементальной загрузки не сохранено")
+                state.update(transformed_df)
+                state.save()
+                dedup.save()
+                print(f"\n✅ Состояние инкрементальной загрузки сохранено "
+                      f"(watermark: {state.watermark}, строк: {len(state.seen)})")
 
         print("\n" + "🎉 " * 35)
         print("ETL ПРОЦЕСС ЗАВЕРШЕН УСПЕШНО!")
@@ -40,20 +380,29 @@ def run_etl(file_id: str, table_name: str = "demidova", max_rows: int = 100) ->
         print(f"\n❌ ETL процесс прерван с ошибкой: {e}")
         sys.exit(1)
 
+    finally:
+        # Очистка старых контрольных точек (записи этого запуска остаются)
+        if run_checkpoints is not None:
+            removed = run_checkpoints.gc()
+            if removed:
+                freed = sum(entry["size"] for entry in removed) / 1024 ** 2
+                print(f"🧹 Удалено контрольных точек: {len(removed)} ({freed:.1f} МБ)")
 
-def main():
+
+def _run_stage(name: str, func, **kwargs) -> None:
     """
-    CLI интерфейс для ETL пакета
+    Запускает отдельный этап; при ошибке завершает процесс с кодом 1
     """
-    parser = argparse.ArgumentParser(
-        description="ETL пакет для обработки данных о вакансиях",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Примеры использования:
-  python -m etl.main --file-id YOUR_FILE_ID
-  python -m etl.main --file-id YOUR_FILE_ID --table demidova --max-rows 100
-        """
-    )
+    try:
+        func(**kwargs)
+    except Exception as e:
+        print(f"\n❌ Этап {name} прерван с ошибкой: {e}")
+        sys.exit(1)
+    print(f"\n✅ Этап {name} завершен")
+
+
+def _source_options() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(add_help=False)
 
     parser.add_argument(
         '--file-id',
@@ -62,6 +411,70 @@ def main():
         help='Google Drive FILE_ID для загрузки данных (обязательный параметр)'
     )
 
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Не использовать локальный кэш загрузок, читать файл напрямую из Google Drive'
+    )
+
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Принудительно загрузить исходный файл заново и обновить кэш'
+    )
+
+    parser.add_argument(
+        '--debug-csv',
+        action='store_true',
+        help='Дополнительно сохранить сырые данные в data/raw/raw_data.csv для отладки'
+    )
+
+    parser.add_argument(
+        '--csv-engine',
+        choices=['c', 'pyarrow'],
+        default='c',
+        help='Движок разбора CSV: c или многопоточный pyarrow (по умолчанию: c)'
+    )
+
+    parser.add_argument(
+        '--no-eda-profile',
+        action='store_true',
+        help='Не сохранять профиль сырых данных для EDA (data/eda/profile_<sha256>.json, '
+             'в потоковом режиме - data/eda/sketch_profile.json)'
+    )
+    return parser
+
+
+def _transform_options() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(add_help=False)
+
+    parser.add_argument(
+        '--dedup',
+        choices=list(DEDUP_STRATEGIES),
+        default='row',
+        help='Стратегия удаления дубликатов: полная строка, uniq_id или page_url (по умолчанию: row)'
+    )
+
+    parser.add_argument(
+        '--validation-sample',
+        action='store_true',
+        help='Проверять доли пропусков и диапазоны значений по случайной выборке '
+             '(на данных от 1 млн строк)'
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Трансформировать данные по частям в N процессах (по умолчанию: 1)'
+    )
+    return parser
+
+
+def _load_options() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(add_help=False)
+
     parser.add_argument(
         '--table',
         type=str,
@@ -72,18 +485,277 @@ def main():
     parser.add_argument(
         '--max-rows',
         type=int,
-        default=100,
-        help='Максимальное количество строк для загрузки в БД (по умолчанию: 100)'
+        default=None,
+        help='Максимальное количество строк для загрузки в БД (по умолчанию: без ограничения)'
+    )
+
+    parser.add_argument(
+        '--db-method',
+        choices=['copy', 'to_sql'],
+        default='copy',
+        help='Способ загрузки в PostgreSQL: COPY FROM STDIN или построчный to_sql (по умолчанию: copy)'
+    )
+
+    parser.add_argument(
+        '--sinks',
+        type=lambda value: [name.strip() for name in value.split(',') if name.strip()],
+        default=list(DEFAULT_SINKS),
+        help=f'Хранилища через запятую, запись идет параллельно: {", ".join(SINKS)} '
+             f'(по умолчанию: {",".join(DEFAULT_SINKS)})'
+    )
+
+    parser.add_argument(
+        '--no-compact-dtypes',
+        action='store_true',
+        help='Не подбирать компактные типы столбцов (category, bool, float32) перед загрузкой'
+    )
+    return parser
+
+
+def _profile_options() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(add_help=False)
+
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const='',
+        default=None,
+        metavar='PATH',
+        help='Записать метрики этапов (время, CPU, пик RSS, строки, байты) в JSON Lines '
+             f'(по умолчанию: {DEFAULT_PROFILE_DIR}/<время запуска>.jsonl)'
+    )
+
+    parser.add_argument(
+        '--profile-cpu',
+        action='store_true',
+        help='Вместе с --profile: сохранить профиль cProfile для каждого этапа'
+    )
+
+    parser.add_argument(
+        '--profile-memory',
+        action='store_true',
+        help='Вместе с --profile: отслеживать память Python (tracemalloc) и сохранять '
+             'крупнейшие выделения для каждого этапа'
+    )
+    return parser
+
+
+def _stages(value: str):
+    try:
+        return parse_stages(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Парсер аргументов CLI с командами run, extract, transform и load
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m etl",
+        description="ETL пакет для обработки данных о вакансиях",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Примеры использования:
+  python -m etl run --file-id YOUR_FILE_ID
+  python -m etl run --file-id YOUR_FILE_ID --table demidova --max-rows 100
+  python -m etl run --file-id YOUR_FILE_ID --stream --chunk-rows 50000
+  python -m etl run --file-id YOUR_FILE_ID --incremental
+  python -m etl run --file-id YOUR_FILE_ID --incremental --full-refresh
+  python -m etl run --file-id YOUR_FILE_ID --sinks parquet,feather,csv,postgres
+  python -m etl run --file-id YOUR_FILE_ID --sinks dataset,postgres
+  python -m etl run --file-id YOUR_FILE_ID --profile --profile-cpu --profile-memory
+  python -m etl run --file-id YOUR_FILE_ID --force-stage transform
+
+Этапы по отдельности (каждый читает файл предыдущего этапа):
+  python -m etl extract --file-id YOUR_FILE_ID
+  python -m etl transform --dedup uniq_id --workers 4
+  python -m etl load --sinks parquet,postgres
+
+Без команды выполняется run: python -m etl.main --file-id YOUR_FILE_ID
+        """
+    )
+    commands = parser.add_subparsers(dest="command", metavar="{" + ",".join(COMMANDS) + "}")
+    profile = _profile_options()
+
+    run = commands.add_parser(
+        "run", help="Весь ETL процесс: extract, transform и load",
+        parents=[_source_options(), _transform_options(), _load_options(), profile]
+    )
+
+    run.add_argument(
+        '--stream',
+        action='store_true',
+        help='Потоковый режим: обработка данных порциями с ограниченным потреблением памяти '
+             f'(хранилища: {", ".join(STREAM_SINKS)})'
+    )
+
+    run.add_argument(
+        '--chunk-rows',
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help=f'Количество строк в порции для потокового режима (по умолчанию: {DEFAULT_CHUNK_ROWS})'
+    )
+
+    run.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Инкрементальный режим: загружать только новые и измененные строки'
+    )
+
+    run.add_argument(
+        '--full-refresh',
+        action='store_true',
+        help='Полная перезагрузка данных со сбросом состояния инкрементальной загрузки'
+    )
+
+    run.add_argument(
+        '--force-stage',
+        type=_stages,
+        default=[],
+        metavar='STAGES',
+        help=f'Выполнить этапы заново, не используя контрольные точки: {", ".join(STAGES)} '
+             'или all через запятую (следующие этапы тоже выполняются заново)'
+    )
+
+    run.add_argument(
+        '--no-checkpoints',
+        action='store_true',
+        help=f'Не использовать и не сохранять контрольные точки этапов ({DEFAULT_CHECKPOINT_DIR})'
     )
 
-    args = parser.parse_args()
+    commands.add_parser(
+        "extract", help=f"Загрузить и проверить сырые данные -> {RAW_DATA_PATH}",
+        parents=[_source_options(), profile]
+    )
+
+    transform = commands.add_parser(
+        "transform", help=f"{RAW_DATA_PATH} -> {TRANSFORMED_DATA_PATH}",
+        parents=[_transform_options(), profile]
+    )
+    transform.add_argument('--input', default=RAW_DATA_PATH,
+                           help=f'Сырые данные этапа extract (по умолчанию: {RAW_DATA_PATH})')
+    transform.add_argument('--output', default=TRANSFORMED_DATA_PATH,
+                           help=f'Результат для этапа load (по умолчанию: {TRANSFORMED_DATA_PATH})')
 
-    # Запуск ETL
-    run_etl(
-        file_id=args.file_id,
-        table_name=args.table,
-        max_rows=args.max_rows
+    load = commands.add_parser(
+        "load", help=f"{TRANSFORMED_DATA_PATH} -> хранилища",
+        parents=[_load_options(), profile]
     )
+    load.add_argument('--input', default=TRANSFORMED_DATA_PATH,
+                      help=f'Данные этапа transform (по умолчанию: {TRANSFORMED_DATA_PATH})')
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """
+    CLI интерфейс для ETL пакета
+    """
+    parser = build_parser()
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Прежний вызов без команды (python -m etl.main --file-id ...) - это run
+    if argv and argv[0] not in COMMANDS and argv[0] not in ("-h", "--help"):
+        argv.insert(0, "run")
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        parser.exit(2)
+
+    if args.command in ("run", "load"):
+        unknown = set(args.sinks) - set(SINKS)
+        if unknown:
+            parser.error(f"неизвестные хранилища: {', '.join(sorted(unknown))}")
+
+    if args.command == "run" and args.stream and (args.incremental or args.full_refresh):
+        parser.error("--incremental/--full-refresh не поддерживаются в потоковом режиме")
+
+    if args.command in ("run", "transform") and args.workers < 1:
+        parser.error("--workers должен быть не меньше 1")
+
+    if args.command == "run" and args.stream:
+        unsupported = set(args.sinks) - set(STREAM_SINKS)
+        if unsupported:
+            parser.error(f"в потоковом режиме доступны хранилища {', '.join(STREAM_SINKS)} "
+                         f"(не поддерживаются: {', '.join(sorted(unsupported))})")
+        if args.no_compact_dtypes:
+            parser.error("--no-compact-dtypes не используется в потоковом режиме "
+                         "(компактные типы в потоке не подбираются)")
+
+    if args.command == "run" and args.stream and args.workers > 1:
+        parser.error("--workers не поддерживается в потоковом режиме")
+
+    if args.command == "run" and args.force_stage and (args.stream or args.no_checkpoints):
+        parser.error("--force-stage не используется в потоковом режиме и с --no-checkpoints")
+
+    if (args.profile_cpu or args.profile_memory) and args.profile is None:
+        parser.error("--profile-cpu/--profile-memory требуют --profile")
+
+    # Запуск ETL (с профилированием этапов, если задан --profile)
+    profiler = None
+    if args.profile is not None:
+        profiler = Profiler(cprofile_dir=DEFAULT_PROFILE_DIR if args.profile_cpu else None,
+                            trace_memory=args.profile_memory)
+        profile_path = args.profile or os.path.join(DEFAULT_PROFILE_DIR, f"{profiler.run_id}.jsonl")
+        profiler.add_hook(JsonLinesWriter(profile_path))
+
+    with profiler.activate() if profiler else contextlib.nullcontext():
+        if args.command == "extract":
+            _run_stage(
+                "extract", run_extract,
+                file_id=args.file_id,
+                use_cache=not args.no_cache,
+                refresh=args.refresh,
+                debug_csv=args.debug_csv,
+                csv_engine=args.csv_engine,
+                eda_profile=not args.no_eda_profile
+            )
+        elif args.command == "transform":
+            _run_stage(
+                "transform", run_transform,
+                input_path=args.input,
+                dedup_strategy=args.dedup,
+                validation_sample=args.validation_sample,
+                workers=args.workers,
+                output_path=args.output
+            )
+        elif args.command == "load":
+            _run_stage(
+                "load", run_load,
+                input_path=args.input,
+                table_name=args.table,
+                max_rows=args.max_rows,
+                db_method=args.db_method,
+                sinks=args.sinks,
+                compact_dtypes=not args.no_compact_dtypes
+            )
+        else:
+            run_etl(
+                file_id=args.file_id,
+                table_name=args.table,
+                max_rows=args.max_rows,
+                stream=args.stream,
+                chunk_rows=args.chunk_rows,
+                use_cache=not args.no_cache,
+                refresh=args.refresh,
+                debug_csv=args.debug_csv,
+                csv_engine=args.csv_engine,
+                incremental=args.incremental,
+                full_refresh=args.full_refresh,
+                dedup_strategy=args.dedup,
+                db_method=args.db_method,
+                sinks=args.sinks,
+                validation_sample=args.validation_sample,
+                workers=args.workers,
+                compact_dtypes=not args.no_compact_dtypes,
+                eda_profile=not args.no_eda_profile,
+                checkpoints=not args.no_checkpoints,
+                force_stages=args.force_stage
+            )
+
+    if profiler is not None:
+        print("📊 Профиль этапов:")
+        print(profiler.summary())
+        print(f"   Метрики: {profile_path}")
 
 
 if __name__ == "__main__":
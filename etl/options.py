@@ -0,0 +1,41 @@
+"""
+Параметры по умолчанию, общие для CLI и этапов ETL.
+
+Модуль не импортирует pandas, pyarrow и SQLAlchemy: из него берет значения
+по умолчанию CLI (etl.main), чтобы --help и разбор аргументов не загружали
+тяжелые зависимости.
+"""
+
+import os
+
+# Количество строк в порции для потокового режима
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Хранилища, доступные в load_data
+SINKS = ("parquet", "dataset", "feather", "csv", "postgres")
+DEFAULT_SINKS = ("parquet", "postgres")
+
+# Хранилища, доступные в потоковом режиме (load_stream)
+STREAM_SINKS = ("parquet", "postgres")
+
+# Стратегии удаления дубликатов: название -> ключевой столбец (None - вся строка)
+DEDUP_STRATEGIES = {
+    "row": None,
+    "uniq_id": "uniq_id",
+    "page_url": "page_url",
+}
+
+# Каталог данных по умолчанию: <корень проекта>/data (не зависит от текущей
+# директории); от него отсчитываются все каталоги данных ETL
+DATA_DIR = os.environ.get(
+    "ETL_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+)
+
+RAW_DIR = os.path.join(DATA_DIR, "raw")
+PROCESSED_DIR = os.path.join(DATA_DIR, "processed")
+STATE_DIR = os.path.join(DATA_DIR, "state")
+
+# Промежуточные файлы между этапами (для запуска этапов по отдельности)
+RAW_DATA_PATH = os.path.join(RAW_DIR, "raw_data.arrow")
+TRANSFORMED_DATA_PATH = os.path.join(PROCESSED_DIR, "transformed_data.arrow")
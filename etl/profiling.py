@@ -0,0 +1,366 @@
+"""
+Модуль профилирования этапов ETL.
+
+Код этапов размечается контекстным менеджером stage("transform.dedup"). Если
+профилировщик не включен, разметка ничего не измеряет. Включенный Profiler
+для каждого этапа и подшага записывает время (wall и CPU), RSS процесса
+(начало, конец, пик), строки на входе и выходе, прочитанные и записанные
+байты, и передает запись подписчикам (hooks) - например, JsonLinesWriter
+пишет их в файл JSON Lines. Дополнительно для этапов верхнего уровня можно
+сохранять профиль cProfile и самые крупные выделения памяти tracemalloc.
+"""
+
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Iterator, List, Optional
+
+from .options import DATA_DIR
+
+DEFAULT_PROFILE_DIR = os.path.join(DATA_DIR, "profile")
+
+Hook = Callable[[dict], None]
+
+
+def _read_status(key: str) -> Optional[int]:
+    """
+    Значение из /proc/self/status в байтах (только Linux)
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(key + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def current_rss() -> Optional[int]:
+    """
+    Текущий размер резидентной памяти процесса в байтах
+    """
+    return _read_status("VmRSS")
+
+
+def peak_rss() -> Optional[int]:
+    """
+    Пиковый размер резидентной памяти процесса в байтах
+    """
+    peak = _read_status("VmHWM")
+    if peak is None:
+        try:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except (ImportError, OSError):
+            return None
+    return peak
+
+
+def _reset_peak_rss() -> None:
+    """
+    Сбрасывает пик RSS до текущего значения (Linux: /proc/self/clear_refs)
+    """
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def file_size(path: Optional[str]) -> int:
+    """
+    Размер файла или каталога в байтах (0, если путь не существует)
+    """
+    if not path or not os.path.exists(path):
+        return 0
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+@dataclass
+class StageRecord:
+    """
+    Метрики одного этапа
+
+    Значения rows_in, rows_out, bytes_read и bytes_written заполняет код этапа.
+    """
+    stage: str
+    parent: Optional[str] = None
+    run_id: Optional[str] = None
+    started_at: Optional[str] = None
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rss_start_bytes: Optional[int] = None
+    rss_end_bytes: Optional[int] = None
+    peak_rss_bytes: Optional[int] = None
+    py_peak_bytes: Optional[int] = None
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    bytes_read: Optional[int] = None
+    bytes_written: Optional[int] = None
+    status: str = "ok"
+    error: Optional[str] = None
+    artifacts: List[str] = field(default_factory=list)
+
+    def read_file(self, path: Optional[str]) -> None:
+        """
+        Учитывает прочитанный файл в bytes_read
+        """
+        self.bytes_read = (self.bytes_read or 0) + file_size(path)
+
+    def wrote_file(self, path: Optional[str]) -> None:
+        """
+        Учитывает записанный файл (или каталог) в bytes_written
+        """
+        self.bytes_written = (self.bytes_written or 0) + file_size(path)
+
+
+class Profiler:
+    """
+    Собирает метрики этапов и передает их подписчикам.
+
+    Пример:
+        profiler = Profiler()
+        profiler.add_hook(JsonLinesWriter("profile.jsonl"))
+        with profiler.activate():
+            run_etl(...)
+    """
+
+    def __init__(self, cprofile_dir: Optional[str] = None, trace_memory: bool = False):
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        self.cprofile_dir = cprofile_dir
+        self.trace_memory = trace_memory
+        self.records: List[StageRecord] = []
+        self._hooks: List[Hook] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Hook) -> None:
+        """
+        Подписывает функцию на записи этапов (получает dict после завершения этапа)
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook: Hook) -> None:
+        self._hooks.remove(hook)
+
+    @contextmanager
+    def activate(self) -> Iterator["Profiler"]:
+        """
+        Делает профилировщик активным для stage() на время блока with
+        """
+        global _active
+        previous, _active = _active, self
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        try:
+            yield self
+        finally:
+            _active = previous
+            if started_tracing:
+                tracemalloc.stop()
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def stage(self, name: str, parent: Optional[str] = None) -> Iterator[StageRecord]:
+        stack = self._stack()
+        if parent is None and stack:
+            parent = stack[-1].stage
+        main_thread = threading.current_thread() is threading.main_thread()
+        top_level = main_thread and not stack
+
+        record = StageRecord(
+            stage=name, parent=parent, run_id=self.run_id,
+            started_at=datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            rss_start_bytes=current_rss(),
+        )
+        # Пик RSS и памяти Python сбрасывается только в основном потоке:
+        # в потоках записи (etl.sinks) он общий для процесса
+        if main_thread:
+            if stack:
+                outer = stack[-1]
+                outer.peak_rss_bytes = max(outer.peak_rss_bytes or 0, peak_rss() or 0)
+                if tracemalloc.is_tracing():
+                    outer.py_peak_bytes = max(outer.py_peak_bytes or 0,
+                                              tracemalloc.get_traced_memory()[1])
+            _reset_peak_rss()
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+
+        profile = cProfile.Profile() if self.cprofile_dir and top_level else None
+        stack.append(record)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time() if main_thread else time.thread_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield record
+        except BaseException as e:
+            record.status = "error"
+            record.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if profile is not None:
+                profile.disable()
+            record.wall_s = round(time.perf_counter() - wall_start, 6)
+            cpu_end = time.process_time() if main_thread else time.thread_time()
+            record.cpu_s = round(cpu_end - cpu_start, 6)
+            record.rss_end_bytes = current_rss()
+            record.peak_rss_bytes = max(record.peak_rss_bytes or 0, peak_rss() or 0) or None
+            if tracemalloc.is_tracing() and main_thread:
+                record.py_peak_bytes = max(record.py_peak_bytes or 0,
+                                           tracemalloc.get_traced_memory()[1])
+            stack.pop()
+            if stack and main_thread:
+                outer = stack[-1]
+                outer.peak_rss_bytes = max(outer.peak_rss_bytes or 0, record.peak_rss_bytes or 0)
+                if record.py_peak_bytes is not None:
+                    outer.py_peak_bytes = max(outer.py_peak_bytes or 0, record.py_peak_bytes)
+
+            if top_level:
+                self._dump_artifacts(record, profile)
+            self._emit(record)
+
+    def _dump_artifacts(self, record: StageRecord, profile: Optional[cProfile.Profile]) -> None:
+        """
+        Сохраняет профиль cProfile и снимок tracemalloc этапа верхнего уровня
+        """
+        out_dir = self.cprofile_dir or DEFAULT_PROFILE_DIR
+        base = os.path.join(out_dir, f"{self.run_id}_{record.stage}")
+        if profile is not None:
+            os.makedirs(out_dir, exist_ok=True)
+            profile.dump_stats(base + ".prof")
+            record.artifacts.append(base + ".prof")
+        if self.trace_memory and tracemalloc.is_tracing():
+            os.makedirs(out_dir, exist_ok=True)
+            stats = tracemalloc.take_snapshot().statistics("lineno")[:25]
+            with open(base + ".tracemalloc.txt", "w", encoding="utf-8") as f:
+                f.write("\n".join(str(stat) for stat in stats) + "\n")
+            record.artifacts.append(base + ".tracemalloc.txt")
+
+    def _emit(self, record: StageRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+            data = asdict(record)
+            for hook in self._hooks:
+                hook(data)
+
+    def summary(self) -> str:
+        """
+        Таблица с метриками этапов в порядке их завершения
+        """
+        lines = [f"   {'этап':32s} {'wall, с':>9s} {'cpu, с':>9s} {'пик RSS, МБ':>12s} "
+                 f"{'строк':>10s}"]
+        for r in self.records:
+            peak = f"{r.peak_rss_bytes / 2**20:.1f}" if r.peak_rss_bytes else "-"
+            rows = "-" if r.rows_out is None else str(r.rows_out)
+            lines.append(f"   {r.stage:32s} {r.wall_s:9.3f} {r.cpu_s:9.3f} {peak:>12s} {rows:>10s}")
+        return "\n".join(lines)
+
+
+class JsonLinesWriter:
+    """
+    Подписчик, дописывающий записи этапов в файл JSON Lines
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def __call__(self, record: dict) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+_active: Optional[Profiler] = None
+
+
+def active_profiler() -> Optional[Profiler]:
+    """
+    Активный профилировщик (None, если профилирование не включено)
+    """
+    return _active
+
+
+def current_stage() -> Optional[str]:
+    """
+    Название текущего этапа в этом потоке (для этапов в других потоках)
+    """
+    if _active is None:
+        return None
+    stack = _active._stack()
+    return stack[-1].stage if stack else None
+
+
+@contextmanager
+def stage(name: str, parent: Optional[str] = None) -> Iterator[StageRecord]:
+    """
+    Размечает этап или подшаг ETL
+
+    Без активного профилировщика метрики не собираются, а записанные в
+    запись значения (rows_out и т.п.) просто отбрасываются.
+
+    Args:
+        name: Название этапа ("extract", "transform.dedup", "load.sink.parquet")
+        parent: Родительский этап (по умолчанию - текущий этап этого потока)
+
+    Yields:
+        Запись этапа для rows_in, rows_out, bytes_read, bytes_written
+    """
+    if _active is None:
+        yield StageRecord(stage=name)
+        return
+    with _active.stage(name, parent) as record:
+        yield record
+
+
+if __name__ == "__main__":
+    # Тестовый запуск: вложенные этапы, пик памяти и JSON Lines
+    import tempfile
+    import numpy as np
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "profile.jsonl")
+        profiler = Profiler(cprofile_dir=tmp, trace_memory=True)
+        profiler.add_hook(JsonLinesWriter(path))
+
+        with profiler.activate():
+            with stage("transform") as outer:
+                with stage("transform.allocate") as inner:
+                    data = np.ones(50_000_000, dtype=np.uint8)  # ~50 МБ
+                    inner.rows_out = len(data)
+                    del data
+                with stage("transform.small"):
+                    sum(range(100_000))
+                outer.rows_out = 1
+
+        records = [json.loads(line) for line in open(path, encoding="utf-8")]
+        by_stage = {r["stage"]: r for r in records}
+        assert [r["stage"] for r in records] == ["transform.allocate", "transform.small", "transform"]
+        assert by_stage["transform.small"]["parent"] == "transform"
+        assert by_stage["transform.allocate"]["py_peak_bytes"] >= 50_000_000
+        assert by_stage["transform.small"]["py_peak_bytes"] < 50_000_000
+        assert by_stage["transform"]["py_peak_bytes"] >= 50_000_000
+        assert any(a.endswith(".prof") for a in by_stage["transform"]["artifacts"])
+
+    # Без активного профилировщика разметка ничего не измеряет
+    with stage("noop") as record:
+        record.rows_out = 1
+    assert record.wall_s == 0.0
+
+    print(profiler.summary())
+    print("✅ Профилирование этапов работает")
@@ -0,0 +1,250 @@
+"""
+Единая схема датасета вакансий.
+
+Каждый столбец объявляется здесь один раз вместе с типом. Схема используется
+для типизированного чтения CSV за один проход (etl.extract, data_loader.py,
+notebooks/EDA.ipynb) и для приведения типов уже прочитанных данных (etl.transform).
+Строковые столбцы читаются сразу в буферы Arrow, а не как Python объекты.
+"""
+
+import contextlib
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Union
+from urllib.request import urlopen
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+# Виды столбцов
+STRING = "string"
+CATEGORY = "category"
+FLOAT = "float"
+DATETIME = "datetime"
+
+
+@dataclass(frozen=True)
+class Column:
+    """
+    Описание столбца датасета
+
+    Attributes:
+        name: Название столбца
+        kind: Вид столбца (STRING, CATEGORY, FLOAT, DATETIME)
+        date_format: Формат даты для DATETIME (None - автоопределение)
+    """
+    name: str
+    kind: str
+    date_format: Optional[str] = None
+
+
+SCHEMA = [
+    Column("country", STRING),
+    Column("country_code", STRING),
+    Column("date_added", DATETIME),
+    Column("has_expired", CATEGORY),
+    Column("job_board", STRING),
+    Column("job_description", STRING),
+    Column("job_title", STRING),
+    Column("job_type", CATEGORY),
+    Column("location", STRING),
+    Column("organization", STRING),
+    Column("page_url", STRING),
+    Column("salary", FLOAT),
+    Column("sector", CATEGORY),
+    Column("uniq_id", STRING),
+]
+
+COLUMNS = {column.name: column for column in SCHEMA}
+
+# Параметры разбора исходного CSV
+CSV_OPTIONS = {
+    "sep": ",",
+    "quotechar": '"',
+    "skipinitialspace": True,
+    "encoding": "utf-8",
+    "on_bad_lines": "skip",
+}
+
+# Число в текстовом виде (аналог pd.to_numeric для значений без разделителей разрядов)
+_NUMBER_PATTERN = r"^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$"
+
+ARROW_STRING = pd.StringDtype("pyarrow")
+
+
+def pandas_dtypes() -> dict:
+    """
+    Возвращает карту типов для pd.read_csv(dtype=...)
+
+    Числа и даты читаются как строки Arrow и приводятся векторно в apply_schema,
+    чтобы некорректные значения превращались в пропуски, а не в ошибку разбора.
+    """
+    return {
+        column.name: CATEGORY if column.kind == CATEGORY else ARROW_STRING
+        for column in SCHEMA
+    }
+
+
+def _to_float(values: pd.Series) -> pd.Series:
+    """
+    Векторно приводит строки к float64; некорректные значения становятся NaN
+    """
+    if not isinstance(values.dtype, pd.StringDtype):
+        return pd.to_numeric(values, errors="coerce").astype("float64")
+
+    text = pc.utf8_trim_whitespace(pa.array(values))
+    valid = pc.match_substring_regex(text, _NUMBER_PATTERN)
+    numbers = pc.cast(pc.if_else(valid, text, pa.scalar(None, text.type)), pa.float64())
+    return pd.Series(numbers.to_numpy(zero_copy_only=False), index=values.index, name=values.name)
+
+
+def _to_datetime(values: pd.Series, date_format: Optional[str]) -> pd.Series:
+    """
+    Приводит строки к datetime; некорректные значения становятся NaT
+    """
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values
+    return pd.to_datetime(values, errors="coerce", format=date_format)
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Приводит столбцы DataFrame к типам из схемы.
+
+    Для данных, прочитанных через read_csv, большинство столбцов уже имеют
+    нужный тип, и преобразование не выполняется.
+
+    Args:
+        df: Данные (целиком или порция)
+
+    Returns:
+        DataFrame с типами из схемы
+    """
+    for column in SCHEMA:
+        if column.name not in df.columns:
+            continue
+        values = df[column.name]
+
+        if column.kind == STRING:
+            if not isinstance(values.dtype, pd.StringDtype) \
+                    or getattr(values.dtype, "na_value", pd.NA) is not pd.NA:
+                df[column.name] = values.astype(ARROW_STRING)
+        elif column.kind == CATEGORY:
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                df[column.name] = values.astype("category")
+        elif column.kind == FLOAT:
+            df[column.name] = _to_float(values)
+        elif column.kind == DATETIME:
+            df[column.name] = _to_datetime(values, column.date_format)
+
+    return df
+
+
+def _pyarrow_csv_options(usecols: Optional[List[str]]) -> dict:
+    """
+    Параметры pyarrow.csv, соответствующие CSV_OPTIONS
+    """
+    convert_options = pa_csv.ConvertOptions(
+        column_types={column.name: pa.string() for column in SCHEMA},
+        include_columns=usecols,
+        strings_can_be_null=True,
+    )
+    parse_options = pa_csv.ParseOptions(
+        delimiter=CSV_OPTIONS["sep"],
+        quote_char=CSV_OPTIONS["quotechar"],
+        newlines_in_values=True,
+        invalid_row_handler=lambda row: "skip",
+    )
+    return {"parse_options": parse_options, "convert_options": convert_options}
+
+
+def _arrow_to_pandas(table: pa.Table) -> pd.DataFrame:
+    """
+    Таблица Arrow со строковыми столбцами -> DataFrame (строки остаются в буферах Arrow)
+    """
+    for i, name in enumerate(table.column_names):
+        values = table.column(i)
+        if not pa.types.is_string(values.type):
+            continue
+        # Аналог skipinitialspace для C движка
+        values = pc.utf8_ltrim_whitespace(values)
+        if name in COLUMNS and COLUMNS[name].kind == CATEGORY:
+            values = values.dictionary_encode()
+        table = table.set_column(i, name, values)
+
+    return table.to_pandas(
+        types_mapper=lambda t: ARROW_STRING if pa.types.is_string(t) else None
+    )
+
+
+def _read_csv_pyarrow(source: str, usecols: Optional[List[str]]) -> pd.DataFrame:
+    """
+    Читает CSV движком pyarrow.csv (многопоточно) сразу в типы Arrow
+    """
+    options = _pyarrow_csv_options(usecols)
+    if source.startswith(("http://", "https://")):
+        with urlopen(source) as response:
+            table = pa_csv.read_csv(response, **options)
+    else:
+        table = pa_csv.read_csv(source, **options)
+    return _arrow_to_pandas(table)
+
+
+def _read_csv_pyarrow_chunks(source: str, usecols: Optional[List[str]],
+                             chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Читает CSV потоковым читателем pyarrow.csv порциями по chunksize строк
+
+    Читатель отдает блоки по размеру в байтах; блоки собираются и режутся
+    в порции нужного числа строк.
+    """
+    options = _pyarrow_csv_options(usecols)
+    with contextlib.ExitStack() as stack:
+        if source.startswith(("http://", "https://")):
+            source = stack.enter_context(urlopen(source))
+        reader = pa_csv.open_csv(source, **options)
+        pending, rows = [], 0
+        for batch in reader:
+            pending.append(batch)
+            rows += batch.num_rows
+            while rows >= chunksize:
+                table = pa.Table.from_batches(pending, schema=reader.schema)
+                yield apply_schema(_arrow_to_pandas(table.slice(0, chunksize)))
+                rest = table.slice(chunksize)
+                pending, rows = rest.to_batches(), rest.num_rows
+        if rows:
+            yield apply_schema(_arrow_to_pandas(pa.Table.from_batches(pending, schema=reader.schema)))
+
+
+def read_csv(source: str, usecols: Optional[List[str]] = None, engine: str = "c",
+             chunksize: Optional[int] = None) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """
+    Типизированно читает CSV с вакансиями за один проход
+
+    Args:
+        source: Путь или URL к CSV файлу
+        usecols: Читать только эти столбцы (None - все)
+        engine: "c" (по умолчанию) или "pyarrow" (многопоточный разбор; порциями -
+            потоковым читателем pyarrow.csv.open_csv)
+        chunksize: Читать порциями по chunksize строк (возвращает итератор)
+
+    Returns:
+        DataFrame с типами из схемы или итератор таких порций
+    """
+    if engine == "pyarrow":
+        if chunksize is not None:
+            return _read_csv_pyarrow_chunks(source, usecols, chunksize)
+        return apply_schema(_read_csv_pyarrow(source, usecols))
+
+    reader = pd.read_csv(source, dtype=pandas_dtypes(), usecols=usecols, chunksize=chunksize,
+                         **CSV_OPTIONS)
+    if chunksize is None:
+        return apply_schema(reader)
+    return _typed_chunks(reader)
+
+
+def _typed_chunks(reader) -> Iterator[pd.DataFrame]:
+    with reader:
+        for chunk in reader:
+            yield apply_schema(chunk)
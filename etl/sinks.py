@@ -0,0 +1,125 @@
+"""
+Модуль параллельной записи данных в несколько хранилищ.
+
+Хранилища (Parquet, Feather, CSV, PostgreSQL) независимы друг от друга, поэтому
+запись в них запускается одновременно в пуле потоков: тяжелая работа (сжатие,
+кодирование Arrow, передача по сети) выполняется без GIL, и время этапа
+определяется самым медленным хранилищем, а не суммой всех. Ошибка одного
+хранилища не прерывает запись в остальные.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from .profiling import current_stage, stage
+
+
+@dataclass
+class SinkResult:
+    """
+    Результат записи в одно хранилище
+
+    Attributes:
+        name: Название хранилища
+        seconds: Время записи
+        result: Значение, которое вернула функция записи (например, путь к файлу)
+        error: Исключение, если запись не удалась
+    """
+    name: str
+    seconds: float
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _timed(name: str, sink: Callable[[pd.DataFrame], Any], df: pd.DataFrame,
+           parent: Optional[str]) -> SinkResult:
+    """
+    Выполняет запись в хранилище, замеряя время и перехватывая ошибку
+    """
+    start = time.perf_counter()
+    try:
+        stage_name = f"{parent}.sink.{name}" if parent else f"sink.{name}"
+        with stage(stage_name, parent=parent) as step:
+            step.rows_in = len(df)
+            result = sink(df)
+            if isinstance(result, str):
+                step.wrote_file(result)
+            elif isinstance(result, int):
+                step.rows_out = result
+    except Exception as e:
+        return SinkResult(name, time.perf_counter() - start, error=e)
+    return SinkResult(name, time.perf_counter() - start, result=result)
+
+
+def run_sinks(df: pd.DataFrame, sinks: Dict[str, Callable[[pd.DataFrame], Any]],
+              max_workers: Optional[int] = None) -> List[SinkResult]:
+    """
+    Параллельно записывает DataFrame во все хранилища
+
+    Функции записи получают один и тот же DataFrame и не должны его изменять.
+
+    Args:
+        df: Данные для записи
+        sinks: Название хранилища -> функция записи df
+        max_workers: Размер пула потоков (None - по числу хранилищ)
+
+    Returns:
+        Результаты записи в порядке sinks
+    """
+    if not sinks:
+        return []
+
+    parent = current_stage()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers or len(sinks),
+                            thread_name_prefix="sink") as pool:
+        futures = [pool.submit(_timed, name, sink, df, parent) for name, sink in sinks.items()]
+        results = [future.result() for future in futures]
+    wall = time.perf_counter() - start
+
+    print(f"\n⏱️  Запись в хранилища: {wall:.2f} с "
+          f"(последовательно было бы {sum(r.seconds for r in results):.2f} с)")
+    for r in results:
+        status = "✓" if r.ok else f"✗ {type(r.error).__name__}: {r.error}"
+        print(f"   {r.name:10s} {r.seconds:7.2f} с  {status}")
+
+    return results
+
+
+if __name__ == "__main__":
+    # Тестовый запуск: запись в файлы параллельно и изоляция ошибки
+    import os
+    import tempfile
+    import numpy as np
+
+    rows = 1_000_000
+    rng = np.random.default_rng(0)
+    test_df = pd.DataFrame({
+        "uniq_id": pd.Series([f"id{i}" for i in range(rows)], dtype="string[pyarrow]"),
+        "salary": rng.normal(50_000, 10_000, rows),
+        "job_type": pd.Categorical(rng.choice(["Permanent", "Contract"], rows)),
+    })
+
+    def broken(df):
+        raise RuntimeError("недоступно")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_sinks(test_df, {
+            "parquet": lambda df: df.to_parquet(os.path.join(tmp, "t.parquet"), index=False),
+            "feather": lambda df: df.to_feather(os.path.join(tmp, "t.feather")),
+            "csv.gz": lambda df: df.to_csv(os.path.join(tmp, "t.csv.gz"), index=False,
+                                           compression="gzip"),
+            "broken": broken,
+        })
+        assert [r.ok for r in results] == [True, True, True, False]
+        assert os.path.exists(os.path.join(tmp, "t.csv.gz"))
+
+    print("✅ Хранилища записаны независимо друг от друга")
@@ -0,0 +1,118 @@
+"""
+Модуль промежуточного хранения данных между этапами ETL.
+
+Сырые данные хранятся в формате Arrow IPC (Feather v2) без сжатия: такой файл
+отображается в память (memory map), и следующий этап получает столбцы,
+ссылающиеся прямо на страницы файла, без разбора текста и копирования.
+"""
+
+import os
+import tempfile
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from .files import set_default_mode
+
+
+def write_staging(df: pd.DataFrame, path: str) -> str:
+    """
+    Сохраняет DataFrame в Arrow IPC файл для передачи следующему этапу
+
+    Args:
+        df: Данные для сохранения
+        path: Путь к файлу (.arrow)
+
+    Returns:
+        Путь к сохраненному файлу
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Запись через временный файл: прежний файл (и его жесткие ссылки в
+    # etl.checkpoint) не перезаписывается на месте и не обрезается при сбое
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        # Без сжатия: только так буферы можно отобразить в память без копирования
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+        set_default_mode(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def _arrow_types_mapper(arrow_type: pa.DataType):
+    """
+    Строки остаются в буферах Arrow; словари, числа и даты получают обычные
+    типы pandas (category, float64, datetime64), как после схемы etl.schema
+    """
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+def read_staging_table(path: str, offset: int = 0, length: Optional[int] = None) -> pa.Table:
+    """
+    Отображает Arrow IPC файл (или диапазон его строк) в память как pa.Table
+
+    Args:
+        path: Путь к файлу (.arrow)
+        offset: Первая строка диапазона
+        length: Количество строк (None - до конца файла)
+
+    Returns:
+        Таблица, буферы которой ссылаются на страницы файла
+    """
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    if offset or length is not None:
+        table = table.slice(offset, length)
+    return table
+
+
+def table_to_pandas(table: pa.Table) -> pd.DataFrame:
+    """
+    Преобразует таблицу промежуточного файла в DataFrame с типами этапов ETL
+    """
+    return table.to_pandas(types_mapper=_arrow_types_mapper)
+
+
+def read_staging(path: str, offset: int = 0, length: Optional[int] = None) -> pd.DataFrame:
+    """
+    Читает Arrow IPC файл через memory map без копирования данных
+
+    Args:
+        path: Путь к файлу (.arrow)
+        offset: Первая строка диапазона
+        length: Количество строк (None - до конца файла)
+
+    Returns:
+        DataFrame со столбцами на основе буферов Arrow
+    """
+    return table_to_pandas(read_staging_table(path, offset, length))
+
+
+def staging_rows(path: str) -> int:
+    """
+    Количество строк в Arrow IPC файле (по метаданным, без чтения данных)
+    """
+    with pa.memory_map(path, "r") as source:
+        reader = pa.ipc.open_file(source)
+        return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+
+def is_staging_file(path: str) -> bool:
+    """
+    Проверяет, является ли файл промежуточным Arrow IPC файлом
+
+    Args:
+        path: Путь к файлу
+
+    Returns:
+        True для .arrow и .feather файлов
+    """
+    return path.endswith((".arrow", ".feather"))
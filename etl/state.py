@@ -0,0 +1,173 @@
+"""
+Модуль состояния инкрементальной загрузки.
+
+Для каждой целевой таблицы хранится верхняя отметка (watermark) по date_added
+и набор уже загруженных uniq_id с хешем содержимого строки. При повторном
+запуске обрабатываются только новые строки и строки, содержимое которых изменилось.
+"""
+
+import json
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .dedup import row_fingerprints
+from .options import STATE_DIR
+
+DEFAULT_STATE_DIR = STATE_DIR
+
+
+class IncrementalState:
+    """
+    Watermark по date_added и хеши строк по uniq_id для инкрементальных запусков
+    """
+
+    def __init__(self, table_name: str, state_dir: str = DEFAULT_STATE_DIR):
+        self.table_name = table_name
+        self.path = os.path.join(state_dir, table_name)
+        self.watermark: Optional[pd.Timestamp] = None
+        self.seen = pd.DataFrame({
+            "uniq_id": pd.Series(dtype="string"),
+            "row_hash": pd.Series(dtype="uint64"),
+        })
+
+    @classmethod
+    def load(cls, table_name: str, state_dir: str = DEFAULT_STATE_DIR) -> "IncrementalState":
+        """
+        Загружает сохраненное состояние (или создает пустое)
+
+        Args:
+            table_name: Название целевой таблицы
+            state_dir: Каталог с состоянием
+
+        Returns:
+            Состояние инкрементальной загрузки
+        """
+        state = cls(table_name, state_dir)
+        watermark_path = os.path.join(state.path, "watermark.json")
+        seen_path = os.path.join(state.path, "seen.parquet")
+
+        if os.path.exists(watermark_path):
+            with open(watermark_path, encoding="utf-8") as f:
+                value = json.load(f).get("date_added")
+            state.watermark = pd.Timestamp(value) if value else None
+        if os.path.exists(seen_path):
+            state.seen = pd.read_parquet(seen_path)
+
+        return state
+
+    def dedup_index_path(self, strategy: str) -> str:
+        """
+        Путь к индексу отпечатков для удаления дубликатов между запусками
+
+        Args:
+            strategy: Стратегия удаления дубликатов
+
+        Returns:
+            Путь к .npy файлу индекса
+        """
+        return os.path.join(self.path, f"dedup_{strategy}.npy")
+
+    def is_empty(self) -> bool:
+        """
+        Проверяет, была ли уже хотя бы одна загрузка
+        """
+        return self.seen.empty and self.watermark is None
+
+    def reset(self) -> None:
+        """
+        Сбрасывает состояние (полная перезагрузка)
+        """
+        self.watermark = None
+        self.seen = self.seen.iloc[0:0]
+
+    def select_changed(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Отбирает новые и измененные строки
+
+        Строка попадает в выборку, если её uniq_id еще не загружался или хеш
+        содержимого отличается от сохраненного. Строки без uniq_id отбираются
+        по watermark: только если date_added позже последней загрузки.
+
+        Args:
+            df: Данные с типами из схемы
+
+        Returns:
+            Новые и измененные строки
+        """
+        if self.is_empty() or df.empty:
+            return df
+
+        hashes = row_fingerprints(df)
+        positions = pd.Index(self.seen["uniq_id"]).get_indexer(df["uniq_id"])
+        known = positions >= 0
+        changed = np.ones(len(df), dtype=bool)
+        changed[known] = self.seen["row_hash"].to_numpy()[positions[known]] != hashes[known]
+
+        # Строки без uniq_id нельзя сопоставить - используем watermark
+        no_id = df["uniq_id"].isna().to_numpy()
+        if no_id.any():
+            if self.watermark is not None and "date_added" in df.columns:
+                newer = (df["date_added"] > self.watermark).fillna(False).to_numpy(dtype=bool)
+            else:
+                newer = np.ones(len(df), dtype=bool)
+            changed[no_id] = newer[no_id]
+
+        return df[changed]
+
+    def known_mask(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Отмечает строки, uniq_id которых уже загружался
+
+        После select_changed это строки-обновления: их отпечатки уже есть в
+        индексе удаления дубликатов между запусками (etl.dedup), но дубликатами
+        они не являются.
+
+        Args:
+            df: Данные с типами из схемы
+
+        Returns:
+            Булев массив той же длины
+        """
+        if self.seen.empty or df.empty:
+            return np.zeros(len(df), dtype=bool)
+        return pd.Index(self.seen["uniq_id"]).get_indexer(df["uniq_id"]) >= 0
+
+    def update(self, df: pd.DataFrame) -> None:
+        """
+        Учитывает успешно загруженные строки
+
+        Args:
+            df: Загруженные строки
+        """
+        if df.empty:
+            return
+
+        loaded = pd.DataFrame({
+            "uniq_id": df["uniq_id"].astype("string").reset_index(drop=True),
+            "row_hash": row_fingerprints(df),
+        }).dropna(subset=["uniq_id"])
+        self.seen = (
+            pd.concat([self.seen, loaded], ignore_index=True)
+            .drop_duplicates(subset="uniq_id", keep="last")
+            .reset_index(drop=True)
+        )
+
+        if "date_added" in df.columns:
+            latest = df["date_added"].max()
+            if pd.notna(latest) and (self.watermark is None or latest > self.watermark):
+                self.watermark = latest
+
+    def save(self) -> None:
+        """
+        Сохраняет состояние на диск
+        """
+        os.makedirs(self.path, exist_ok=True)
+        self.seen.to_parquet(os.path.join(self.path, "seen.parquet"), index=False)
+        with open(os.path.join(self.path, "watermark.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "date_added": self.watermark.isoformat() if self.watermark is not None else None,
+                "rows": len(self.seen),
+            }, f, ensure_ascii=False, indent=2)
@@ -2,18 +2,39 @@
 Модуль для трансформации данных.
 """
 
+import contextlib
 import pandas as pd
 import os
-from .validate import validate_transformed_data
-
-
-def transform_data(input_path: str, output_dir: str = "data/processed") -> pd.DataFrame:
+from typing import Iterable, Iterator, Optional
+from .dedup import Deduplicator
+from .options import PROCESSED_DIR, RAW_DATA_PATH
+from .parallel import PartitionedTransform
+from .profiling import stage
+from .schema import apply_schema, read_csv
+from .staging import is_staging_file, read_staging
+from .state import IncrementalState
+from .validate import (TRANSFORMED_RULES, Sampling, Validator, print_report,
+                       validate_transformed_data)
+
+
+def transform_data(input_path: str, output_dir: str = PROCESSED_DIR,
+                   state: Optional[IncrementalState] = None,
+                   dedup: Optional[Deduplicator] = None,
+                   sampling: Optional[Sampling] = None, workers: int = 1) -> pd.DataFrame:
     """
     Трансформирует данные: приводит типы, очищает, обрабатывает
 
     Args:
-        input_path: Путь к сырым данным
+        input_path: Путь к сырым данным (Arrow IPC из extract_data или CSV)
         output_dir: Директория для промежуточных результатов
+        state: Состояние инкрементальной загрузки - если задано, дальше
+            обрабатываются только новые и измененные строки
+        dedup: Стратегия и индекс удаления дубликатов (по умолчанию - полные
+            дубликаты строк в пределах этого запуска)
+        sampling: Проверять правила с долями по выборке (для очень больших данных)
+        workers: Количество процессов: при workers > 1 промежуточный Arrow файл
+            обрабатывается по частям в пуле процессов (etl.parallel), результат
+            совпадает с обработкой в одном процессе
 
     Returns:
         Трансформированный DataFrame
@@ -25,52 +46,101 @@ def transform_data(input_path: str, output_dir: str = "data/processed") -> pd.Da
     # Создаем директорию если её нет
     os.makedirs(output_dir, exist_ok=True)
 
+    if dedup is None:
+        dedup = Deduplicator("row")
+
+    parallel = workers > 1 and is_staging_file(input_path)
+    if workers > 1 and not parallel:
+        print("   ⚠️ Параллельная трансформация доступна только для Arrow файлов, "
+              "обработка в одном процессе")
+    fingerprints = has_key = None
+
     try:
-        # Загружаем сырые данные
-        print(f"\n1️⃣ Загрузка сырых данных из {input_path}")
-        df = pd.read_csv(input_path)
-        print(f"✅ Загружено: {df.shape[0]} строк")
-
-        # Приведение типов данных
-        print("\n2️⃣ Приведение типов данных...")
-
-        # Текстовые поля
-        text_cols = [
-            "country", "country_code", "job_board", "job_title", "job_type",
-            "location", "organization", "page_url", "sector", "uniq_id"
-        ]
-
-        for col in text_cols:
-            if col in df.columns:
-                df[col] = df[col].astype("string")
-
-        # Категориальные поля
-        category_cols = ["has_expired", "job_type", "sector"]
-        for col in category_cols:
-            if col in df.columns:
-                df[col] = df[col].astype("category")
-
-        # Числовые поля
-        if "salary" in df.columns:
-            df["salary"] = pd.to_numeric(df["salary"], errors="coerce")
-
-        # Дата
-        if "date_added" in df.columns:
-            df["date_added"] = pd.to_datetime(df["date_added"], errors="coerce")
-
-        print("✅ Типы данных приведены")
-
-        # Очистка данных (удаление полных дубликатов)
-        print("\n3️⃣ Очистка данных...")
-        initial_rows = len(df)
-        df = df.drop_duplicates()
-        removed_duplicates = initial_rows - len(df)
-        print(f"✅ Удалено дубликатов: {removed_duplicates}")
-
-        # Валидация трансформированных данных
-        print("\n4️⃣ Валидация трансформированных данных...")
-        validate_transformed_data(df)
-        print("✅ Валидация пройдена")
+        parts = PartitionedTransform(input_path, workers, output_dir) if parallel else None
+        with parts if parts is not None else contextlib.nullcontext():
+            if parts is not None:
+                # Части читаются, приводятся и хешируются в процессах пула;
+                # DataFrame собирается из их Arrow файлов без копирования
+                print(f"\n1️⃣ Загрузка сырых данных из {input_path} "
+                      f"({len(parts.ranges)} частей)")
+                print(f"\n2️⃣ Приведение типов данных в {workers} процессах...")
+                with stage("transform.coerce") as step:
+                    df, fingerprints, has_key = parts.coerce(dedup)
+                    step.read_file(input_path)
+                    step.rows_in = step.rows_out = len(df)
+                print(f"✅ Загружено: {df.shape[0]} строк")
+            else:
+                # Загружаем сырые данные
+                print(f"\n1️⃣ Загрузка сырых данных из {input_path}")
+                with stage("transform.read") as step:
+                    if is_staging_file(input_path):
+                        # Memory map без разбора текста: столбцы ссылаются на буферы Arrow
+                        df = read_staging(input_path)
+                    else:
+                        df = read_csv(input_path)
+                    step.read_file(input_path)
+                    step.rows_out = len(df)
+                print(f"✅ Загружено: {df.shape[0]} строк")
+
+                # Приведение типов данных
+                print("\n2️⃣ Приведение типов данных...")
+
+                with stage("transform.coerce") as step:
+                    df = apply_schema(df)
+                    step.rows_in = step.rows_out = len(df)
+
+            print("✅ Типы данных приведены")
+
+            # Инкрементальный режим: только новые и измененные строки
+            incremental = state is not None and not state.is_empty()
+            updates = None
+            if incremental:
+                initial_rows = len(df)
+                with stage("transform.incremental") as step:
+                    df = state.select_changed(df)
+                    step.rows_in, step.rows_out = initial_rows, len(df)
+                print(f"   ✓ Инкрементальный режим (watermark: {state.watermark}): "
+                      f"новых или измененных строк {len(df)} из {initial_rows}")
+                if df.empty:
+                    print("\n✅ Новых данных нет, трансформация не требуется")
+                    return df
+                if fingerprints is not None:
+                    # Индекс df - номера строк исходного файла
+                    positions = df.index.to_numpy()
+                    fingerprints, has_key = fingerprints[positions], has_key[positions]
+                # Измененные строки уже загруженных uniq_id - обновления, а не
+                # дубликаты из индекса прошлых запусков
+                updates = state.known_mask(df)
+
+            # Очистка данных (удаление дубликатов по отпечаткам строк или ключа)
+            print(f"\n3️⃣ Очистка данных (дубликаты: {dedup.strategy})...")
+            initial_rows = len(df)
+            with stage("transform.dedup") as step:
+                if fingerprints is None:
+                    df = dedup.drop_duplicates(df, updates)
+                else:
+                    # Отпечатки всех частей в исходном порядке: остаются те же
+                    # строки, что и при обработке в одном процессе
+                    df = df[dedup.keep_mask(fingerprints, has_key, updates)]
+                step.rows_in, step.rows_out = initial_rows, len(df)
+            removed_duplicates = initial_rows - len(df)
+            print(f"✅ Удалено дубликатов: {removed_duplicates}")
+            if incremental and df.empty:
+                print("\n✅ Новых данных нет, трансформация не требуется")
+                return df
+
+            # Валидация трансформированных данных
+            print("\n4️⃣ Валидация трансформированных данных...")
+            with stage("transform.validate") as step:
+                step.rows_in = len(df)
+                if parts is None:
+                    report = validate_transformed_data(df, sampling)
+                else:
+                    report = parts.validate(df, TRANSFORMED_RULES, "transformed", sampling)
+                    print_report(report)
+                    report.raise_for_errors()
+            report.to_json(os.path.join(output_dir, "validation_report.json"))
+            print("✅ Валидация пройдена")
 
         print(f"\n✅ Трансформация завершена: {df.shape[0]} строк готовы к загрузке")
 
@@ -81,7 +151,53 @@ def transform_data(input_path: str, output_dir: str = "data/processed") -> pd.Da
         raise
 
 
+def transform_stream(chunks: Iterable[pd.DataFrame],
+                     dedup: Optional[Deduplicator] = None,
+                     sampling: Optional[Sampling] = None) -> Iterator[pd.DataFrame]:
+    """
+    Потоково трансформирует порции данных.
+
+    Дубликаты удаляются глобально по всему потоку (индекс отпечатков занимает
+    8 байт на уникальную строку), а правила TRANSFORMED_RULES считаются по
+    каждой порции и проверяются после последней по накопленной статистике. Если проверка
+    не пройдена, генератор выбрасывает ValueError, и приемники в load_stream
+    откатывают уже записанные порции.
+
+    Args:
+        chunks: Порции сырых данных (например, из extract_stream)
+        dedup: Стратегия и индекс удаления дубликатов (по умолчанию - полные дубликаты строк)
+        sampling: Проверять правила по выборке в порциях от sampling.min_rows
+            строк (None - каждую порцию целиком)
+
+    Yields:
+        Трансформированные порции
+    """
+    if dedup is None:
+        dedup = Deduplicator("row")
+    validator = Validator(TRANSFORMED_RULES, stage="transformed", sampling=sampling)
+    initial_rows = 0
+    output_rows = 0
+
+    for chunk in chunks:
+        initial_rows += len(chunk)
+        chunk = dedup.drop_duplicates(apply_schema(chunk))
+        if chunk.empty:
+            continue
+        validator.update(chunk)
+        output_rows += len(chunk)
+        yield chunk
+
+    print("\n" + "=" * 70)
+    print("TRANSFORM: Итоги потоковой трансформации")
+    print("=" * 70)
+    print(f"✅ Удалено дубликатов: {initial_rows - output_rows}")
+    report = validator.report()
+    print_report(report)
+    report.raise_for_errors()
+    print("✅ Валидация пройдена")
+
+
 if __name__ == "__main__":
     # Тестовый запуск
-    df = transform_data("data/raw/raw_data.csv")
+    df = transform_data(RAW_DATA_PATH)
     print(df.head())
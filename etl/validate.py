@@ -1,94 +1,611 @@
 """
 Модуль валидации данных на разных этапах ETL.
+
+Проверки описываются декларативно списком правил (RAW_RULES, TRANSFORMED_RULES,
+LOADED_RULES). Validator вычисляет все правила этапа за один векторный проход
+по данным (пропуски по всем столбцам считаются один раз и используются всеми
+правилами), накапливает статистику по порциям в потоковом режиме и возвращает
+отчет ValidationReport, который можно сохранить в JSON. На очень больших
+данных правила с долями (пропуски, диапазоны) можно считать по случайной
+выборке статистически достаточного размера.
 """
 
+import json
+import math
+from dataclasses import asdict, dataclass, field
+from functools import cached_property
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
 import pandas as pd
 
+from .dedup import FingerprintIndex, key_fingerprints
+
+
+REQUIRED_COLUMNS = ['job_title', 'organization', 'country']
+MIN_ROWS = 10
+MAX_MISSING_PCT = 50
+
+ERROR = "error"
+WARNING = "warning"
 
-def validate_raw_data(df: pd.DataFrame) -> None:
+
+# ---------------------------------------------------------------------------
+# Правила
+# ---------------------------------------------------------------------------
+
+class Batch:
     """
-    Валидирует сырые данные после извлечения
+    Порция данных для проверки: полная и (в режиме выборки) её выборка.
+
+    Количество пропусков по столбцам считается один раз на порцию и
+    используется всеми правилами.
+    """
+
+    def __init__(self, df: pd.DataFrame, sample: Optional[pd.DataFrame] = None):
+        self.df = df
+        self.sample = df if sample is None else sample
+
+    @cached_property
+    def null_counts(self) -> pd.Series:
+        return self.sample.isna().sum()
+
+
+@dataclass(frozen=True)
+class RuleResult:
+    """
+    Результат проверки одного правила
+
+    Attributes:
+        rule: Название правила
+        severity: ERROR (прерывает этап) или WARNING
+        passed: Пройдено ли правило
+        message: Описание результата
+        observed: Измеренные значения
+        sampled: Значения получены по выборке
+    """
+    rule: str
+    severity: str
+    passed: bool
+    message: str
+    observed: Dict[str, Any] = field(default_factory=dict)
+    sampled: bool = False
+
+
+@dataclass(frozen=True)
+class MinRows:
+    """
+    Минимальное количество строк (по всем данным, не по выборке)
+    """
+    min_rows: int = MIN_ROWS
+    severity: str = ERROR
+    name: str = "min_rows"
+
+    def start(self) -> dict:
+        return {"rows": 0}
+
+    def update(self, state: dict, batch: Batch) -> None:
+        state["rows"] += len(batch.df)
+
+    def merge(self, state: dict, other: dict) -> None:
+        state["rows"] += other["rows"]
+
+    def result(self, state: dict, sampled: bool) -> RuleResult:
+        rows = state["rows"]
+        if rows == 0:
+            message = "Нет данных"
+        elif rows < self.min_rows:
+            message = f"Слишком мало данных: {rows} строк (минимум {self.min_rows})"
+        else:
+            message = f"Строк: {rows}"
+        return RuleResult(self.name, self.severity, rows >= max(self.min_rows, 1), message,
+                          {"rows": rows})
+
+
+@dataclass(frozen=True)
+class RequiredColumns:
+    """
+    Наличие обязательных столбцов
+    """
+    columns: Sequence[str] = tuple(REQUIRED_COLUMNS)
+    severity: str = WARNING
+    name: str = "required_columns"
+
+    def start(self) -> dict:
+        return {"missing": None}
+
+    def update(self, state: dict, batch: Batch) -> None:
+        if state["missing"] is None:
+            state["missing"] = [col for col in self.columns if col not in batch.df.columns]
+
+    def merge(self, state: dict, other: dict) -> None:
+        if state["missing"] is None:
+            state["missing"] = other["missing"]
+
+    def result(self, state: dict, sampled: bool) -> RuleResult:
+        missing = state["missing"] or []
+        message = f"Отсутствуют столбцы {missing}" if missing else "Обязательные столбцы на месте"
+        return RuleResult(self.name, self.severity, not missing, message, {"missing": missing})
+
+
+@dataclass(frozen=True)
+class NullRate:
+    """
+    Доля пропущенных ячеек по выбранным столбцам (None - по всем)
+    """
+    max_pct: float = MAX_MISSING_PCT
+    columns: Optional[Sequence[str]] = None
+    severity: str = ERROR
+    name: str = "null_rate"
+
+    def start(self) -> dict:
+        return {"cells": 0, "missing": 0, "by_column": {}}
+
+    def update(self, state: dict, batch: Batch) -> None:
+        counts = batch.null_counts
+        if self.columns is not None:
+            counts = counts.reindex([col for col in self.columns if col in counts.index])
+        state["cells"] += len(batch.sample) * len(counts)
+        state["missing"] += int(counts.sum())
+        for col, value in counts.items():
+            state["by_column"][col] = state["by_column"].get(col, 0) + int(value)
+
+    def merge(self, state: dict, other: dict) -> None:
+        state["cells"] += other["cells"]
+        state["missing"] += other["missing"]
+        for col, value in other["by_column"].items():
+            state["by_column"][col] = state["by_column"].get(col, 0) + value
+
+    def result(self, state: dict, sampled: bool) -> RuleResult:
+        pct = state["missing"] / state["cells"] * 100 if state["cells"] else 0.0
+        passed = pct <= self.max_pct
+        message = f"Пропущенных значений: {pct:.2f}%" if passed \
+            else f"Слишком много пропусков: {pct:.2f}%"
+        return RuleResult(self.name, self.severity, passed, message,
+                          {"missing_pct": round(pct, 4), "missing_by_column": state["by_column"]},
+                          sampled)
+
+
+@dataclass(frozen=True)
+class ValueRange:
+    """
+    Значения столбца (числа или даты) в диапазоне [min_value, max_value].
+
+    max_value="now" - не позже текущего момента (даты из будущего).
+    Пропуски не считаются нарушением.
+    """
+    column: str
+    min_value: Any = None
+    max_value: Any = None
+    max_violation_pct: float = 0.0
+    severity: str = WARNING
+    name: str = "value_range"
+
+    def start(self) -> dict:
+        return {"checked": 0, "violations": 0, "min": None, "max": None}
+
+    def update(self, state: dict, batch: Batch) -> None:
+        if self.column not in batch.sample.columns:
+            return
+        values = batch.sample[self.column]
+        upper = pd.Timestamp.now() if isinstance(self.max_value, str) and self.max_value == "now" \
+            else self.max_value
+
+        valid = values.notna()
+        outside = pd.Series(False, index=values.index)
+        if self.min_value is not None:
+            outside |= values < self.min_value
+        if upper is not None:
+            outside |= values > upper
+
+        state["checked"] += int(valid.sum())
+        state["violations"] += int(outside.fillna(False).sum())
+        if valid.any():
+            low, high = values.min(), values.max()
+            state["min"] = low if state["min"] is None else min(state["min"], low)
+            state["max"] = high if state["max"] is None else max(state["max"], high)
+
+    def merge(self, state: dict, other: dict) -> None:
+        state["checked"] += other["checked"]
+        state["violations"] += other["violations"]
+        for key, pick in (("min", min), ("max", max)):
+            if other[key] is not None:
+                state[key] = other[key] if state[key] is None else pick(state[key], other[key])
+
+    def result(self, state: dict, sampled: bool) -> RuleResult:
+        pct = state["violations"] / state["checked"] * 100 if state["checked"] else 0.0
+        passed = pct <= self.max_violation_pct
+        bounds = f"[{_jsonable(self.min_value)}, {_jsonable(self.max_value)}]"
+        if state["checked"]:
+            message = f"{self.column}: вне диапазона {bounds} {pct:.2f}% значений"
+        else:
+            message = f"{self.column}: нет значений для проверки диапазона"
+        return RuleResult(f"{self.name}:{self.column}", self.severity, passed, message, {
+            "violation_pct": round(pct, 4),
+            "min": _jsonable(state["min"]),
+            "max": _jsonable(state["max"]),
+        }, sampled)
+
+
+@dataclass(frozen=True)
+class UniqueKey:
+    """
+    Уникальность непустых значений ключевого столбца (по всем данным и
+    между порциями, по 64-битным отпечаткам)
+    """
+    column: str = "uniq_id"
+    severity: str = WARNING
+    name: str = "unique"
+
+    def start(self) -> dict:
+        return {"index": FingerprintIndex(), "checked": 0, "duplicates": 0}
+
+    def update(self, state: dict, batch: Batch) -> None:
+        if self.column not in batch.df.columns:
+            return
+        values = batch.df[self.column]
+        fingerprints = key_fingerprints(values)[values.notna().to_numpy()]
+        repeated = pd.Series(fingerprints).duplicated().to_numpy() \
+            | state["index"].contains(fingerprints)
+
+        state["checked"] += len(fingerprints)
+        state["duplicates"] += int(repeated.sum())
+        state["index"].add(fingerprints[~repeated], assume_unique=True)
+
+    def merge(self, state: dict, other: dict) -> None:
+        # Значения, уникальные в каждой части, но общие для обеих - тоже повторы
+        fingerprints = other["index"].values()
+        shared = state["index"].contains(fingerprints)
+        state["checked"] += other["checked"]
+        state["duplicates"] += other["duplicates"] + int(shared.sum())
+        state["index"].add(fingerprints[~shared], assume_unique=True)
+
+    def result(self, state: dict, sampled: bool) -> RuleResult:
+        duplicates = state["duplicates"]
+        message = f"{self.column}: повторяющихся значений {duplicates}" if state["checked"] \
+            else f"{self.column}: нет значений для проверки уникальности"
+        return RuleResult(f"{self.name}:{self.column}", self.severity, duplicates == 0, message,
+                          {"checked": state["checked"], "duplicates": duplicates})
+
+
+# Правила, которые по выборке не проверяются (зависят от всех строк)
+_EXACT_RULES = (MinRows, RequiredColumns, UniqueKey)
+
+RAW_RULES = [
+    MinRows(MIN_ROWS),
+    RequiredColumns(REQUIRED_COLUMNS),
+]
+
+TRANSFORMED_RULES = [
+    MinRows(1),
+    NullRate(MAX_MISSING_PCT),
+    ValueRange("salary", min_value=0, max_value=10_000_000),
+    ValueRange("date_added", min_value=pd.Timestamp("2000-01-01"), max_value="now"),
+    UniqueKey("uniq_id"),
+]
+
+LOADED_RULES = [
+    MinRows(1),
+]
+
+
+# ---------------------------------------------------------------------------
+# Выборка
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Sampling:
+    """
+    Параметры проверки по выборке
+
+    Attributes:
+        margin: Допустимая погрешность оценки доли (0.01 - ±1 п.п.)
+        confidence: Доверительная вероятность
+        min_rows: Порции меньше этого размера проверяются целиком
+        seed: Зерно генератора случайных чисел
+    """
+    margin: float = 0.01
+    confidence: float = 0.99
+    min_rows: int = 1_000_000
+    seed: int = 0
+
+
+def sample_size(population: int, margin: float = 0.01, confidence: float = 0.99) -> int:
+    """
+    Размер выборки для оценки доли с заданной погрешностью (формула Кохрена
+    с поправкой на конечную совокупность, худший случай p = 0.5)
 
     Args:
-        df: DataFrame для валидации
+        population: Размер совокупности
+        margin: Допустимая погрешность доли
+        confidence: Доверительная вероятность
 
-    Raises:
-        ValueError: Если данные не проходят валидацию
+    Returns:
+        Количество строк выборки (не больше population)
     """
-    # Проверка на пустой DataFrame
-    if df.empty:
-        raise ValueError("DataFrame пустой!")
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    n0 = z * z * 0.25 / (margin * margin)
+    return min(population, math.ceil(n0 / (1 + (n0 - 1) / population))) if population else 0
 
-    # Проверка минимального количества строк
-    if len(df) < 10:
-        raise ValueError(f"Слишком мало данных: {len(df)} строк (минимум 10)")
 
-    # Проверка наличия обязательных столбцов
-    required_columns = ['job_title', 'organization', 'country']
-    missing_columns = [col for col in required_columns if col not in df.columns]
+# ---------------------------------------------------------------------------
+# Отчет и движок
+# ---------------------------------------------------------------------------
 
-    if missing_columns:
-        print(f"⚠️  Предупреждение: Отсутствуют столбцы {missing_columns}")
+def _jsonable(value: Any) -> Any:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
 
-    print(f"   ✓ Размерность: {df.shape}")
-    print(f"   ✓ Столбцов: {df.shape[1]}")
-    print(f"   ✓ Строк: {df.shape[0]}")
 
+@dataclass
+class ValidationReport:
+    """
+    Отчет о проверке этапа
 
-def validate_transformed_data(df: pd.DataFrame) -> None:
+    Attributes:
+        stage: Этап (raw, transformed, loaded)
+        rows: Строк проверено всего
+        examined_rows: Строк, по которым считались правила с долями
+        results: Результаты правил
     """
-    Валидирует данные после трансформации
+    stage: str
+    rows: int
+    examined_rows: int
+    results: List[RuleResult]
+
+    @property
+    def sampled(self) -> bool:
+        return self.examined_rows < self.rows
+
+    @property
+    def passed(self) -> bool:
+        return not self.errors
+
+    @property
+    def errors(self) -> List[RuleResult]:
+        return [r for r in self.results if not r.passed and r.severity == ERROR]
+
+    @property
+    def warnings(self) -> List[RuleResult]:
+        return [r for r in self.results if not r.passed and r.severity == WARNING]
+
+    def to_dict(self) -> dict:
+        return {
+            "stage": self.stage,
+            "passed": self.passed,
+            "rows": self.rows,
+            "examined_rows": self.examined_rows,
+            "sampled": self.sampled,
+            "results": [asdict(r) for r in self.results],
+        }
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """
+        Сериализует отчет в JSON (и сохраняет в path, если задан)
+        """
+        text = json.dumps(self.to_dict(), ensure_ascii=False, indent=2, default=str)
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+    def raise_for_errors(self) -> None:
+        """
+        Raises:
+            ValueError: Если не пройдено хотя бы одно правило уровня ERROR
+        """
+        if self.errors:
+            raise ValueError("; ".join(r.message for r in self.errors))
+
+
+class Validator:
+    """
+    Вычисляет набор правил по одной или нескольким порциям данных.
+
+    Пример:
+        validator = Validator(TRANSFORMED_RULES, stage="transformed")
+        for chunk in chunks:
+            validator.update(chunk)
+        report = validator.report()
+    """
+
+    def __init__(self, rules: Sequence, stage: str = "data",
+                 sampling: Optional[Sampling] = None):
+        self.rules = list(rules)
+        self.stage = stage
+        self.sampling = sampling
+        self._states = [rule.start() for rule in self.rules]
+        self._rows = 0
+        self._examined = 0
+        self._rng = np.random.default_rng(sampling.seed if sampling else None)
+
+    def update(self, df: pd.DataFrame) -> None:
+        """
+        Учитывает очередную порцию данных
+
+        Args:
+            df: Порция данных
+        """
+        sample = None
+        if self.sampling is not None and len(df) >= self.sampling.min_rows:
+            n = sample_size(len(df), self.sampling.margin, self.sampling.confidence)
+            positions = np.sort(self._rng.choice(len(df), size=n, replace=False))
+            sample = df.iloc[positions]
+
+        batch = Batch(df, sample)
+        for rule, state in zip(self.rules, self._states):
+            rule.update(state, batch)
+        self._rows += len(df)
+        self._examined += len(batch.sample)
+
+    def merge(self, other: "Validator") -> None:
+        """
+        Добавляет статистику другого Validator с теми же правилами
+
+        Так объединяются результаты проверки частей данных, выполненной
+        параллельно в разных процессах. Порядок объединения на значения
+        не влияет.
+
+        Args:
+            other: Validator, учитывавший другую часть данных
+        """
+        if [type(rule) for rule in other.rules] != [type(rule) for rule in self.rules]:
+            raise ValueError("Нельзя объединить проверки с разными наборами правил")
+        for rule, state, other_state in zip(self.rules, self._states, other._states):
+            rule.merge(state, other_state)
+        self._rows += other._rows
+        self._examined += other._examined
+
+    def report(self) -> ValidationReport:
+        """
+        Возвращает отчет по всем учтенным порциям
+        """
+        sampled = self._examined < self._rows
+        results = [
+            rule.result(state, sampled and not isinstance(rule, _EXACT_RULES))
+            for rule, state in zip(self.rules, self._states)
+        ]
+        return ValidationReport(self.stage, self._rows, self._examined, results)
+
+
+def validate(df: pd.DataFrame, rules: Sequence, stage: str = "data",
+             sampling: Optional[Sampling] = None) -> ValidationReport:
+    """
+    Проверяет DataFrame набором правил за один проход
+
+    Args:
+        df: Данные
+        rules: Правила
+        stage: Название этапа для отчета
+        sampling: Параметры проверки по выборке (None - по всем строкам)
+
+    Returns:
+        Отчет о проверке
+    """
+    validator = Validator(rules, stage, sampling)
+    validator.update(df)
+    return validator.report()
+
+
+def print_report(report: ValidationReport) -> None:
+    """
+    Выводит отчет о проверке в консоль
+
+    Args:
+        report: Отчет о проверке
+    """
+    if report.sampled:
+        print(f"   ✓ Проверка по выборке: {report.examined_rows} из {report.rows} строк")
+    for r in report.results:
+        mark = "✓" if r.passed else ("❌" if r.severity == ERROR else "⚠️ ")
+        print(f"   {mark} {r.message}")
+
+
+# ---------------------------------------------------------------------------
+# Проверки этапов
+# ---------------------------------------------------------------------------
+
+def _validate_stage(df: pd.DataFrame, rules: Sequence, stage: str,
+                    sampling: Optional[Sampling]) -> ValidationReport:
+    report = validate(df, rules, stage, sampling)
+    print_report(report)
+    report.raise_for_errors()
+    return report
+
+
+def validate_raw_data(df: pd.DataFrame, sampling: Optional[Sampling] = None) -> ValidationReport:
+    """
+    Валидирует сырые данные после извлечения
 
     Args:
         df: DataFrame для валидации
+        sampling: Параметры проверки по выборке
+
+    Returns:
+        Отчет о проверке
 
     Raises:
         ValueError: Если данные не проходят валидацию
     """
-    if df.empty:
-        raise ValueError("DataFrame пустой после трансформации!")
+    report = _validate_stage(df, RAW_RULES, "raw", sampling)
+    print(f"   ✓ Размерность: {df.shape}")
+    return report
 
-    # Проверка типов данных
-    print(f"   ✓ Типы данных корректны")
-    print(f"   ✓ Строк после трансформации: {len(df)}")
 
-    # Проверка на критическое количество пропусков
-    total_cells = df.shape[0] * df.shape[1]
-    missing_cells = df.isnull().sum().sum()
-    missing_pct = (missing_cells / total_cells) * 100
+def validate_transformed_data(df: pd.DataFrame,
+                              sampling: Optional[Sampling] = None) -> ValidationReport:
+    """
+    Валидирует данные после трансформации
 
-    print(f"   ✓ Пропущенных значений: {missing_pct:.2f}%")
+    Args:
+        df: DataFrame для валидации
+        sampling: Параметры проверки по выборке
 
-    if missing_pct > 50:
-        raise ValueError(f"Слишком много пропусков: {missing_pct:.2f}%")
+    Returns:
+        Отчет о проверке
 
+    Raises:
+        ValueError: Если данные не проходят валидацию
+    """
+    return _validate_stage(df, TRANSFORMED_RULES, "transformed", sampling)
 
-def validate_loaded_data(df: pd.DataFrame) -> None:
+
+def validate_loaded_data(df: pd.DataFrame) -> ValidationReport:
     """
     Валидирует данные перед загрузкой
 
     Args:
         df: DataFrame для валидации
 
+    Returns:
+        Отчет о проверке
+
     Raises:
         ValueError: Если данные не готовы к загрузке
     """
-    if df.empty:
-        raise ValueError("Нет данных для загрузки!")
-
-    print(f"   ✓ Готово к загрузке: {len(df)} строк")
+    report = _validate_stage(df, LOADED_RULES, "loaded", None)
     print(f"   ✓ Столбцов: {df.shape[1]}")
+    return report
 
 
 if __name__ == "__main__":
     # Тестовый запуск
     test_df = pd.DataFrame({
-        'job_title': ['Engineer', 'Designer'],
-        'organization': ['CompanyA', 'CompanyB'],
-        'country': ['USA', 'UK']
+        'job_title': ['Engineer', 'Designer'] * 10,
+        'organization': ['CompanyA', 'CompanyB'] * 10,
+        'country': ['USA', 'UK'] * 10
     })
 
     validate_raw_data(test_df)
     validate_transformed_data(test_df)
     validate_loaded_data(test_df)
+
+    # Порции дают тот же отчет, что и проверка целиком
+    rows = 3_000_000
+    rng = np.random.default_rng(0)
+    big = pd.DataFrame({
+        "uniq_id": pd.Series(rng.integers(0, rows * 10, rows).astype(str), dtype="string[pyarrow]"),
+        "salary": np.where(rng.random(rows) < 0.2, np.nan, rng.normal(50_000, 30_000, rows)),
+        "date_added": pd.Timestamp("2017-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), "D"),
+    })
+    whole = validate(big, TRANSFORMED_RULES)
+    validator = Validator(TRANSFORMED_RULES)
+    for start in range(0, rows, 500_000):
+        validator.update(big.iloc[start:start + 500_000])
+    assert validator.report().to_dict()["results"] == whole.to_dict()["results"]
+
+    # Выборка: доли совпадают с точными в пределах погрешности
+    sampled = validate(big, TRANSFORMED_RULES, sampling=Sampling(margin=0.01, confidence=0.99))
+    exact = {r.rule: r.observed for r in whole.results}
+    for r in sampled.results:
+        for key in ("missing_pct", "violation_pct"):
+            if key in r.observed:
+                assert abs(r.observed[key] - exact[r.rule][key]) <= 1.0, (r.rule, key)
+    print(f"   выборка: {sampled.examined_rows} из {sampled.rows} строк")
     print("✅ Все валидации пройдены!")
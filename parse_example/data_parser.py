@@ -1,10 +1,31 @@
 import pandas as pd
 import os
 
+from matching import match_results, print_match_summary
+from result_reader import read_results, summarize_results
 
-def parse_and_show(filename, description=""):
+# Столбцы, которые выводятся в первых строках
+KEY_COLUMNS = ["position", "title", "link", "snippet", "source"]
+
+# Столбцы, которые загружаются для сравнения (остальные не читаются)
+READ_COLUMNS = ["query"] + KEY_COLUMNS
+
+
+def parse_and_show(filename, description="", load=True):
     """
-    Парсит и показывает данные из указанного CSV файла
+    Парсит и показывает данные из файла с результатами (CSV, Parquet или Feather)
+
+    Размер, столбцы и пропуски считаются без загрузки файла (result_reader.py),
+    для вывода читаются только первые строки ключевых столбцов.
+
+    Args:
+        filename: Имя файла
+        description: Заголовок вывода
+        load: Загрузить столбцы READ_COLUMNS целиком (для сравнения);
+            иначе вернуть только первые строки
+
+    Returns:
+        DataFrame или None, если файл не найден, пустой или поврежден
     """
     # Проверяем возможные пути к файлу
     possible_paths = [
@@ -24,11 +45,11 @@ def parse_and_show(filename, description=""):
         return None
 
     try:
-        # Читаем файл
-        df = pd.read_csv(path, encoding="utf-8")
+        # Сводка по файлу без загрузки данных
+        summary = summarize_results(path)
 
         # Проверяем, что файл не пустой
-        if df.empty:
+        if summary.rows == 0:
             print(f"\n⚠️  Файл {filename} пустой!")
             return None
 
@@ -40,26 +61,25 @@ def parse_and_show(filename, description=""):
             print(f"📊 Анализ файла: {filename}")
         print("=" * 70)
 
-        print(f"Размер датасета: {df.shape[0]} строк, {df.shape[1]} столбцов")
-        print(f"Заголовки: {df.columns.tolist()}")
+        print(f"Размер датасета: {summary.rows} строк, {len(summary.columns)} столбцов")
+        print(f"Заголовки: {summary.columns}")
 
         # Проверка на пропущенные значения
-        missing = df.isnull().sum()
-        if missing.any():
+        if summary.missing:
             print(f"\n⚠️  Пропущенные значения:")
-            for col, count in missing[missing > 0].items():
+            for col, count in summary.missing.items():
                 print(f"  - {col}: {count}")
 
         # Выводим первые строки
         print("\n📋 Первые 5 строк:")
-        key_cols = [c for c in ["position", "title", "link", "snippet", "source"]
-                    if c in df.columns]
-        if key_cols:
-            print(df[key_cols].head())
-        else:
-            print(df.head())
+        key_cols = [c for c in KEY_COLUMNS if c in summary.columns]
+        head = read_results(path, key_cols or None, nrows=5)
+        print(head)
 
-        return df
+        if not load:
+            return head
+        read_cols = [c for c in READ_COLUMNS if c in summary.columns]
+        return read_results(path, read_cols or None)
 
     except pd.errors.EmptyDataError:
         print(f"\n⚠️  Файл {filename} пустой или поврежден!")
@@ -72,6 +92,12 @@ def parse_and_show(filename, description=""):
 def compare_results():
     """
     Сравнивает результаты из разных источников (API и веб-скрапинг)
+
+    Строки сопоставляются по нормализованной ссылке, затем по заголовку
+    (matching.py); отчет по строкам сохраняется в search_results_matches.csv.
+
+    Returns:
+        Отчет сопоставления или None, если не загружен один из файлов
     """
     print("\n" + "=" * 70)
     print("🔍 СРАВНЕНИЕ МЕТОДОВ ПОЛУЧЕНИЯ ДАННЫХ")
@@ -90,6 +116,7 @@ def compare_results():
     )
 
     # Сравнительный анализ (только если оба файла загружены)
+    report = None
     if df_api is not None or df_scraping is not None:
         print("\n" + "=" * 70)
         print("📈 СРАВНИТЕЛЬНЫЙ АНАЛИЗ")
@@ -105,18 +132,23 @@ def compare_results():
         else:
             print("❌ Web Scraping результаты не загружены")
 
-        # Сравнение по общим заголовкам (только если оба датасета загружены)
+        # Построчное сопоставление (только если оба датасета загружены)
         if df_api is not None and df_scraping is not None:
-            if 'title' in df_api.columns and 'title' in df_scraping.columns:
-                common_titles_api = set(df_api['title'].str.lower())
-                common_titles_scraping = set(df_scraping['title'].str.lower())
-                overlap = common_titles_api & common_titles_scraping
-                print(f"\n🔗 Совпадающих результатов: {len(overlap)}")
+            if {'title', 'link'} <= set(df_api.columns) and {'title', 'link'} <= set(df_scraping.columns):
+                report = match_results(df_api, df_scraping)
+                print()
+                print_match_summary(report)
+                print("\n📋 Сопоставление по строкам:")
+                print(report[["position_api", "position_scraping", "title_api", "match"]].head(10))
+                report.to_csv("search_results_matches.csv", index=False, encoding="utf-8")
+                print("\n✅ Отчет сохранен в search_results_matches.csv")
 
         print("\n✅ Анализ завершен!")
     else:
         print("\n❌ Не удалось загрузить ни один файл с результатами!")
 
+    return report
+
 
 def main():
     """
@@ -126,13 +158,16 @@ def main():
     print("1 - Анализ API результатов")
     print("2 - Анализ веб-скрапинг результатов")
     print("3 - Сравнение обоих методов (по умолчанию)")
+    print("4 - Анализ результатов пакетного поиска")
 
     choice = input("\nВведите номер (по умолчанию 3): ").strip() or "3"
 
     if choice == "1":
-        parse_and_show("search_results_api.csv", "API результаты")
+        parse_and_show("search_results_api.csv", "API результаты", load=False)
     elif choice == "2":
-        parse_and_show("search_results_scraping.csv", "Web Scraping результаты")
+        parse_and_show("search_results_scraping.csv", "Web Scraping результаты", load=False)
+    elif choice == "4":
+        parse_and_show("search_results_batch.parquet", "Результаты пакетного поиска", load=False)
     else:
         compare_results()
 
@@ -0,0 +1,272 @@
+"""
+Сопоставление результатов API и веб-скрапинга по строкам.
+
+Ссылки и заголовки приводятся к ключам сравнения: у ссылки снимается
+обертка перенаправления DuckDuckGo (//duckduckgo.com/l/?uddg=...) и Google
+(/url?q=...), отбрасываются схема, www., фрагмент и параметры отслеживания
+(utm_*, gclid...), у заголовка - регистр, пунктуация и многоточие обрезки.
+
+Строки сопоставляются соединением по хешу ключей (pandas merge), сначала по
+ссылке, затем оставшиеся по заголовку, поэтому время растет линейно с
+числом строк. Если в обоих наборах есть столбец query, строки сравниваются
+только внутри своего запроса - так можно сопоставить результаты тысяч
+запросов за один вызов. Повторяющиеся ключи сопоставляются один к одному по
+порядку появления.
+"""
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import unquote, unquote_plus
+
+import pandas as pd
+
+# Способ сопоставления строки отчета
+MATCH_URL = "url"
+MATCH_TITLE = "title"
+API_ONLY = "api_only"
+SCRAPING_ONLY = "scraping_only"
+
+# Параметры ссылок, которые не влияют на страницу (точное имя или префикс с "_")
+TRACKING_PARAMS = {
+    "gclid", "dclid", "fbclid", "msclkid", "yclid", "igshid", "srsltid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "_ga", "_gl", "spm",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+# Столбцы исходных данных, которые попадают в отчет
+REPORT_COLUMNS = ["position", "title", "link", "snippet"]
+
+# Адрес назначения в ссылках-перенаправлениях поисковиков: хост -> (путь, параметр)
+_REDIRECT_PARAMS = {
+    "duckduckgo.com": ("/l/", re.compile(r"(?:^|&)uddg=([^&]+)")),
+    "www.google.com": ("/url", re.compile(r"(?:^|&)q=([^&]+)")),
+    "google.com": ("/url", re.compile(r"(?:^|&)q=([^&]+)")),
+}
+# Схема (необязательна), хост, путь, параметры; фрагмент отбрасывается.
+# Регулярное выражение вместо urlsplit - нормализация в несколько раз быстрее
+_URL = re.compile(r"^(?:[a-zA-Z][a-zA-Z0-9+.-]*:)?(?://)?([^/?#]*)([^?#]*)(?:\?([^#]*))?")
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_ELLIPSIS = re.compile(r"(\.\.\.|…)\s*$")
+
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _unwrap(netloc: str, path: str, query: Optional[str]) -> Optional[str]:
+    redirect = _REDIRECT_PARAMS.get(netloc.lower())
+    if redirect and query and path.startswith(redirect[0]):
+        found = redirect[1].search(query)
+        if found:
+            return unquote_plus(found.group(1))
+    return None
+
+
+def unwrap_redirect(url: str) -> str:
+    """
+    Адрес назначения ссылки-перенаправления поисковика (остальные не меняются)
+    """
+    return _unwrap(*_URL.match(url).groups()) or url
+
+
+def normalize_url(url) -> Optional[str]:
+    """
+    Ключ сравнения ссылки: хост без www. + путь + значимые параметры
+
+    Args:
+        url: Ссылка (в том числе перенаправление DuckDuckGo или Google)
+
+    Returns:
+        Ключ вида "example.com/path?a=1" или None для пустой ссылки
+    """
+    if not isinstance(url, str) or not url.strip() or url == "N/A":
+        return None
+    netloc, path, query = _URL.match(url.strip()).groups()
+    target = _unwrap(netloc, path, query)
+    if target is not None:
+        netloc, path, query = _URL.match(target).groups()
+
+    host = netloc.rpartition("@")[2].lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.endswith((":80", ":443")):
+        host = host.rpartition(":")[0]
+
+    if "%" in path:
+        path = unquote(path)
+    if "//" in path:
+        path = re.sub(r"/{2,}", "/", path)
+    path = path.rstrip("/")
+    if not query:
+        return host + path
+
+    params = sorted(pair for pair in query.split("&")
+                    if pair and not _is_tracking(pair.partition("=")[0]))
+    return f"{host}{path}?{'&'.join(params)}" if params else host + path
+
+
+def normalize_title(title) -> Optional[str]:
+    """
+    Ключ сравнения заголовка: без регистра, пунктуации и многоточия обрезки
+
+    Returns:
+        Ключ или None для пустого заголовка
+    """
+    if not isinstance(title, str) or title == "N/A":
+        return None
+    title = unicodedata.normalize("NFKC", title).casefold()
+    title = _ELLIPSIS.sub("", title.strip())
+    title = " ".join(_PUNCTUATION.sub(" ", title).split())
+    return title or None
+
+
+def _keys(values: pd.Series, normalize) -> pd.Series:
+    # Нормализуется каждое различное значение один раз
+    uniques = pd.unique(values.to_numpy())
+    return values.map(dict(zip(uniques, map(normalize, uniques))))
+
+
+def _pair(api: pd.DataFrame, scraping: pd.DataFrame, on: List[str], key: str) -> pd.DataFrame:
+    """
+    Пары строк (api_row, scraping_row) с одинаковым ключом, один к одному
+    """
+    columns = on + [key]
+    left = api.dropna(subset=[key])[columns + ["api_row"]]
+    right = scraping.dropna(subset=[key])[columns + ["scraping_row"]]
+    # Номер повтора ключа: первый с первым, второй со вторым...
+    left = left.assign(_n=left.groupby(columns, sort=False).cumcount())
+    right = right.assign(_n=right.groupby(columns, sort=False).cumcount())
+    return left.merge(right, on=columns + ["_n"])[["api_row", "scraping_row"]]
+
+
+def match_results(df_api: pd.DataFrame, df_scraping: pd.DataFrame,
+                  on: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Построчное сопоставление результатов API и веб-скрапинга
+
+    Args:
+        df_api: Результаты API (столбцы title, link)
+        df_scraping: Результаты веб-скрапинга (столбцы title, link)
+        on: Столбцы, внутри которых сравниваются строки (по умолчанию
+            ["query"], если он есть в обоих наборах)
+
+    Returns:
+        Отчет по строке на пару или на несопоставленную строку: столбцы
+        on, REPORT_COLUMNS с суффиксами _api и _scraping, url_key, title_key
+        и match (MATCH_URL, MATCH_TITLE, API_ONLY, SCRAPING_ONLY)
+    """
+    if on is None:
+        on = ["query"] if "query" in df_api.columns and "query" in df_scraping.columns else []
+    on = list(on)
+
+    api = df_api.reset_index(drop=True).assign(api_row=lambda d: d.index)
+    scraping = df_scraping.reset_index(drop=True).assign(scraping_row=lambda d: d.index)
+    for df in (api, scraping):
+        df["url_key"] = _keys(df["link"], normalize_url) if "link" in df else None
+        df["title_key"] = _keys(df["title"], normalize_title) if "title" in df else None
+
+    by_url = _pair(api, scraping, on, "url_key")
+    rest_api = api[~api["api_row"].isin(by_url["api_row"])]
+    rest_scraping = scraping[~scraping["scraping_row"].isin(by_url["scraping_row"])]
+    by_title = _pair(rest_api, rest_scraping, on, "title_key")
+
+    pairs = pd.concat([by_url.assign(match=MATCH_URL), by_title.assign(match=MATCH_TITLE)],
+                      ignore_index=True)
+    api_only = api.loc[~api["api_row"].isin(pairs["api_row"]), ["api_row"]].assign(match=API_ONLY)
+    scraping_only = scraping.loc[~scraping["scraping_row"].isin(pairs["scraping_row"]),
+                                 ["scraping_row"]].assign(match=SCRAPING_ONLY)
+    rows = pd.concat([pairs, api_only, scraping_only], ignore_index=True)
+    rows[["api_row", "scraping_row"]] = rows[["api_row", "scraping_row"]].astype("Int64")
+
+    # Столбцы исходных строк: ключи сравнения берутся у API, если строка есть в обоих
+    keep = [c for c in REPORT_COLUMNS if c in api.columns or c in scraping.columns]
+    left = api.reindex(columns=on + keep + ["url_key", "title_key", "api_row"])
+    right = scraping.reindex(columns=on + keep + ["url_key", "title_key", "scraping_row"])
+    report = rows.merge(left, on="api_row", how="left") \
+        .merge(right, on="scraping_row", how="left", suffixes=("_api", "_scraping"))
+    for column in on + ["url_key", "title_key"]:
+        report[column] = report[f"{column}_api"].fillna(report[f"{column}_scraping"])
+    if "position" in keep:
+        # Позиция - целое с пропуском для строк только одного источника
+        for column in ("position_api", "position_scraping"):
+            if pd.api.types.is_numeric_dtype(report[column]):
+                report[column] = report[column].astype("Int64")
+
+    order = on + [f"{c}_{side}" for side in ("api", "scraping") for c in keep] \
+        + ["url_key", "title_key", "match"]
+    return report.sort_values(on + ["api_row", "scraping_row"], na_position="last",
+                              kind="stable")[order].reset_index(drop=True)
+
+
+def match_summary(report: pd.DataFrame) -> Dict[str, int]:
+    """
+    Количество строк отчета по способу сопоставления
+    """
+    counts = report["match"].value_counts()
+    return {match: int(counts.get(match, 0))
+            for match in (MATCH_URL, MATCH_TITLE, API_ONLY, SCRAPING_ONLY)}
+
+
+def print_match_summary(report: pd.DataFrame) -> None:
+    """
+    Выводит итоги сопоставления
+    """
+    summary = match_summary(report)
+    print(f"🔗 Совпадает по ссылке: {summary[MATCH_URL]}")
+    print(f"🔗 Совпадает по заголовку: {summary[MATCH_TITLE]}")
+    print(f"➖ Только в API: {summary[API_ONLY]}")
+    print(f"➖ Только в веб-скрапинге: {summary[SCRAPING_ONLY]}")
+
+
+if __name__ == "__main__":
+    # Тестовый запуск: нормализация ключей и сопоставление строк
+    import time
+    import numpy as np
+
+    assert normalize_url("//duckduckgo.com/l/?uddg=https%3A%2F%2Fwww.openai.com%2Fchatgpt%2F"
+                         "%3Futm_source%3Dddg&rut=abc") == "openai.com/chatgpt"
+    assert normalize_url("https://www.google.com/url?q=https://openai.com/chatgpt&sa=U") \
+        == "openai.com/chatgpt"
+    assert normalize_url("http://Example.com:80/a//b/?b=2&a=1&gclid=x#top") == "example.com/a/b?a=1&b=2"
+    assert normalize_url("N/A") is None and normalize_url(np.nan) is None
+    assert normalize_title("ChatGPT | OpenAI ...") == normalize_title("chatgpt - openai") \
+        == "chatgpt openai"
+
+    api = pd.DataFrame({
+        "position": [1, 2, 3, 4],
+        "title": ["ChatGPT", "ChatGPT - Wikipedia", "Introducing ChatGPT | OpenAI", "Only API"],
+        "link": ["https://chatgpt.com/", "https://en.wikipedia.org/wiki/ChatGPT",
+                 "https://openai.com/blog/chatgpt?utm_source=x", "https://api-only.example/"],
+    })
+    scraping = pd.DataFrame({
+        "position": [1, 2, 3, 4],
+        "title": ["Introducing ChatGPT - OpenAI", "ChatGPT", "ChatGPT — Wikipedia", "Only scraping"],
+        "link": ["//duckduckgo.com/l/?uddg=https%3A%2F%2Fopenai.com%2Fblog%2Fchatgpt&rut=1",
+                 "//duckduckgo.com/l/?uddg=https%3A%2F%2Fchatgpt.com&rut=2",
+                 "https://en.m.wikipedia.org/wiki/ChatGPT", "https://scraping-only.example/"],
+    })
+    report = match_results(api, scraping)
+    print(report[["position_api", "position_scraping", "match"]])
+    assert report["match"].tolist() == [MATCH_URL, MATCH_TITLE, MATCH_URL, API_ONLY, SCRAPING_ONLY]
+    assert report["position_scraping"].tolist()[:3] == [2, 3, 1]
+
+    # Тысячи запросов за один вызов: строки сравниваются внутри своего запроса
+    rng = np.random.default_rng(0)
+    queries, per_query = 20_000, 10
+    query = np.repeat([f"q{i}" for i in range(queries)], per_query)
+    pages = rng.integers(0, 30, queries * per_query)
+    big_api = pd.DataFrame({"query": query, "position": np.tile(np.arange(1, 11), queries),
+                            "title": [f"Page {p}" for p in pages],
+                            "link": [f"https://site{p}.example/{q}" for p, q in zip(pages, query)]})
+    big_scraping = big_api.sample(frac=1, random_state=0)
+    big_scraping["link"] = "//duckduckgo.com/l/?uddg=" + big_scraping["link"] + "%3Futm_source%3Dddg"
+
+    start = time.perf_counter()
+    big_report = match_results(big_api, big_scraping)
+    seconds = time.perf_counter() - start
+    assert (big_report["match"] == MATCH_URL).all() and len(big_report) == len(big_api)
+    assert (big_report["query"].notna()).all()
+    print(f"   {len(big_api)} + {len(big_scraping)} строк ({queries} запросов): {seconds:.2f} с")
+    print("✅ Сопоставление результатов работает")
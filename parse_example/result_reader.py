@@ -0,0 +1,267 @@
+"""
+Чтение файлов с результатами поиска: CSV, Parquet и Feather.
+
+Читаются только нужные столбцы (usecols / проекция столбцов Arrow), а
+сводка по файлу - число строк, столбцы и пропуски по каждому столбцу -
+считается без загрузки данных в pandas:
+    - Parquet: из метаданных (статистика null_count групп строк)
+    - Feather: по отображенному в память файлу, пакет за пакетом
+      (null_count массивов Arrow; сжатые пакеты при этом распаковываются)
+    - CSV: потоковым проходом pyarrow.csv, пакет за пакетом
+
+Пропусками считаются те же значения, что и в pd.read_csv по умолчанию
+(пустая строка, "N/A", "NaN"...).
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+# Формат файла по расширению
+FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".ipc": "feather",
+}
+
+# Значения, которые pd.read_csv по умолчанию считает пропуском
+CSV_NA_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+                 "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+                 "nan", "null"]
+
+# Размер блока потокового чтения CSV
+CSV_BLOCK_SIZE = 16 * 1024 ** 2
+
+
+@dataclass(frozen=True)
+class ResultsSummary:
+    """
+    Сводка по файлу с результатами
+
+    Attributes:
+        path: Путь к файлу
+        format: csv, parquet или feather
+        rows: Количество строк
+        columns: Все столбцы файла
+        missing: Пропуски по столбцам (только столбцы с пропусками)
+    """
+    path: str
+    format: str
+    rows: int
+    columns: List[str]
+    missing: Dict[str, int]
+
+
+def detect_format(path: str) -> str:
+    """
+    Формат файла по расширению
+
+    Raises:
+        ValueError: Неизвестное расширение
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Неподдерживаемый формат файла: {path} "
+                         f"(поддерживаются: {', '.join(sorted(FORMATS))})")
+    return FORMATS[ext]
+
+
+def read_columns_list(path: str) -> List[str]:
+    """
+    Столбцы файла (читается только заголовок или схема)
+    """
+    fmt = detect_format(path)
+    if fmt == "parquet":
+        return pq.read_schema(path).names
+    if fmt == "feather":
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).schema.names
+    return pd.read_csv(path, nrows=0, encoding="utf-8").columns.tolist()
+
+
+def _count_parquet(path: str) -> Tuple[int, Dict[str, int]]:
+    parquet = pq.ParquetFile(path)
+    metadata = parquet.metadata
+    names = parquet.schema_arrow.names
+    missing = dict.fromkeys(names, 0)
+    no_stats = set()
+    for i in range(metadata.num_row_groups):
+        row_group = metadata.row_group(i)
+        for j in range(row_group.num_columns):
+            column = row_group.column(j)
+            name = column.path_in_schema.split(".")[0]
+            if name not in missing:
+                continue
+            stats = column.statistics
+            if stats is None or not stats.has_null_count:
+                no_stats.add(name)
+            else:
+                missing[name] += stats.null_count
+
+    # Столбцы без статистики считаются по самим данным (только эти столбцы)
+    if no_stats:
+        columns = sorted(no_stats)
+        for name in columns:
+            missing[name] = 0
+        for batch in parquet.iter_batches(columns=columns):
+            for name, array in zip(batch.schema.names, batch.columns):
+                missing[name] += array.null_count
+    return metadata.num_rows, missing
+
+
+def _count_feather(path: str) -> Tuple[int, Dict[str, int]]:
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        names = reader.schema.names
+        missing = dict.fromkeys(names, 0)
+        rows = 0
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            rows += batch.num_rows
+            for name, array in zip(names, batch.columns):
+                missing[name] += array.null_count
+    return rows, missing
+
+
+def _count_csv(path: str) -> Tuple[int, Dict[str, int]]:
+    names = read_columns_list(path)
+    # Все столбцы читаются строками: типы не выводятся, пропуски как у pd.read_csv
+    convert = pa_csv.ConvertOptions(column_types={name: pa.string() for name in names},
+                                    null_values=CSV_NA_VALUES, strings_can_be_null=True)
+    reader = pa_csv.open_csv(path, read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+                             convert_options=convert)
+    missing = dict.fromkeys(names, 0)
+    rows = 0
+    for batch in reader:
+        rows += batch.num_rows
+        for name, array in zip(batch.schema.names, batch.columns):
+            missing[name] += array.null_count
+    return rows, missing
+
+
+def summarize_results(path: str) -> ResultsSummary:
+    """
+    Число строк, столбцы и пропуски без загрузки файла в pandas
+
+    Args:
+        path: Файл CSV, Parquet или Feather
+
+    Returns:
+        Сводка по файлу
+    """
+    fmt = detect_format(path)
+    counters = {"parquet": _count_parquet, "feather": _count_feather, "csv": _count_csv}
+    rows, missing = counters[fmt](path)
+    return ResultsSummary(path, fmt, rows, list(missing),
+                          {name: count for name, count in missing.items() if count})
+
+
+def read_results(path: str, columns: Optional[Sequence[str]] = None,
+                 nrows: Optional[int] = None) -> pd.DataFrame:
+    """
+    Читает из файла только нужные столбцы
+
+    Args:
+        path: Файл CSV, Parquet или Feather
+        columns: Столбцы (отсутствующие в файле пропускаются; None - все)
+        nrows: Прочитать только первые nrows строк
+
+    Returns:
+        DataFrame со столбцами в порядке файла
+    """
+    fmt = detect_format(path)
+    if columns is not None:
+        wanted = set(columns)
+        columns = [name for name in read_columns_list(path) if name in wanted]
+
+    if fmt == "csv":
+        return pd.read_csv(path, usecols=columns, nrows=nrows, encoding="utf-8")
+    if fmt == "parquet":
+        if nrows is None:
+            return pd.read_parquet(path, columns=columns)
+        batches = pq.ParquetFile(path).iter_batches(batch_size=nrows, columns=columns)
+        batch = next(batches, None)
+        if batch is None:
+            table = pq.read_schema(path).empty_table()
+            return (table if columns is None else table.select(columns)).to_pandas()
+        return batch.to_pandas()
+    if nrows is None:
+        return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    # Первые строки - из первых пакетов, остальные пакеты не читаются
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        batches = []
+        read = 0
+        for i in range(reader.num_record_batches):
+            if read >= nrows:
+                break
+            batch = reader.get_batch(i)
+            batches.append(batch if columns is None else batch.select(columns))
+            read += batch.num_rows
+        schema = reader.schema if columns is None else pa.schema([reader.schema.field(c) for c in columns])
+        return pa.Table.from_batches(batches, schema).slice(0, nrows).to_pandas()
+
+
+if __name__ == "__main__":
+    # Тестовый запуск: сводка и проекция совпадают с полной загрузкой pandas
+    import tempfile
+    import time
+    import numpy as np
+
+    rows = 1_000_000
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "query": rng.choice(["chatgpt", "python", "pandas"], rows),
+        "position": np.tile(np.arange(1, 11), rows // 10),
+        "title": rng.choice(["ChatGPT", "Python", "N/A", None], rows),
+        "link": [f"https://example.com/{i}" for i in range(rows)],
+        "snippet": rng.choice(["Описание результата " * 10, None], rows),
+        "thumbnail": rng.choice(["https://img.example/1.png", None], rows, p=[0.1, 0.9]),
+        "source": "API",
+    })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {
+            "csv": os.path.join(tmp, "results.csv"),
+            "parquet": os.path.join(tmp, "results.parquet"),
+            "feather lz4": os.path.join(tmp, "results.feather"),
+            "feather": os.path.join(tmp, "results.arrow"),
+        }
+        df.to_csv(paths["csv"], index=False, encoding="utf-8")
+        df.to_parquet(paths["parquet"], index=False, row_group_size=100_000)
+        df.to_feather(paths["feather lz4"])
+        df.to_feather(paths["feather"], compression="uncompressed")
+
+        for label, path in paths.items():
+            fmt = detect_format(path)
+            start = time.perf_counter()
+            full = pd.read_csv(path) if fmt == "csv" else \
+                pd.read_parquet(path) if fmt == "parquet" else pd.read_feather(path)
+            expected_missing = {k: int(v) for k, v in full.isnull().sum().items() if v}
+            full_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            summary = summarize_results(path)
+            head = read_results(path, ["position", "title", "source", "missing"], nrows=5)
+            fast_s = time.perf_counter() - start
+
+            assert summary.rows == rows and summary.columns == df.columns.tolist()
+            assert summary.missing == expected_missing, (fmt, summary.missing, expected_missing)
+            assert head.columns.tolist() == ["position", "title", "source"] and len(head) == 5
+            pd.testing.assert_frame_equal(head, full[head.columns].head(5), check_dtype=False)
+            print(f"   {label:12s} полная загрузка: {full_s * 1000:8.0f} мс, "
+                  f"сводка и первые строки: {fast_s * 1000:6.0f} мс")
+
+        projected = read_results(paths["parquet"], ["title", "link"])
+        assert projected.shape == (rows, 2)
+
+    print("✅ Сводка и чтение столбцов совпадают с полной загрузкой")